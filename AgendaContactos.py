@@ -6,74 +6,36 @@ Curso: Estructuras de Datos y Algoritmos
 
 Funcionalidad:
 - Diccionario con hashing y chaining
-- Interfaz profesional con PyQt5
+- Alternativa compacta con direccionamiento abierto (sondeo lineal)
+- Búsqueda por prefijo y tolerante a errores de tipeo
+- Búsqueda inversa por número de teléfono
+- Carga y exportación masiva en streaming (CSV)
+- Almacenamiento persistente en disco con mmap y log de operaciones
+- Variante concurrente con un lock por franja de buckets
+- Métricas opcionales: comparaciones, latencias, histograma de cadenas (JSON)
+- Interfaz profesional con PyQt5 (listas virtualizadas con modelo/vista)
 - Agregar, buscar, eliminar, mostrar estado del hash
+
+Interfaz PyQt5 sobre NucleoAgenda.py, que contiene las tablas hash y los
+índices sin GUI; aquí se reexportan para no romper `from AgendaContactos import ...`.
 """
 
+import os
 import sys
+from bisect import bisect_left
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QLabel, QPushButton, QLineEdit, QTextEdit, QFrame, QScrollArea,
-    QMessageBox, QGroupBox
+    QMessageBox, QGroupBox, QListView, QStackedWidget
 )
-from PyQt5.QtCore import Qt, QTimer
+from PyQt5.QtCore import Qt, QTimer, QAbstractListModel, QModelIndex
 from PyQt5.QtGui import QFont, QColor, QPalette, QBrush, QPainter
 
-
-# === ESTRUCTURA HASH CON CHAINING ===
-class HashTable:
-    def __init__(self, size=10):
-        self.size = size
-        self.table = [[] for _ in range(size)]  # Chaining con listas
-
-    def _hash(self, key):
-        """Función hash simple: suma de valores ASCII módulo tamaño"""
-        return sum(ord(char) for char in key) % self.size
-
-    def insert(self, nombre, telefono):
-        index = self._hash(nombre)
-        bucket = self.table[index]
-        for i, (n, t) in enumerate(bucket):
-            if n == nombre:
-                bucket[i] = (nombre, telefono)  # Actualizar
-                return "actualizado"
-        bucket.append((nombre, telefono))
-        return "agregado"
-
-    def search(self, nombre):
-        index = self._hash(nombre)
-        bucket = self.table[index]
-        for n, t in bucket:
-            if n == nombre:
-                return t
-        return None
-
-    def delete(self, nombre):
-        index = self._hash(nombre)
-        bucket = self.table[index]
-        for i, (n, t) in enumerate(bucket):
-            if n == nombre:
-                del bucket[i]
-                return True
-        return False
-
-    def get_state(self):
-        """Devuelve una representación del estado del hash table"""
-        state = []
-        for i, bucket in enumerate(self.table):
-            if bucket:
-                entries = " → ".join(f"{n}({t})" for n, t in bucket)
-                state.append(f"Bucket {i}: [{entries}]")
-            else:
-                state.append(f"Bucket {i}: [vacío]")
-        return state
-
-    def get_all_contacts(self):
-        """Devuelve todos los contactos como lista"""
-        contacts = []
-        for bucket in self.table:
-            contacts.extend(bucket)
-        return contacts
+from NucleoAgenda import (
+    hash_ascii, hash_fnv1a, crear_funcion_hash, normalizar_nombre, distancia_edicion,
+    IndicePrefijos, IndiceDifuso, MetricasHash, HashTable, HashTableAbierta,
+    HashTableDisco, HashTableConcurrente, benchmark_concurrente, benchmark_busqueda_nombres,
+)
 
 
 # === FONDO SUAVE CON DEGRADADO ===
@@ -87,7 +49,91 @@ class FondoSuave(QWidget):
         painter.fillRect(event.rect(), gradient)
 
 
+# === MODELOS PARA LAS LISTAS VIRTUALIZADAS ===
+class ModeloContactos(QAbstractListModel):
+    """Contactos en orden alfabético: nombres de un IndicePrefijos, teléfonos del almacén.
+
+    La vista solo pide las filas visibles, así que solo se leen del disco los
+    teléfonos que se muestran; las altas y bajas avisan de la fila exacta que
+    cambia en lugar de redibujar toda la lista.
+    """
+
+    def __init__(self, almacen, indice):
+        super().__init__()
+        self.almacen = almacen
+        self.indice = indice
+        self.entries = indice.entries
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.entries)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role != Qt.DisplayRole:
+            return None
+        nombre = self.entries[index.row()][1]
+        return f"📞 {nombre}: {self.almacen.search(nombre)}"
+
+    def row_of(self, nombre):
+        return bisect_left(self.entries, (normalizar_nombre(nombre), nombre))
+
+    def insert(self, nombre, telefono):
+        """Guarda en el almacén notificando solo la fila afectada"""
+        row = self.row_of(nombre)
+        if self.almacen.search(nombre) is not None:
+            resultado = self.almacen.insert(nombre, telefono)
+            self.dataChanged.emit(self.index(row), self.index(row))
+            return resultado
+        self.beginInsertRows(QModelIndex(), row, row)
+        resultado = self.almacen.insert(nombre, telefono)
+        self.indice.add(nombre)
+        self.endInsertRows()
+        return resultado
+
+    def delete(self, nombre):
+        if self.almacen.search(nombre) is None:
+            return False
+        row = self.row_of(nombre)
+        self.beginRemoveRows(QModelIndex(), row, row)
+        self.almacen.delete(nombre)
+        self.indice.remove(nombre)
+        self.endRemoveRows()
+        return True
+
+
+class ModeloBuckets(QAbstractListModel):
+    """Una fila por bucket; el texto de cada bucket se arma solo cuando se ve"""
+
+    def __init__(self, hash_table):
+        super().__init__()
+        self.hash_table = hash_table
+
+    def refresh(self):
+        self.beginResetModel()
+        self.hash_table.complete_rehash()
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.hash_table.size
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        vacio = not self.hash_table.table[index.row()]
+        if role == Qt.DisplayRole:
+            return self.hash_table.describe_bucket(index.row())
+        if role == Qt.ForegroundRole:
+            return QColor("#95a5a6") if vacio else QColor("#2c3e50")
+        if role == Qt.FontRole and not vacio:
+            font = QFont()
+            font.setBold(True)
+            return font
+        return None
+
+
 # === VENTANA PRINCIPAL ===
+RUTA_DATOS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "agenda_contactos.db")
+
+
 class VentanaAgenda(QMainWindow):
     def __init__(self):
         super().__init__()
@@ -221,7 +267,25 @@ class VentanaAgenda(QMainWindow):
         tabs_layout.addWidget(btn_hash)
         layout_der.addLayout(tabs_layout)
 
-        # Área de texto
+        # Título de la vista y resumen
+        self.label_vista = QLabel()
+        self.label_vista.setWordWrap(True)
+        self.label_vista.setStyleSheet("color: #2c3e50;")
+        layout_der.addWidget(self.label_vista)
+
+        # Lista virtualizada: solo se dibujan las filas visibles
+        self.lista = QListView()
+        self.lista.setUniformItemSizes(True)
+        self.lista.setStyleSheet("""
+            background: #f8f9fa;
+            border: 1px solid #dfe4ea;
+            border-radius: 8px;
+            font-family: 'Courier New';
+            color: #2c3e50;
+            padding: 10px;
+        """)
+
+        # Área de texto para resultados de búsqueda
         self.area_texto = QTextEdit()
         self.area_texto.setReadOnly(True)
         self.area_texto.setStyleSheet("""
@@ -232,7 +296,10 @@ class VentanaAgenda(QMainWindow):
             color: #2c3e50;
             padding: 10px;
         """)
-        layout_der.addWidget(self.area_texto)
+        self.pila = QStackedWidget()
+        self.pila.addWidget(self.lista)
+        self.pila.addWidget(self.area_texto)
+        layout_der.addWidget(self.pila)
 
         # Añadir paneles
         splitter_layout.addWidget(panel_izq)
@@ -240,10 +307,29 @@ class VentanaAgenda(QMainWindow):
         splitter_layout.setStretch(0, 1)
         splitter_layout.setStretch(1, 2)
 
-        # Inicializar hash table
-        self.hash_table = HashTable(size=10)
+        # Los contactos viven en disco: las búsquedas exactas, altas y bajas van al
+        # almacén, que solo lee las páginas que toca. Para la lista alfabética y la
+        # búsqueda por prefijo basta con los nombres, ordenados una sola vez
+        self.almacen = HashTableDisco(RUTA_DATOS)
+        self.indice_nombres = IndicePrefijos()
+        self.indice_nombres.cargando = True
+        for nombre, _ in self.almacen.iter_contacts():
+            self.indice_nombres.add(nombre)
+        self.indice_nombres.terminar_carga()
+        self.modelo_contactos = ModeloContactos(self.almacen, self.indice_nombres)
+        # Tabla en memoria con los índices difuso y por teléfono: solo se arma la
+        # primera vez que se la necesita (esas búsquedas o la vista de buckets)
+        self.hash_table = None
+        self.modelo_buckets = None
         self.mostrar_contactos()
 
+    def tabla_memoria(self):
+        if self.hash_table is None:
+            self.hash_table = HashTable(size=10, fuzzy_index=True, bidirectional=True)
+            self.hash_table.bulk_insert(self.almacen.iter_contacts(), expected=self.almacen.count)
+            self.modelo_buckets = ModeloBuckets(self.hash_table)
+        return self.hash_table
+
     def validar_datos(self):
         nombre = self.input_nombre.text().strip()
         telefono = self.input_telefono.text().strip()
@@ -258,60 +344,103 @@ class VentanaAgenda(QMainWindow):
     def agregar_contacto(self):
         nombre, telefono = self.validar_datos()
         if nombre and telefono:
-            resultado = self.hash_table.insert(nombre, telefono)
+            resultado = self.modelo_contactos.insert(nombre, telefono)
+            if self.hash_table is not None:
+                self.hash_table.insert(nombre, telefono)
             accion = "actualizado" if resultado == "actualizado" else "agregado"
             QMessageBox.information(self, "Éxito", f"Contacto {accion} correctamente.")
             self.input_nombre.clear()
             self.input_telefono.clear()
-            self.mostrar_contactos()
+            self.refrescar_vista()
 
     def buscar_contacto(self):
-        nombre, _ = self.validar_datos()
-        if nombre:
-            telefono = self.hash_table.search(nombre)
-            if telefono:
-                QMessageBox.information(self, "Encontrado", f"{nombre}: {telefono}")
-                self.input_telefono.setText(telefono)
-            else:
-                QMessageBox.information(self, "No encontrado", f"El contacto '{nombre}' no existe.")
+        nombre = self.input_nombre.text().strip()
+        telefono = self.input_telefono.text().strip()
+        if not nombre and telefono:
+            self.buscar_por_telefono(telefono)
+            return
+        if not nombre:
+            QMessageBox.warning(self, "Error", "El nombre no puede estar vacío.")
+            return
+        telefono = self.almacen.search(nombre)
+        if telefono:
+            QMessageBox.information(self, "Encontrado", f"{nombre}: {telefono}")
+            self.input_telefono.setText(telefono)
             self.mostrar_contactos()
+            fila = self.modelo_contactos.index(self.modelo_contactos.row_of(nombre))
+            self.lista.scrollTo(fila)
+            self.lista.setCurrentIndex(fila)
+            return
+        # Sin coincidencia exacta: primero por prefijo, luego tolerando errores
+        resultados = [(n, self.almacen.search(n)) for n in self.indice_nombres.search(nombre, limit=200)]
+        titulo = f"🔍 CONTACTOS QUE EMPIEZAN CON '{nombre}'"
+        if not resultados:
+            resultados = self.tabla_memoria().search_fuzzy(nombre)
+            titulo = f"🔍 ¿QUISISTE DECIR '{nombre}'?"
+        if not resultados:
+            QMessageBox.information(self, "No encontrado", f"El contacto '{nombre}' no existe.")
+            return
+        self.label_vista.setText(f"<h3>{titulo}</h3>")
+        self.area_texto.setHtml("<br>".join(f"📞 <b>{n}</b>: {t}" for n, t in resultados))
+        self.pila.setCurrentWidget(self.area_texto)
+
+    def buscar_por_telefono(self, telefono):
+        nombres = self.tabla_memoria().search_by_phone(telefono)
+        if nombres:
+            QMessageBox.information(self, "Encontrado", f"{telefono}: {', '.join(nombres)}")
+            self.input_nombre.setText(nombres[0])
+        else:
+            QMessageBox.information(self, "No encontrado", f"Ningún contacto tiene el número {telefono}.")
 
     def eliminar_contacto(self):
         nombre, _ = self.validar_datos()
         if nombre:
-            if self.hash_table.delete(nombre):
+            if self.modelo_contactos.delete(nombre):
+                if self.hash_table is not None:
+                    self.hash_table.delete(nombre)
                 QMessageBox.information(self, "Eliminado", f"Contacto '{nombre}' eliminado.")
             else:
                 QMessageBox.information(self, "No encontrado", f"El contacto '{nombre}' no existe.")
             self.input_nombre.clear()
             self.input_telefono.clear()
+            self.refrescar_vista()
+
+    def refrescar_vista(self):
+        """Tras un alta o baja: la lista ya se actualizó fila a fila, el hash se reinicia"""
+        if self.lista.model() is self.modelo_buckets:
+            self.mostrar_hash()
+        else:
             self.mostrar_contactos()
 
     def mostrar_contactos(self):
-        self.area_texto.clear()
-        self.area_texto.append("<h3>📋 LISTA DE CONTACTOS</h3><hr>")
-        contacts = self.hash_table.get_all_contacts()
-        if not contacts:
-            self.area_texto.append("<i>No hay contactos registrados.</i>")
-        else:
-            for nombre, telefono in contacts:
-                self.area_texto.append(f"📞 <b>{nombre}</b>: {telefono}")
+        self.label_vista.setText("<h3>📋 LISTA DE CONTACTOS</h3>" if self.almacen.count
+                                 else "<h3>📋 LISTA DE CONTACTOS</h3><i>No hay contactos registrados.</i>")
+        if self.lista.model() is not self.modelo_contactos:
+            self.lista.setModel(self.modelo_contactos)
+        self.pila.setCurrentWidget(self.lista)
         self.actualizar_info()
 
     def mostrar_hash(self):
-        self.area_texto.clear()
-        self.area_texto.append("<h3>🔧 ESTADO DEL HASH TABLE</h3><hr>")
-        state = self.hash_table.get_state()
-        for line in state:
-            if "vacío" in line:
-                self.area_texto.append(f'<font color="#95a5a6">{line}</font>')
-            else:
-                self.area_texto.append(f'<font color="#2c3e50"><b>{line}</b></font>')
+        tabla = self.tabla_memoria()
+        self.modelo_buckets.refresh()
+        stats = tabla.get_stats()
+        self.label_vista.setText(
+            "<h3>🔧 ESTADO DEL HASH TABLE</h3>"
+            f"<i>Buckets: {stats['buckets']} | Factor de carga: {stats['factor_carga']} | "
+            f"Redimensiones: {stats['redimensiones']} | Cadena máx.: {stats['cadena_maxima']}</i><br>"
+            f"<i>{tabla.describe_distribution()}</i>"
+        )
+        if self.lista.model() is not self.modelo_buckets:
+            self.lista.setModel(self.modelo_buckets)
+        self.pila.setCurrentWidget(self.lista)
         self.actualizar_info()
 
     def actualizar_info(self):
-        contacts = self.hash_table.get_all_contacts()
-        self.label_info.setText(f"Contactos: {len(contacts)}")
+        self.label_info.setText(f"Contactos: {self.almacen.count}")
+
+    def closeEvent(self, event):
+        self.almacen.close()
+        super().closeEvent(event)
 
 
 # === EJECUCIÓN ===
@@ -0,0 +1,380 @@
+"""
+ÁRBOL B+ - ÍNDICE ORDENADO PARA CARGAS GRANDES CON RECORRIDOS SECUENCIALES
+Curso: Estructuras de Datos y Algoritmos
+
+Funcionalidad:
+- Misma API de mapa ordenado que ArbolAVL: insert, search, delete, range
+- Fanout configurable: pocos nodos anchos en lugar de muchos nodos binarios
+- Hojas enlazadas: un recorrido por rango avanza de hoja en hoja
+- Respaldo opcional en archivo de páginas de tamaño fijo, leídas bajo demanda
+"""
+
+import mmap
+import struct
+import pickle
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+
+
+# === NODOS ===
+class _Hoja:
+    __slots__ = ("claves", "valores", "siguiente")
+
+    def __init__(self, claves=None, valores=None):
+        self.claves = claves or []
+        self.valores = valores or []
+        self.siguiente = None  # Hoja de la derecha, para recorridos secuenciales
+
+
+class _Interno:
+    __slots__ = ("claves", "hijos")
+
+    def __init__(self, claves, hijos):
+        self.claves = claves  # claves[i] = menor clave del subárbol hijos[i + 1]
+        self.hijos = hijos
+
+
+# === ÁRBOL B+ EN MEMORIA ===
+class ArbolBMas:
+    """Árbol B+: los datos viven en hojas enlazadas y los nodos internos solo guían.
+
+    Cada nodo tiene a lo sumo `fanout` hijos (o fanout - 1 pares en una hoja) y,
+    salvo la raíz, al menos la mitad. Sin valor explícito se guarda la propia
+    clave, igual que en ArbolAVL.
+    """
+
+    def __init__(self, claves=(), fanout=64):
+        if fanout < 4:
+            raise ValueError("El fanout mínimo es 4")
+        self.fanout = fanout
+        self.max_claves = fanout - 1
+        self.min_claves = (fanout - 1) // 2
+        self.raiz = _Hoja()
+        self.n = 0
+        for clave in claves:
+            self.insert(clave)
+
+    def __len__(self):
+        return self.n
+
+    def __contains__(self, clave):
+        hoja = self._hoja(clave)
+        i = bisect_left(hoja.claves, clave)
+        return i < len(hoja.claves) and hoja.claves[i] == clave
+
+    def __iter__(self):
+        for clave, _ in self.range():
+            yield clave
+
+    def _hoja(self, clave):
+        nodo = self.raiz
+        while type(nodo) is _Interno:
+            nodo = nodo.hijos[bisect_right(nodo.claves, clave)]
+        return nodo
+
+    def search(self, clave, default=None):
+        hoja = self._hoja(clave)
+        i = bisect_left(hoja.claves, clave)
+        if i < len(hoja.claves) and hoja.claves[i] == clave:
+            return hoja.valores[i]
+        return default
+
+    def min(self):
+        if not self.n:
+            raise ValueError("El árbol está vacío")
+        nodo = self.raiz
+        while type(nodo) is _Interno:
+            nodo = nodo.hijos[0]
+        return nodo.claves[0]
+
+    def max(self):
+        if not self.n:
+            raise ValueError("El árbol está vacío")
+        nodo = self.raiz
+        while type(nodo) is _Interno:
+            nodo = nodo.hijos[-1]
+        return nodo.claves[-1]
+
+    def range(self, desde=None, hasta=None):
+        """Genera (clave, valor) con desde <= clave <= hasta siguiendo la cadena de hojas"""
+        if desde is None:
+            hoja = self.raiz
+            while type(hoja) is _Interno:
+                hoja = hoja.hijos[0]
+            i = 0
+        else:
+            hoja = self._hoja(desde)
+            i = bisect_left(hoja.claves, desde)
+        while hoja is not None:
+            claves, valores = hoja.claves, hoja.valores
+            fin = len(claves) if hasta is None else bisect_right(claves, hasta)
+            for j in range(i, fin):
+                yield claves[j], valores[j]
+            if fin < len(claves):
+                return
+            hoja, i = hoja.siguiente, 0
+
+    # --- Inserción ---
+    def insert(self, clave, valor=None):
+        """Inserta o actualiza; devuelve "agregado" o "actualizado" """
+        valor = clave if valor is None else valor
+        resultado, division = self._insert(self.raiz, clave, valor)
+        if division is not None:
+            separador, nuevo = division
+            self.raiz = _Interno([separador], [self.raiz, nuevo])
+        return resultado
+
+    def _insert(self, nodo, clave, valor):
+        """Devuelve (resultado, (separador, nodo nuevo) si el nodo se partió)"""
+        if type(nodo) is _Hoja:
+            i = bisect_left(nodo.claves, clave)
+            if i < len(nodo.claves) and nodo.claves[i] == clave:
+                nodo.valores[i] = valor
+                return "actualizado", None
+            nodo.claves.insert(i, clave)
+            nodo.valores.insert(i, valor)
+            self.n += 1
+            if len(nodo.claves) <= self.max_claves:
+                return "agregado", None
+            medio = len(nodo.claves) // 2
+            nueva = _Hoja(nodo.claves[medio:], nodo.valores[medio:])
+            del nodo.claves[medio:]
+            del nodo.valores[medio:]
+            nueva.siguiente, nodo.siguiente = nodo.siguiente, nueva
+            return "agregado", (nueva.claves[0], nueva)
+
+        i = bisect_right(nodo.claves, clave)
+        resultado, division = self._insert(nodo.hijos[i], clave, valor)
+        if division is None:
+            return resultado, None
+        separador, nuevo = division
+        nodo.claves.insert(i, separador)
+        nodo.hijos.insert(i + 1, nuevo)
+        if len(nodo.hijos) <= self.fanout:
+            return resultado, None
+        medio = len(nodo.claves) // 2
+        sube = nodo.claves[medio]
+        nuevo_interno = _Interno(nodo.claves[medio + 1:], nodo.hijos[medio + 1:])
+        del nodo.claves[medio:]
+        del nodo.hijos[medio + 1:]
+        return resultado, (sube, nuevo_interno)
+
+    # --- Borrado ---
+    def delete(self, clave):
+        """Elimina la clave; los nodos que quedan por debajo del mínimo piden o se fusionan"""
+        if not self._delete(self.raiz, clave):
+            return False
+        self.n -= 1
+        if type(self.raiz) is _Interno and len(self.raiz.hijos) == 1:
+            self.raiz = self.raiz.hijos[0]
+        return True
+
+    def _delete(self, nodo, clave):
+        if type(nodo) is _Hoja:
+            i = bisect_left(nodo.claves, clave)
+            if i < len(nodo.claves) and nodo.claves[i] == clave:
+                del nodo.claves[i]
+                del nodo.valores[i]
+                return True
+            return False
+        i = bisect_right(nodo.claves, clave)
+        hijo = nodo.hijos[i]
+        if not self._delete(hijo, clave):
+            return False
+        if len(hijo.claves) < self.min_claves:
+            self._reparar(nodo, i)
+        return True
+
+    def _reparar(self, padre, i):
+        """El hijo i quedó corto: toma una entrada de un hermano o se fusiona con él"""
+        hijo = padre.hijos[i]
+        izq = padre.hijos[i - 1] if i > 0 else None
+        der = padre.hijos[i + 1] if i + 1 < len(padre.hijos) else None
+        hoja = type(hijo) is _Hoja
+
+        if izq is not None and len(izq.claves) > self.min_claves:
+            if hoja:
+                hijo.claves.insert(0, izq.claves.pop())
+                hijo.valores.insert(0, izq.valores.pop())
+                padre.claves[i - 1] = hijo.claves[0]
+            else:
+                hijo.claves.insert(0, padre.claves[i - 1])
+                hijo.hijos.insert(0, izq.hijos.pop())
+                padre.claves[i - 1] = izq.claves.pop()
+            return
+        if der is not None and len(der.claves) > self.min_claves:
+            if hoja:
+                hijo.claves.append(der.claves.pop(0))
+                hijo.valores.append(der.valores.pop(0))
+                padre.claves[i] = der.claves[0]
+            else:
+                hijo.claves.append(padre.claves[i])
+                hijo.hijos.append(der.hijos.pop(0))
+                padre.claves[i] = der.claves.pop(0)
+            return
+
+        # Sin hermano con sobrante: se fusiona con uno de ellos
+        if izq is None:
+            izq, der, i = hijo, der, i + 1
+        else:
+            der = hijo
+        if hoja:
+            izq.claves += der.claves
+            izq.valores += der.valores
+            izq.siguiente = der.siguiente
+        else:
+            izq.claves += [padre.claves[i - 1]] + der.claves
+            izq.hijos += der.hijos
+        del padre.claves[i - 1]
+        del padre.hijos[i]
+
+    def verificar(self):
+        """Comprueba orden, ocupación, profundidad uniforme y la cadena de hojas"""
+        hojas = []
+
+        def revisar(nodo, desde, hasta, es_raiz):
+            assert es_raiz or len(nodo.claves) >= self.min_claves, "Nodo por debajo del mínimo"
+            assert len(nodo.claves) <= self.max_claves, "Nodo desbordado"
+            assert nodo.claves == sorted(nodo.claves), "Claves desordenadas"
+            assert all((desde is None or c >= desde) and (hasta is None or c < hasta)
+                       for c in nodo.claves), "Clave fuera de su rango"
+            if type(nodo) is _Hoja:
+                hojas.append(nodo)
+                return 1
+            assert len(nodo.hijos) == len(nodo.claves) + 1, "Hijos y claves no cuadran"
+            limites = [desde] + nodo.claves + [hasta]
+            alturas = {revisar(h, limites[j], limites[j + 1], False) for j, h in enumerate(nodo.hijos)}
+            assert len(alturas) == 1, "Hojas a distinta profundidad"
+            return alturas.pop() + 1
+
+        revisar(self.raiz, None, None, True)
+        for a, b in zip(hojas, hojas[1:]):
+            assert a.siguiente is b, "Cadena de hojas rota"
+        assert hojas[-1].siguiente is None
+        assert sum(len(h.claves) for h in hojas) == self.n
+        return True
+
+    # --- Archivo de páginas ---
+    def guardar(self, ruta, tam_pagina=None):
+        """Escribe el árbol en `ruta`, un nodo por página de tamaño fijo.
+
+        Sin `tam_pagina`, la página es el menor múltiplo de 4 KiB donde cabe el
+        nodo más grande (las claves y valores de texto no tienen tamaño fijo).
+        """
+        orden, ids = [], {}
+        pendientes = [self.raiz]
+        while pendientes:
+            nodo = pendientes.pop()
+            ids[id(nodo)] = len(orden) + 1  # La página 0 es la cabecera
+            orden.append(nodo)
+            if type(nodo) is _Interno:
+                pendientes.extend(reversed(nodo.hijos))
+        paginas = []
+        for nodo in orden:
+            if type(nodo) is _Hoja:
+                siguiente = ids[id(nodo.siguiente)] if nodo.siguiente is not None else 0
+                datos = ("H", nodo.claves, nodo.valores, siguiente)
+            else:
+                datos = ("I", nodo.claves, [ids[id(h)] for h in nodo.hijos])
+            paginas.append(pickle.dumps(datos, protocol=pickle.HIGHEST_PROTOCOL))
+        mayor = max(len(p) for p in paginas) + 4
+        if tam_pagina is None:
+            tam_pagina = -(-mayor // _PAGINA_MINIMA) * _PAGINA_MINIMA
+        elif mayor > tam_pagina:
+            raise ValueError(f"Un nodo ocupa {mayor - 4} bytes: use páginas más "
+                             f"grandes o un fanout menor")
+        with open(ruta, "wb") as f:
+            f.write(_CABECERA_PAGINAS.pack(_MAGIA_PAGINAS, tam_pagina, self.n, self.fanout)
+                    .ljust(tam_pagina, b"\0"))
+            for pagina in paginas:
+                f.write((struct.pack("<I", len(pagina)) + pagina).ljust(tam_pagina, b"\0"))
+
+
+_MAGIA_PAGINAS = b"BMAS"
+_CABECERA_PAGINAS = struct.Struct("<4sIQI")  # magia, tamaño de página, claves, fanout
+_PAGINA_MINIMA = 4096
+
+
+# === ÁRBOL B+ EN DISCO (SOLO LECTURA) ===
+class ArbolBMasEnDisco:
+    """Consulta un árbol guardado con ArbolBMas.guardar sin cargarlo entero.
+
+    El archivo se abre con mmap: cada búsqueda lee solo las páginas de su
+    camino raíz-hoja, y un recorrido por rango lee hojas consecutivas. Las
+    páginas decodificadas se guardan en una caché LRU. Solo deben abrirse
+    archivos propios: las páginas se decodifican con pickle.
+    """
+
+    def __init__(self, ruta, cache_paginas=256):
+        self._file = open(ruta, "rb")
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magia, self.tam_pagina, self.n, self.fanout = _CABECERA_PAGINAS.unpack_from(self._mm, 0)
+        if magia != _MAGIA_PAGINAS:
+            self.close()
+            raise ValueError(f"{ruta} no es un archivo de árbol B+")
+        self.cache_paginas = cache_paginas
+        self._cache = OrderedDict()
+        self.paginas_leidas = 0
+
+    def _pagina(self, numero):
+        datos = self._cache.get(numero)
+        if datos is not None:
+            self._cache.move_to_end(numero)
+            return datos
+        inicio = numero * self.tam_pagina
+        largo, = struct.unpack_from("<I", self._mm, inicio)
+        datos = pickle.loads(self._mm[inicio + 4:inicio + 4 + largo])
+        self.paginas_leidas += 1
+        self._cache[numero] = datos
+        if len(self._cache) > self.cache_paginas:
+            self._cache.popitem(last=False)
+        return datos
+
+    def _hoja(self, clave):
+        datos = self._pagina(1)
+        while datos[0] == "I":
+            datos = self._pagina(datos[2][bisect_right(datos[1], clave)])
+        return datos
+
+    def __len__(self):
+        return self.n
+
+    def __contains__(self, clave):
+        _, claves, _, _ = self._hoja(clave)
+        i = bisect_left(claves, clave)
+        return i < len(claves) and claves[i] == clave
+
+    def search(self, clave, default=None):
+        _, claves, valores, _ = self._hoja(clave)
+        i = bisect_left(claves, clave)
+        if i < len(claves) and claves[i] == clave:
+            return valores[i]
+        return default
+
+    def range(self, desde=None, hasta=None):
+        if desde is None:
+            datos = self._pagina(1)
+            while datos[0] == "I":
+                datos = self._pagina(datos[2][0])
+            i = 0
+        else:
+            datos = self._hoja(desde)
+            i = bisect_left(datos[1], desde)
+        while True:
+            _, claves, valores, siguiente = datos
+            fin = len(claves) if hasta is None else bisect_right(claves, hasta)
+            for j in range(i, fin):
+                yield claves[j], valores[j]
+            if fin < len(claves) or not siguiente:
+                return
+            datos, i = self._pagina(siguiente), 0
+
+    def close(self):
+        self._mm.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
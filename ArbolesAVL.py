@@ -1,158 +1,230 @@
 """
 SISTEMA AVL 
+
+Interfaz PyQt5 sobre NucleoAVL.py, que contiene las estructuras y algoritmos
+sin GUI; aquí se reexportan para no romper `from ArbolesAVL import ...`.
 """
 
 import sys
-import time
+import random
+import threading
+from collections import deque
+from bisect import bisect_left, bisect_right
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
-    QLabel, QPushButton, QTextEdit, QLineEdit, QFrame, QSplitter
+    QLabel, QPushButton, QTextEdit, QLineEdit, QFrame, QSplitter, QSlider, QCheckBox
 )
-from PyQt5.QtCore import Qt, QTimer, QRectF
+from PyQt5.QtCore import Qt, QTimer, QRectF, QPointF, QObject, QThread, pyqtSignal
 from PyQt5.QtGui import (
-    QPainter, QColor, QBrush, QPen, QFont, QLinearGradient
+    QPainter, QColor, QBrush, QPen, QFont, QLinearGradient, QPixmap
 )
 
-
-# === ESTRUCTURA AVL ===
-class NodoAVL:
-    def __init__(self, clave):
-        self.clave = clave
-        self.izq = None
-        self.der = None
-        self.altura = 1
-
-
-def obtener_altura(nodo):
-    return nodo.altura if nodo else 0
-
-
-def actualizar_altura(nodo):
-    if nodo:
-        nodo.altura = 1 + max(obtener_altura(nodo.izq), obtener_altura(nodo.der))
-
-
-def obtener_balance(nodo):
-    return obtener_altura(nodo.izq) - obtener_altura(nodo.der) if nodo else 0
-
-
-def rotar_derecha(y):
-    x = y.izq
-    T2 = x.der
-    x.der = y
-    y.izq = T2
-    actualizar_altura(y)
-    actualizar_altura(x)
-    return x
-
-
-def rotar_izquierda(x):
-    y = x.der
-    T2 = y.izq
-    y.izq = x
-    x.der = T2
-    actualizar_altura(x)
-    actualizar_altura(y)
-    return y
-
-
-def insertar_avl(raiz, clave, historial):
-    if not raiz:
-        historial.append(f"Insertando <b>{clave}</b> como nuevo nodo.")
-        return NodoAVL(clave)
-
-    if clave < raiz.clave:
-        historial.append(f"➡️  {clave} < {raiz.clave} → a la izquierda")
-        raiz.izq = insertar_avl(raiz.izq, clave, historial)
-    elif clave > raiz.clave:
-        historial.append(f"➡️  {clave} > {raiz.clave} → a la derecha")
-        raiz.der = insertar_avl(raiz.der, clave, historial)
-    else:
-        historial.append(f"<b>Duplicado:</b> {clave} ya existe.")
-        return raiz
-
-    actualizar_altura(raiz)
-    balance = obtener_balance(raiz)
-
-    # Caso LL
-    if balance > 1 and clave < raiz.izq.clave:
-        historial.append(f"⚖️  <b>Rotación Derecha (LL)</b> en {raiz.clave}")
-        return rotar_derecha(raiz)
-
-    # Caso RR
-    if balance < -1 and clave > raiz.der.clave:
-        historial.append(f"⚖️  <b>Rotación Izquierda (RR)</b> en {raiz.clave}")
-        return rotar_izquierda(raiz)
-
-    # Caso LR
-    if balance > 1 and clave > raiz.izq.clave:
-        historial.append(f"⚖️  <b>Rotación Doble: LR</b> en {raiz.clave}")
-        raiz.izq = rotar_izquierda(raiz.izq)
-        return rotar_derecha(raiz)
-
-    # Caso RL
-    if balance < -1 and clave < raiz.der.clave:
-        historial.append(f"⚖️  <b>Rotación Doble: RL</b> en {raiz.clave}")
-        raiz.der = rotar_derecha(raiz.der)
-        return rotar_izquierda(raiz)
-
-    return raiz
+from NucleoAVL import (
+    NodoAVL, obtener_altura, actualizar_altura, obtener_balance,
+    rotar_derecha, rotar_izquierda, insertar_avl, insertar_avl_recursivo,
+    insertar_avl_iterativo, traza_html, MENSAJES, benchmark_insercion,
+    construir_balanceado, ArbolAVL,
+    ArbolAVLPersistente, HistorialAVL,
+    ArbolAVLArena, benchmark_memoria, calcular_layout,
+)
 
 
 # === WIDGET DE DIBUJO DEL ÁRBOL ===
 class VisualizadorAVL(QWidget):
+    """Dibuja el árbol con layout precalculado, caché de imagen y recorte al viewport.
+
+    El layout se calcula una vez por cambio de árbol; cada repintado solo
+    dibuja los nodos de los niveles y el tramo de x visibles. Rueda: zoom,
+    arrastrar: desplazar, doble clic: ajustar a la ventana. La vista se ajusta
+    sola solo con el primer árbol; después los cambios conservan zoom y posición.
+    """
+
     def __init__(self):
         super().__init__()
         self.raiz = None
         self.radio = 20
         self.nivel_dist = 60
         self.hijo_dist = 80
+        self.zoom = 1.0
+        self.pan_x = 0.0
+        self.pan_y = 0.0
+        self.nodos = []
+        self.filas = []   # Por profundidad: (xs ordenadas, índices de nodo)
+        self._cache = None
+        self._arrastre = None
+        self._ajustada = False
 
     def set_arbol(self, raiz):
         self.raiz = raiz
-        self.update()  # Redibuja
+        self.set_layout(calcular_layout(raiz))
+
+    def set_layout(self, nodos):
+        """Muestra un layout ya calculado (por ejemplo, en otro hilo)"""
+        self.nodos = nodos
+        niveles = {}
+        for i, (x, profundidad, _, _, _) in enumerate(self.nodos):
+            niveles.setdefault(profundidad, []).append((x, i))
+        self.filas = []
+        for profundidad in range(len(niveles)):
+            fila = sorted(niveles[profundidad])
+            self.filas.append(([x for x, _ in fila], [i for _, i in fila]))
+        if self._ajustada:
+            self._invalidar()
+        else:
+            self.ajustar_vista()
+
+    # --- Coordenadas: mundo (unidades de layout) -> pantalla ---
+    def _a_pantalla(self, x, profundidad):
+        return (x * self.hijo_dist * self.zoom + self.pan_x,
+                profundidad * self.nivel_dist * self.zoom + self.pan_y)
+
+    def ajustar_vista(self):
+        """Encaja el árbol completo en el ancho disponible (sin agrandar)"""
+        if self.nodos:
+            xs = [x for x, _, _, _, _ in self.nodos]
+            ancho = (max(xs) - min(xs)) * self.hijo_dist + 2 * self.radio
+            self.zoom = min(1.0, max(0.02, (self.width() - 40) / ancho)) if ancho else 1.0
+            centro = (max(xs) + min(xs)) / 2
+            self.pan_x = self.width() / 2 - centro * self.hijo_dist * self.zoom
+            self.pan_y = 60
+        self._ajustada = bool(self.nodos)  # Con el árbol vacío, el primero que llegue se encaja
+        self._invalidar()
+
+    def _invalidar(self):
+        self._cache = None
+        self.update()
+
+    def resizeEvent(self, event):
+        self._cache = None
+        super().resizeEvent(event)
+
+    def wheelEvent(self, event):
+        factor = 1.25 if event.angleDelta().y() > 0 else 0.8
+        pos = event.pos()
+        # Zoom centrado en el cursor
+        self.pan_x = pos.x() - (pos.x() - self.pan_x) * factor
+        self.pan_y = pos.y() - (pos.y() - self.pan_y) * factor
+        self.zoom *= factor
+        self._invalidar()
+
+    def mousePressEvent(self, event):
+        self._arrastre = (event.pos(), self.pan_x, self.pan_y)
+
+    def mouseMoveEvent(self, event):
+        if self._arrastre is not None:
+            inicio, pan_x, pan_y = self._arrastre
+            self.pan_x = pan_x + event.pos().x() - inicio.x()
+            self.pan_y = pan_y + event.pos().y() - inicio.y()
+            self._invalidar()
+
+    def mouseReleaseEvent(self, event):
+        self._arrastre = None
+
+    def mouseDoubleClickEvent(self, event):
+        self.ajustar_vista()
 
     def paintEvent(self, event):
-        painter = QPainter(self)
-        painter.setRenderHint(QPainter.Antialiasing)
-        painter.fillRect(event.rect(), QColor(10, 15, 30))  # Fondo oscuro
-
-        if self.raiz:
-            self._dibujar_nodo(painter, self.raiz, self.width() // 2, 60, self.width() // 4)
-
-    def _dibujar_nodo(self, painter, nodo, x, y, offset):
-        # Coordenadas hijo
-        x_izq = x - offset
-        x_der = x + offset
-        y_siguiente = y + self.nivel_dist
-
-        # Líneas a hijos
+        if self._cache is None or self._cache.size() != self.size():
+            self._cache = QPixmap(self.size())
+            self._cache.fill(QColor(10, 15, 30))  # Fondo oscuro
+            painter = QPainter(self._cache)
+            painter.setRenderHint(QPainter.Antialiasing)
+            self._dibujar_visibles(painter)
+            painter.end()
+        QPainter(self).drawPixmap(0, 0, self._cache)
+
+    def _visibles(self):
+        """Índices de los nodos dentro del viewport (más un radio de margen)"""
+        escala_x = self.hijo_dist * self.zoom
+        escala_y = self.nivel_dist * self.zoom
+        margen = self.radio * self.zoom
+        x_min = (-margen - self.pan_x) / escala_x
+        x_max = (self.width() + margen - self.pan_x) / escala_x
+        p_min = max(0, int((-margen - self.pan_y) / escala_y))
+        p_max = min(len(self.filas) - 1, int((self.height() + margen - self.pan_y) / escala_y))
+        for profundidad in range(p_min, p_max + 1):
+            xs, indices = self.filas[profundidad]
+            yield from indices[bisect_left(xs, x_min):bisect_right(xs, x_max)]
+
+    def _dibujar_visibles(self, painter):
+        radio = self.radio * self.zoom
+        visibles = list(self._visibles())
+
+        # Líneas a padres (también las de hijos visibles cuyo padre quedó fuera)
         pen = QPen(QColor("#00cc4e"))
         pen.setWidth(2)
         painter.setPen(pen)
-
-        if nodo.izq:
-            painter.drawLine(x, y + self.radio, x_izq, y_siguiente - self.radio)
-            self._dibujar_nodo(painter, nodo.izq, x_izq, y_siguiente, max(30, offset // 2))
-
-        if nodo.der:
-            painter.drawLine(x, y + self.radio, x_der, y_siguiente - self.radio)
-            self._dibujar_nodo(painter, nodo.der, x_der, y_siguiente, max(30, offset // 2))
-
-        # Nodo actual
-        color_fondo = QColor("#587cef") if obtener_balance(nodo) == 0 else \
-                      QColor("#dd9d13") if obtener_balance(nodo) > 1 or obtener_balance(nodo) < -1 else \
-                      QColor("#0891b2")
-        brush = QBrush(color_fondo)
-        painter.setBrush(brush)
-        painter.setPen(QPen(QColor("white"), 2))
-        rect = QRectF(x - self.radio, y - self.radio, 2 * self.radio, 2 * self.radio)
-        painter.drawEllipse(rect)
-
-        # Texto: clave y balance
-        painter.setPen(QPen(QColor("white")))
-        painter.setFont(QFont("Arial", 8, QFont.Bold))
-        painter.drawText(rect, Qt.AlignCenter, f"{nodo.clave}\n{obtener_balance(nodo)}")
+        for i in visibles:
+            x, profundidad, _, _, padre = self.nodos[i]
+            if padre >= 0:
+                px, py = self._a_pantalla(*self.nodos[padre][:2])
+                cx, cy = self._a_pantalla(x, profundidad)
+                painter.drawLine(QPointF(px, py + radio), QPointF(cx, cy - radio))
+
+        # Nodos; con zoom muy bajo se omite el texto
+        con_texto = radio >= 10
+        painter.setFont(QFont("Arial", max(1, int(8 * min(1.0, self.zoom * 1.5))), QFont.Bold))
+        for i in visibles:
+            x, profundidad, clave, balance, _ = self.nodos[i]
+            cx, cy = self._a_pantalla(x, profundidad)
+            color_fondo = QColor("#587cef") if balance == 0 else \
+                          QColor("#dd9d13") if balance > 1 or balance < -1 else \
+                          QColor("#0891b2")
+            painter.setBrush(QBrush(color_fondo))
+            painter.setPen(QPen(QColor("white"), 2))
+            rect = QRectF(cx - radio, cy - radio, 2 * radio, 2 * radio)
+            painter.drawEllipse(rect)
+            if con_texto:
+                painter.setPen(QPen(QColor("white")))
+                painter.drawText(rect, Qt.AlignCenter, f"{clave}\n{balance}")
+
+
+# === INSERCIÓN DE SECUENCIAS EN SEGUNDO PLANO ===
+class TrabajadorSecuencia(QObject):
+    """Inserta una secuencia fuera del hilo de la GUI y emite una instantánea por clave.
+
+    Cada instantánea es el historial del paso más el layout ya calculado, así
+    que la GUI solo tiene que mostrarla. Sin animación se emite un único paso
+    final. Cada layout ocupa O(n), así que el trabajador no se adelanta más de
+    `max_pendientes` pasos: espera a que la GUI avise con consumido().
+    """
+    paso = pyqtSignal(list, list)  # líneas del historial, layout del árbol
+    terminado = pyqtSignal(object)  # raíz final
+
+    def __init__(self, raiz, secuencia, animar=True, max_pendientes=32):
+        super().__init__()
+        self.raiz = raiz
+        self.secuencia = secuencia
+        self.animar = animar
+        self.cancelado = False
+        self._libres = threading.Semaphore(max_pendientes)
+
+    def consumido(self, pasos=1):
+        """La GUI ya mostró `pasos` instantáneas: el trabajador puede calcular otras tantas"""
+        self._libres.release(pasos)
+
+    def cancelar(self):
+        self.cancelado = True
+        self._libres.release()  # Por si estaba esperando lugar en la cola
+
+    def run(self):
+        raiz = self.raiz
+        for clave in self.secuencia:
+            if self.cancelado:
+                break
+            if self.animar:
+                self._libres.acquire()
+                if self.cancelado:
+                    break
+                lineas = []
+                raiz = insertar_avl_iterativo(raiz, clave, traza_html(lineas))
+                self.paso.emit(lineas, calcular_layout(raiz))
+            else:
+                raiz = insertar_avl_iterativo(raiz, clave)
+        if not self.animar:
+            resumen = f"⏩ {len(self.secuencia)} claves insertadas sin animación."
+            self.paso.emit([resumen], calcular_layout(raiz))
+        self.terminado.emit(raiz)
 
 
 # === VENTANA PRINCIPAL ===
@@ -207,7 +279,29 @@ class VentanaAVL(QMainWindow):
             btn.setStyleSheet("background: #1e3a8a; color: white; padding: 8px;")
             btn.clicked.connect(lambda _, d=datos: self.insertar_secuencia(d))
             secuencia_layout.addWidget(btn)
+        btn_aleatoria = QPushButton("Aleatoria: 1000")
+        btn_aleatoria.setStyleSheet("background: #1e3a8a; color: white; padding: 8px;")
+        btn_aleatoria.clicked.connect(
+            lambda: self.insertar_secuencia(random.sample(range(10_000), 1000)))
+        secuencia_layout.addWidget(btn_aleatoria)
         layout_izq.addLayout(secuencia_layout)
+        self.botones = [btn_insertar] + [
+            secuencia_layout.itemAt(i).widget() for i in range(secuencia_layout.count())
+        ]
+
+        # Velocidad de la animación
+        velocidad_layout = QHBoxLayout()
+        velocidad_layout.addWidget(QLabel("Pausa por clave:"))
+        self.slider_velocidad = QSlider(Qt.Horizontal)
+        self.slider_velocidad.setRange(0, 1500)
+        self.slider_velocidad.setValue(700)
+        self.label_velocidad = QLabel("700 ms")
+        self.slider_velocidad.valueChanged.connect(self.cambiar_velocidad)
+        self.check_sin_animacion = QCheckBox("Sin animación")
+        velocidad_layout.addWidget(self.slider_velocidad)
+        velocidad_layout.addWidget(self.label_velocidad)
+        velocidad_layout.addWidget(self.check_sin_animacion)
+        layout_izq.addLayout(velocidad_layout)
 
         # === PANEL DERECHO: HISTORIAL ===
         panel_der = QWidget()
@@ -232,6 +326,11 @@ class VentanaAVL(QMainWindow):
 
         # Estado inicial
         self.raiz = None
+        self.hilo = None
+        self.trabajador = None
+        self.pasos = deque()
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.mostrar_paso)
         self.historial.append("<h3>Sistema AVL Inicializado</h3>")
         self.historial.append("Inserta nodos o usa una secuencia predefinida.")
 
@@ -239,7 +338,7 @@ class VentanaAVL(QMainWindow):
         try:
             clave = int(self.input_clave.text())
             historial_local = []
-            self.raiz = insertar_avl(self.raiz, clave, historial_local)
+            self.raiz = insertar_avl_iterativo(self.raiz, clave, traza_html(historial_local))
             for linea in historial_local:
                 self.historial.append(linea)
             self.visualizador.set_arbol(self.raiz)
@@ -248,20 +347,70 @@ class VentanaAVL(QMainWindow):
             self.historial.append("<b>Error:</b> Ingresa un número válido.")
 
     def insertar_secuencia(self, secuencia):
-        self.historial.append(f"<h4>Secuencia: {secuencia}</h4>")
-        for clave in secuencia:
-            time.sleep(0.7)
-            historial_local = []
-            self.raiz = insertar_avl(self.raiz, clave, historial_local)
-            for linea in historial_local:
-                self.historial.append(linea)
-            self.visualizador.set_arbol(self.raiz)
-            QApplication.processEvents()  # Actualiza UI durante animación
+        """Calcula los pasos en un hilo aparte; un QTimer los muestra al ritmo elegido"""
+        if self.hilo is not None:
+            return
+        texto = secuencia if len(secuencia) <= 20 else f"{secuencia[:20]}... ({len(secuencia)} claves)"
+        self.historial.append(f"<h4>Secuencia: {texto}</h4>")
+        for boton in self.botones:
+            boton.setEnabled(False)
+        self.pasos.clear()
+        self.hilo = QThread()
+        self.trabajador = TrabajadorSecuencia(self.raiz, list(secuencia),
+                                              animar=not self.check_sin_animacion.isChecked())
+        self.trabajador.moveToThread(self.hilo)
+        self.hilo.started.connect(self.trabajador.run)
+        self.trabajador.paso.connect(self.encolar_paso)
+        self.trabajador.terminado.connect(self.fin_calculo)
+        self.hilo.start()
+        self.timer.start(self.slider_velocidad.value())
+
+    def encolar_paso(self, lineas, layout):
+        self.pasos.append((lineas, layout))
+
+    def fin_calculo(self, raiz):
+        self.raiz = raiz
+        self.hilo.quit()
+        self.hilo.wait()
+        self.hilo = None
+        self.trabajador = None
+
+    def mostrar_paso(self):
+        if self.pasos:
+            if self.check_sin_animacion.isChecked():
+                # Saltar la animación: se vuelca todo lo pendiente de una vez
+                pendientes = list(self.pasos)
+                self.pasos.clear()
+                self.historial.append("<br>".join(l for lineas, _ in pendientes for l in lineas))
+                self.visualizador.set_layout(pendientes[-1][1])
+            else:
+                pendientes = [self.pasos.popleft()]
+                lineas, layout = pendientes[0]
+                for linea in lineas:
+                    self.historial.append(linea)
+                self.visualizador.set_layout(layout)
+            if self.trabajador is not None:
+                self.trabajador.consumido(len(pendientes))
+        elif self.hilo is None:
+            self.timer.stop()
+            self.visualizador.raiz = self.raiz
+            for boton in self.botones:
+                boton.setEnabled(True)
+
+    def cambiar_velocidad(self, valor):
+        self.label_velocidad.setText(f"{valor} ms")
+        self.timer.setInterval(valor)
+
+    def closeEvent(self, event):
+        if self.hilo is not None:
+            self.trabajador.cancelar()
+            self.hilo.quit()
+            self.hilo.wait()
+        super().closeEvent(event)
 
 
 # === EJECUCIÓN ===
 if __name__ == "__main__":
-    import random
     app = QApplication(sys.argv)
     ventana = VentanaAVL()
     ventana.show()
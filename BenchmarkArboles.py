@@ -0,0 +1,585 @@
+"""
+BENCHMARK DE ÍNDICES ORDENADOS
+Curso: Estructuras de Datos y Algoritmos
+
+Compara el ArbolAVL de NucleoAVL.py con otros motores ordenados:
+- Árbol rojo-negro (variante left-leaning de Sedgewick)
+- Treap (árbol + montículo con prioridades aleatorias)
+- Árbol B con fanout configurable
+- Árbol B+ de ArbolBMas.py (hojas enlazadas)
+- Lista ordenada con bisect
+
+Cargas: aleatoria, ordenada, inversa y zipfiana (búsquedas sesgadas).
+Mide inserción, búsqueda, borrado, recorridos por rango y memoria, y guarda
+los resultados en JSON.
+
+Uso:
+    python BenchmarkArboles.py --tamanos 1000 10000 100000 --salida resultados.json
+"""
+
+import sys
+import json
+import time
+import random
+import argparse
+import tracemalloc
+from bisect import bisect_left, bisect_right
+from itertools import islice, accumulate
+
+from NucleoAVL import ArbolAVL
+from ArbolBMas import ArbolBMas
+
+
+# === ÁRBOL ROJO-NEGRO (LEFT-LEANING) ===
+class _NodoRN:
+    __slots__ = ("clave", "valor", "izq", "der", "rojo")
+
+    def __init__(self, clave, valor):
+        self.clave = clave
+        self.valor = valor
+        self.izq = None
+        self.der = None
+        self.rojo = True
+
+
+def _es_rojo(nodo):
+    return nodo is not None and nodo.rojo
+
+
+class ArbolRojoNegro:
+    def __init__(self):
+        self.raiz = None
+        self.n = 0
+
+    def __len__(self):
+        return self.n
+
+    @staticmethod
+    def _rotar_izq(h):
+        x = h.der
+        h.der = x.izq
+        x.izq = h
+        x.rojo = h.rojo
+        h.rojo = True
+        return x
+
+    @staticmethod
+    def _rotar_der(h):
+        x = h.izq
+        h.izq = x.der
+        x.der = h
+        x.rojo = h.rojo
+        h.rojo = True
+        return x
+
+    @staticmethod
+    def _invertir(h):
+        h.rojo = not h.rojo
+        h.izq.rojo = not h.izq.rojo
+        h.der.rojo = not h.der.rojo
+
+    def _balancear(self, h):
+        if _es_rojo(h.der) and not _es_rojo(h.izq):
+            h = self._rotar_izq(h)
+        if _es_rojo(h.izq) and _es_rojo(h.izq.izq):
+            h = self._rotar_der(h)
+        if _es_rojo(h.izq) and _es_rojo(h.der):
+            self._invertir(h)
+        return h
+
+    def search(self, clave, default=None):
+        nodo = self.raiz
+        while nodo is not None:
+            if clave < nodo.clave:
+                nodo = nodo.izq
+            elif clave > nodo.clave:
+                nodo = nodo.der
+            else:
+                return nodo.valor
+        return default
+
+    def insert(self, clave, valor=None):
+        self.raiz = self._insert(self.raiz, clave, valor)
+        self.raiz.rojo = False
+
+    def _insert(self, h, clave, valor):
+        if h is None:
+            self.n += 1
+            return _NodoRN(clave, valor)
+        if clave < h.clave:
+            h.izq = self._insert(h.izq, clave, valor)
+        elif clave > h.clave:
+            h.der = self._insert(h.der, clave, valor)
+        else:
+            h.valor = valor
+        return self._balancear(h)
+
+    def _mover_rojo_izq(self, h):
+        self._invertir(h)
+        if _es_rojo(h.der.izq):
+            h.der = self._rotar_der(h.der)
+            h = self._rotar_izq(h)
+            self._invertir(h)
+        return h
+
+    def _mover_rojo_der(self, h):
+        self._invertir(h)
+        if _es_rojo(h.izq.izq):
+            h = self._rotar_der(h)
+            self._invertir(h)
+        return h
+
+    def _borrar_min(self, h):
+        if h.izq is None:
+            return None
+        if not _es_rojo(h.izq) and not _es_rojo(h.izq.izq):
+            h = self._mover_rojo_izq(h)
+        h.izq = self._borrar_min(h.izq)
+        return self._balancear(h)
+
+    def delete(self, clave):
+        if self.search(clave, _AUSENTE) is _AUSENTE:
+            return False
+        if not _es_rojo(self.raiz.izq) and not _es_rojo(self.raiz.der):
+            self.raiz.rojo = True
+        self.raiz = self._delete(self.raiz, clave)
+        if self.raiz is not None:
+            self.raiz.rojo = False
+        self.n -= 1
+        return True
+
+    def _delete(self, h, clave):
+        if clave < h.clave:
+            if not _es_rojo(h.izq) and not _es_rojo(h.izq.izq):
+                h = self._mover_rojo_izq(h)
+            h.izq = self._delete(h.izq, clave)
+        else:
+            if _es_rojo(h.izq):
+                h = self._rotar_der(h)
+            if clave == h.clave and h.der is None:
+                return None
+            if not _es_rojo(h.der) and not _es_rojo(h.der.izq):
+                h = self._mover_rojo_der(h)
+            if clave == h.clave:
+                minimo = h.der
+                while minimo.izq is not None:
+                    minimo = minimo.izq
+                h.clave, h.valor = minimo.clave, minimo.valor
+                h.der = self._borrar_min(h.der)
+            else:
+                h.der = self._delete(h.der, clave)
+        return self._balancear(h)
+
+    def range(self, desde=None, hasta=None):
+        pila, nodo = [], self.raiz
+        while pila or nodo is not None:
+            if nodo is not None:
+                if desde is not None and nodo.clave < desde:
+                    nodo = nodo.der
+                else:
+                    pila.append(nodo)
+                    nodo = nodo.izq
+                continue
+            nodo = pila.pop()
+            if hasta is not None and nodo.clave > hasta:
+                return
+            yield nodo.clave, nodo.valor
+            nodo = nodo.der
+
+
+_AUSENTE = object()
+
+
+# === TREAP ===
+class _NodoTreap:
+    __slots__ = ("clave", "valor", "prioridad", "izq", "der")
+
+    def __init__(self, clave, valor, prioridad):
+        self.clave = clave
+        self.valor = valor
+        self.prioridad = prioridad
+        self.izq = None
+        self.der = None
+
+
+class Treap:
+    """Árbol binario de búsqueda por clave y montículo por prioridad aleatoria"""
+
+    def __init__(self, seed=None):
+        self.raiz = None
+        self.n = 0
+        self.rng = random.Random(seed)
+
+    def __len__(self):
+        return self.n
+
+    def search(self, clave, default=None):
+        nodo = self.raiz
+        while nodo is not None:
+            if clave < nodo.clave:
+                nodo = nodo.izq
+            elif clave > nodo.clave:
+                nodo = nodo.der
+            else:
+                return nodo.valor
+        return default
+
+    def insert(self, clave, valor=None):
+        self.raiz = self._insert(self.raiz, clave, valor)
+
+    def _insert(self, nodo, clave, valor):
+        if nodo is None:
+            self.n += 1
+            return _NodoTreap(clave, valor, self.rng.random())
+        if clave < nodo.clave:
+            nodo.izq = self._insert(nodo.izq, clave, valor)
+            if nodo.izq.prioridad > nodo.prioridad:
+                hijo = nodo.izq
+                nodo.izq, hijo.der = hijo.der, nodo
+                return hijo
+        elif clave > nodo.clave:
+            nodo.der = self._insert(nodo.der, clave, valor)
+            if nodo.der.prioridad > nodo.prioridad:
+                hijo = nodo.der
+                nodo.der, hijo.izq = hijo.izq, nodo
+                return hijo
+        else:
+            nodo.valor = valor
+        return nodo
+
+    @staticmethod
+    def _fusionar(izq, der):
+        """Une dos treaps con todas las claves de izq menores que las de der"""
+        if izq is None:
+            return der
+        if der is None:
+            return izq
+        if izq.prioridad > der.prioridad:
+            izq.der = Treap._fusionar(izq.der, der)
+            return izq
+        der.izq = Treap._fusionar(izq, der.izq)
+        return der
+
+    def delete(self, clave):
+        padre, nodo = None, self.raiz
+        while nodo is not None and nodo.clave != clave:
+            padre, nodo = nodo, (nodo.izq if clave < nodo.clave else nodo.der)
+        if nodo is None:
+            return False
+        reemplazo = self._fusionar(nodo.izq, nodo.der)
+        if padre is None:
+            self.raiz = reemplazo
+        elif padre.izq is nodo:
+            padre.izq = reemplazo
+        else:
+            padre.der = reemplazo
+        self.n -= 1
+        return True
+
+    range = ArbolRojoNegro.range
+
+
+# === ÁRBOL B CON FANOUT CONFIGURABLE ===
+class _NodoB:
+    __slots__ = ("claves", "valores", "hijos")
+
+    def __init__(self):
+        self.claves = []
+        self.valores = []
+        self.hijos = []  # Vacío en las hojas
+
+
+class ArbolB:
+    """Árbol B clásico (CLRS): hasta `fanout` hijos y fanout - 1 claves por nodo"""
+
+    def __init__(self, fanout=32):
+        if fanout < 4:
+            raise ValueError("El fanout mínimo es 4")
+        self.t = fanout // 2  # Grado mínimo
+        self.raiz = _NodoB()
+        self.n = 0
+
+    def __len__(self):
+        return self.n
+
+    def search(self, clave, default=None):
+        nodo = self.raiz
+        while True:
+            i = bisect_left(nodo.claves, clave)
+            if i < len(nodo.claves) and nodo.claves[i] == clave:
+                return nodo.valores[i]
+            if not nodo.hijos:
+                return default
+            nodo = nodo.hijos[i]
+
+    def _dividir(self, padre, i):
+        t = self.t
+        lleno = padre.hijos[i]
+        nuevo = _NodoB()
+        nuevo.claves, lleno.claves, medio = lleno.claves[t:], lleno.claves[:t - 1], lleno.claves[t - 1]
+        nuevo.valores, lleno.valores, valor = lleno.valores[t:], lleno.valores[:t - 1], lleno.valores[t - 1]
+        if lleno.hijos:
+            nuevo.hijos, lleno.hijos = lleno.hijos[t:], lleno.hijos[:t]
+        padre.claves.insert(i, medio)
+        padre.valores.insert(i, valor)
+        padre.hijos.insert(i + 1, nuevo)
+
+    def insert(self, clave, valor=None):
+        if len(self.raiz.claves) == 2 * self.t - 1:
+            raiz = _NodoB()
+            raiz.hijos.append(self.raiz)
+            self.raiz = raiz
+            self._dividir(raiz, 0)
+        nodo = self.raiz
+        while True:
+            i = bisect_left(nodo.claves, clave)
+            if i < len(nodo.claves) and nodo.claves[i] == clave:
+                nodo.valores[i] = valor
+                return
+            if not nodo.hijos:
+                nodo.claves.insert(i, clave)
+                nodo.valores.insert(i, valor)
+                self.n += 1
+                return
+            if len(nodo.hijos[i].claves) == 2 * self.t - 1:
+                self._dividir(nodo, i)
+                if clave == nodo.claves[i]:
+                    nodo.valores[i] = valor
+                    return
+                if clave > nodo.claves[i]:
+                    i += 1
+            nodo = nodo.hijos[i]
+
+    def delete(self, clave):
+        if self.search(clave, _AUSENTE) is _AUSENTE:
+            return False
+        self._delete(self.raiz, clave)
+        if not self.raiz.claves and self.raiz.hijos:
+            self.raiz = self.raiz.hijos[0]
+        self.n -= 1
+        return True
+
+    def _fusionar(self, nodo, i):
+        """Une hijos[i], la clave i y hijos[i + 1] en un solo nodo"""
+        izq, der = nodo.hijos[i], nodo.hijos.pop(i + 1)
+        izq.claves += [nodo.claves.pop(i)] + der.claves
+        izq.valores += [nodo.valores.pop(i)] + der.valores
+        izq.hijos += der.hijos
+
+    def _delete(self, nodo, clave):
+        t = self.t
+        i = bisect_left(nodo.claves, clave)
+        if i < len(nodo.claves) and nodo.claves[i] == clave:
+            if not nodo.hijos:
+                del nodo.claves[i]
+                del nodo.valores[i]
+                return
+            izq, der = nodo.hijos[i], nodo.hijos[i + 1]
+            if len(izq.claves) >= t:
+                pred = izq
+                while pred.hijos:
+                    pred = pred.hijos[-1]
+                nodo.claves[i], nodo.valores[i] = pred.claves[-1], pred.valores[-1]
+                self._delete(izq, pred.claves[-1])
+            elif len(der.claves) >= t:
+                suc = der
+                while suc.hijos:
+                    suc = suc.hijos[0]
+                nodo.claves[i], nodo.valores[i] = suc.claves[0], suc.valores[0]
+                self._delete(der, suc.claves[0])
+            else:
+                self._fusionar(nodo, i)
+                self._delete(izq, clave)
+            return
+        hijo = nodo.hijos[i]
+        if len(hijo.claves) == t - 1:
+            # Garantiza al menos t claves en el hijo antes de bajar
+            if i > 0 and len(nodo.hijos[i - 1].claves) >= t:
+                vecino = nodo.hijos[i - 1]
+                hijo.claves.insert(0, nodo.claves[i - 1])
+                hijo.valores.insert(0, nodo.valores[i - 1])
+                nodo.claves[i - 1], nodo.valores[i - 1] = vecino.claves.pop(), vecino.valores.pop()
+                if vecino.hijos:
+                    hijo.hijos.insert(0, vecino.hijos.pop())
+            elif i < len(nodo.claves) and len(nodo.hijos[i + 1].claves) >= t:
+                vecino = nodo.hijos[i + 1]
+                hijo.claves.append(nodo.claves[i])
+                hijo.valores.append(nodo.valores[i])
+                nodo.claves[i], nodo.valores[i] = vecino.claves.pop(0), vecino.valores.pop(0)
+                if vecino.hijos:
+                    hijo.hijos.append(vecino.hijos.pop(0))
+            else:
+                if i == len(nodo.claves):
+                    i -= 1
+                self._fusionar(nodo, i)
+                hijo = nodo.hijos[i]
+        self._delete(hijo, clave)
+
+    def range(self, desde=None, hasta=None):
+        return self._range(self.raiz, desde, hasta)
+
+    def _range(self, nodo, desde, hasta):
+        inicio = 0 if desde is None else bisect_left(nodo.claves, desde)
+        for j in range(inicio, len(nodo.claves)):
+            if nodo.hijos:
+                yield from self._range(nodo.hijos[j], desde, hasta)
+            clave = nodo.claves[j]
+            if hasta is not None and clave > hasta:
+                return
+            yield clave, nodo.valores[j]
+        if nodo.hijos:
+            yield from self._range(nodo.hijos[len(nodo.claves)], desde, hasta)
+
+
+# === LISTA ORDENADA CON BISECT ===
+class ListaOrdenada:
+    """Claves y valores en dos listas paralelas: búsqueda O(log n), inserción O(n) de memmove"""
+
+    def __init__(self):
+        self.claves = []
+        self.valores = []
+
+    def __len__(self):
+        return len(self.claves)
+
+    def search(self, clave, default=None):
+        i = bisect_left(self.claves, clave)
+        if i < len(self.claves) and self.claves[i] == clave:
+            return self.valores[i]
+        return default
+
+    def insert(self, clave, valor=None):
+        i = bisect_left(self.claves, clave)
+        if i < len(self.claves) and self.claves[i] == clave:
+            self.valores[i] = valor
+        else:
+            self.claves.insert(i, clave)
+            self.valores.insert(i, valor)
+
+    def delete(self, clave):
+        i = bisect_left(self.claves, clave)
+        if i < len(self.claves) and self.claves[i] == clave:
+            del self.claves[i]
+            del self.valores[i]
+            return True
+        return False
+
+    def range(self, desde=None, hasta=None):
+        i = 0 if desde is None else bisect_left(self.claves, desde)
+        fin = len(self.claves) if hasta is None else bisect_right(self.claves, hasta)
+        for j in range(i, fin):  # Sin copiar el rango: quien consume solo unos pocos no paga O(n)
+            yield self.claves[j], self.valores[j]
+
+
+# === CARGAS DE TRABAJO ===
+def generar_carga(tipo, n, consultas, rng, zipf_s=1.1):
+    """Devuelve (orden de inserción, claves a buscar) para el tipo de carga pedido"""
+    claves = rng.sample(range(n * 10), n)
+    if tipo == "ordenada":
+        claves.sort()
+    elif tipo == "inversa":
+        claves.sort(reverse=True)
+    if tipo == "zipfiana":
+        # Unas pocas claves concentran la mayoría de las búsquedas
+        pesos = list(accumulate(1 / (r + 1) ** zipf_s for r in range(n)))
+        busquedas = rng.choices(claves, cum_weights=pesos, k=consultas)
+    else:
+        busquedas = [rng.choice(claves) for _ in range(consultas)]
+    return claves, busquedas
+
+
+MOTORES = {
+    "avl": lambda fanout: ArbolAVL(),
+    "rojo_negro": lambda fanout: ArbolRojoNegro(),
+    "treap": lambda fanout: Treap(seed=1),
+    "arbol_b": lambda fanout: ArbolB(fanout),
+    "arbol_b_mas": lambda fanout: ArbolBMas(fanout=fanout),
+    "lista_bisect": lambda fanout: ListaOrdenada(),
+}
+
+
+def _ops_por_segundo(ops, segundos):
+    return round(ops / segundos) if segundos > 0 else None
+
+
+def medir(motor, tipo, n, consultas=100_000, rangos=1_000, largo_rango=100,
+          fanout=32, memoria=True, seed=42):
+    rng = random.Random(seed)
+    claves, busquedas = generar_carga(tipo, n, consultas, rng)
+    crear = MOTORES[motor]
+    resultado = {"motor": motor, "carga": tipo, "n": n}
+    if motor in ("arbol_b", "arbol_b_mas"):
+        resultado["fanout"] = fanout
+
+    arbol = crear(fanout)
+    inicio = time.perf_counter()
+    for clave in claves:
+        arbol.insert(clave, clave)
+    resultado["insert_ops_s"] = _ops_por_segundo(n, time.perf_counter() - inicio)
+
+    search = arbol.search
+    inicio = time.perf_counter()
+    for clave in busquedas:
+        search(clave)
+    resultado["search_ops_s"] = _ops_por_segundo(consultas, time.perf_counter() - inicio)
+
+    desde = [rng.choice(claves) for _ in range(rangos)]
+    inicio = time.perf_counter()
+    leidas = 0
+    for d in desde:
+        leidas += sum(1 for _ in islice(arbol.range(d, None), largo_rango))
+    resultado["range_claves_s"] = _ops_por_segundo(leidas, time.perf_counter() - inicio)
+
+    borrar = claves[::2]
+    inicio = time.perf_counter()
+    for clave in borrar:
+        arbol.delete(clave)
+    resultado["delete_ops_s"] = _ops_por_segundo(len(borrar), time.perf_counter() - inicio)
+    if len(arbol) != n - len(borrar):
+        raise AssertionError(f"{motor}: quedaron {len(arbol)} claves, se esperaban {n - len(borrar)}")
+
+    if memoria:
+        del arbol
+        tracemalloc.start()
+        arbol = crear(fanout)
+        for clave in claves:
+            arbol.insert(clave, clave)
+        usados, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        resultado["bytes_por_clave"] = round(usados / n, 1)
+    return resultado
+
+
+def ejecutar(tamanos, cargas, motores, fanout=32, memoria=True, consultas=100_000, seed=42):
+    resultados = []
+    for n in tamanos:
+        for tipo in cargas:
+            for motor in motores:
+                fila = medir(motor, tipo, n, consultas=consultas, fanout=fanout,
+                             memoria=memoria, seed=seed)
+                print(json.dumps(fila, ensure_ascii=False), file=sys.stderr)
+                resultados.append(fila)
+    return resultados
+
+
+# === EJECUCIÓN ===
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de índices ordenados")
+    parser.add_argument("--tamanos", type=int, nargs="+", default=[1_000, 10_000, 100_000],
+                        help="cantidades de claves (hasta 10_000_000)")
+    parser.add_argument("--cargas", nargs="+", default=["aleatoria", "ordenada", "inversa", "zipfiana"])
+    parser.add_argument("--motores", nargs="+", default=list(MOTORES), choices=list(MOTORES))
+    parser.add_argument("--fanout", type=int, default=32)
+    parser.add_argument("--consultas", type=int, default=100_000)
+    parser.add_argument("--sin-memoria", action="store_true", help="omite la medición con tracemalloc")
+    parser.add_argument("--salida", help="archivo JSON de resultados (por defecto, stdout)")
+    args = parser.parse_args()
+
+    resultados = ejecutar(args.tamanos, args.cargas, args.motores, args.fanout,
+                          not args.sin_memoria, args.consultas)
+    texto = json.dumps(resultados, ensure_ascii=False, indent=2)
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            f.write(texto)
+    else:
+        print(texto)
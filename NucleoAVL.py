@@ -0,0 +1,989 @@
+"""
+NÚCLEO AVL - ESTRUCTURAS Y ALGORITMOS SIN DEPENDENCIAS DE GUI
+Curso: Estructuras de Datos y Algoritmos
+
+Funcionalidad:
+- Un único motor de inserción AVL con traza opcional (insertar_avl_iterativo)
+- Mensajes de traza en los dos estilos históricos: ArbolesAVL.py ("clasico")
+  y tempCodeRunnerFile.py ("visual")
+- ArbolAVL como mapa ordenado, versión persistente, arena compacta y layout
+- Se importa en milisegundos: solo usa la biblioteca estándar, sin PyQt5
+"""
+
+import time
+import random
+from array import array
+
+
+# === ESTRUCTURA AVL ===
+class NodoAVL:
+    __slots__ = ("clave", "izq", "der", "altura", "valor", "tamano")
+
+    def __init__(self, clave, valor=None):
+        self.clave = clave
+        self.izq = None
+        self.der = None
+        self.altura = 1
+        self.valor = valor
+        self.tamano = 1  # Nodos del subárbol; solo ArbolAVL lo mantiene
+
+
+def obtener_altura(nodo):
+    return nodo.altura if nodo else 0
+
+
+def actualizar_altura(nodo):
+    if nodo:
+        nodo.altura = 1 + max(obtener_altura(nodo.izq), obtener_altura(nodo.der))
+
+
+def obtener_balance(nodo):
+    return obtener_altura(nodo.izq) - obtener_altura(nodo.der) if nodo else 0
+
+
+def rotar_derecha(y):
+    x = y.izq
+    T2 = x.der
+    x.der = y
+    y.izq = T2
+    actualizar_altura(y)
+    actualizar_altura(x)
+    return x
+
+
+def rotar_izquierda(x):
+    y = x.der
+    T2 = y.izq
+    y.izq = x
+    x.der = T2
+    actualizar_altura(x)
+    actualizar_altura(y)
+    return y
+
+
+def insertar_avl_recursivo(raiz, clave, traza=None):
+    """Inserción recursiva original, conservada como referencia.
+
+    Es el algoritmo que compartían ArbolesAVL.py y tempCodeRunnerFile.py; en
+    lugar de escribir mensajes emite los mismos eventos que el motor iterativo.
+    """
+    if not raiz:
+        if traza:
+            traza("nuevo", clave)
+        return NodoAVL(clave)
+
+    if clave < raiz.clave:
+        if traza:
+            traza("izquierda", clave, raiz.clave)
+        raiz.izq = insertar_avl_recursivo(raiz.izq, clave, traza)
+    elif clave > raiz.clave:
+        if traza:
+            traza("derecha", clave, raiz.clave)
+        raiz.der = insertar_avl_recursivo(raiz.der, clave, traza)
+    else:
+        if traza:
+            traza("duplicado", clave)
+        return raiz
+
+    actualizar_altura(raiz)
+    balance = obtener_balance(raiz)
+
+    # Caso LL
+    if balance > 1 and clave < raiz.izq.clave:
+        if traza:
+            traza("rotacion", clave, raiz.clave, "LL")
+        return rotar_derecha(raiz)
+
+    # Caso RR
+    if balance < -1 and clave > raiz.der.clave:
+        if traza:
+            traza("rotacion", clave, raiz.clave, "RR")
+        return rotar_izquierda(raiz)
+
+    # Caso LR
+    if balance > 1 and clave > raiz.izq.clave:
+        if traza:
+            traza("rotacion", clave, raiz.clave, "LR")
+        raiz.izq = rotar_izquierda(raiz.izq)
+        return rotar_derecha(raiz)
+
+    # Caso RL
+    if balance < -1 and clave < raiz.der.clave:
+        if traza:
+            traza("rotacion", clave, raiz.clave, "RL")
+        raiz.der = rotar_derecha(raiz.der)
+        return rotar_izquierda(raiz)
+
+    return raiz
+
+
+# === MENSAJES DE TRAZA ===
+MENSAJES = {
+    # Textos de ArbolesAVL.py
+    "clasico": {
+        "nuevo": "Insertando <b>{clave}</b> como nuevo nodo.",
+        "izquierda": "➡️  {clave} < {nodo} → a la izquierda",
+        "derecha": "➡️  {clave} > {nodo} → a la derecha",
+        "duplicado": "<b>Duplicado:</b> {clave} ya existe.",
+        "LL": "⚖️  <b>Rotación Derecha (LL)</b> en {nodo}",
+        "RR": "⚖️  <b>Rotación Izquierda (RR)</b> en {nodo}",
+        "LR": "⚖️  <b>Rotación Doble: LR</b> en {nodo}",
+        "RL": "⚖️  <b>Rotación Doble: RL</b> en {nodo}",
+    },
+    # Textos de tempCodeRunnerFile.py
+    "visual": {
+        "nuevo": "🟢 Insertando nodo <b>{clave}</b> como raíz.",
+        "izquierda": "➡️  {clave} < {nodo}: bajando a la izquierda...",
+        "derecha": "➡️  {clave} > {nodo}: bajando a la derecha...",
+        "duplicado": "🟨 Duplicado: <b>{clave}</b> ya existe.",
+        "LL": "⚖️  <b>Rotación Derecha (LL)</b> en {nodo}",
+        "RR": "⚖️  <b>Rotación Izquierda (RR)</b> en {nodo}",
+        "LR": "⚖️  <b>Rotación LR</b> en {nodo}",
+        "RL": "⚖️  <b>Rotación RL</b> en {nodo}",
+    },
+}
+
+
+def traza_html(historial, estilo="clasico"):
+    """Hook de traza que escribe en `historial` los mensajes del estilo pedido"""
+    mensajes = MENSAJES[estilo]
+
+    def traza(evento, clave, nodo=None, caso=None):
+        plantilla = mensajes[caso if evento == "rotacion" else evento]
+        historial.append(plantilla.format(clave=clave, nodo=nodo))
+    return traza
+
+
+def insertar_avl(raiz, clave, historial, estilo="clasico"):
+    """Inserta `clave` y deja en `historial` el recorrido y las rotaciones"""
+    return insertar_avl_iterativo(raiz, clave, traza_html(historial, estilo))
+
+
+# === INSERCIÓN ITERATIVA ===
+def insertar_avl_iterativo(raiz, clave, traza=None):
+    """Misma inserción que insertar_avl_recursivo, sin recursión y sin armar texto.
+
+    Baja guardando el camino en una pila y sube desde la hoja nueva: se detiene
+    en cuanto una altura no cambia o tras la (única) rotación necesaria. La
+    traza es opcional: traza(evento, clave, nodo, caso).
+    """
+    if raiz is None:
+        if traza:
+            traza("nuevo", clave)
+        return NodoAVL(clave)
+
+    camino = []
+    nodo = raiz
+    while nodo is not None:
+        camino.append(nodo)
+        if clave < nodo.clave:
+            if traza:
+                traza("izquierda", clave, nodo.clave)
+            nodo = nodo.izq
+        elif clave > nodo.clave:
+            if traza:
+                traza("derecha", clave, nodo.clave)
+            nodo = nodo.der
+        else:
+            if traza:
+                traza("duplicado", clave)
+            return raiz
+
+    if traza:
+        traza("nuevo", clave)
+    padre = camino[-1]
+    if clave < padre.clave:
+        padre.izq = NodoAVL(clave)
+    else:
+        padre.der = NodoAVL(clave)
+
+    for i in range(len(camino) - 1, -1, -1):
+        nodo = camino[i]
+        alt_izq = nodo.izq.altura if nodo.izq else 0
+        alt_der = nodo.der.altura if nodo.der else 0
+        balance = alt_izq - alt_der
+        if -1 <= balance <= 1:
+            altura = 1 + (alt_izq if alt_izq > alt_der else alt_der)
+            if altura == nodo.altura:
+                return raiz  # Los ancestros no cambian
+            nodo.altura = altura
+            continue
+
+        if balance > 1:
+            caso = "LL" if clave < nodo.izq.clave else "LR"
+            if caso == "LR":
+                nodo.izq = rotar_izquierda(nodo.izq)
+            nueva = rotar_derecha(nodo)
+        else:
+            caso = "RR" if clave > nodo.der.clave else "RL"
+            if caso == "RL":
+                nodo.der = rotar_derecha(nodo.der)
+            nueva = rotar_izquierda(nodo)
+        if traza:
+            traza("rotacion", clave, nodo.clave, caso)
+
+        # Tras rotar, el subárbol recupera su altura previa: no hay más que ajustar
+        if i == 0:
+            return nueva
+        padre = camino[i - 1]
+        if padre.izq is nodo:
+            padre.izq = nueva
+        else:
+            padre.der = nueva
+        return raiz
+    return raiz
+
+
+def benchmark_insercion(n=200_000, seed=42):
+    """Compara la inserción recursiva (con historial) contra la versión iterativa"""
+    claves = random.Random(seed).sample(range(n * 10), n)
+    resultados = {"claves": n}
+
+    inicio = time.perf_counter()
+    raiz = None
+    for clave in claves:
+        raiz = insertar_avl_recursivo(raiz, clave, traza_html([]))
+    resultados["recursivo_s"] = round(time.perf_counter() - inicio, 3)
+
+    inicio = time.perf_counter()
+    raiz_it = None
+    for clave in claves:
+        raiz_it = insertar_avl_iterativo(raiz_it, clave)
+    resultados["iterativo_s"] = round(time.perf_counter() - inicio, 3)
+
+    resultados["aceleracion"] = round(resultados["recursivo_s"] / resultados["iterativo_s"], 2)
+    resultados["misma_altura"] = raiz.altura == raiz_it.altura
+    return resultados
+
+
+# === ÁRBOL AVL COMO ÍNDICE ORDENADO ===
+def _tamano(nodo):
+    return nodo.tamano if nodo else 0
+
+
+def _actualizar(nodo):
+    """Recalcula altura y tamaño del subárbol"""
+    nodo.altura = 1 + max(obtener_altura(nodo.izq), obtener_altura(nodo.der))
+    nodo.tamano = 1 + _tamano(nodo.izq) + _tamano(nodo.der)
+
+
+def _rotar_der(y):
+    x = y.izq
+    y.izq = x.der
+    x.der = y
+    _actualizar(y)
+    _actualizar(x)
+    return x
+
+
+def _rotar_izq(x):
+    y = x.der
+    x.der = y.izq
+    y.izq = x
+    _actualizar(x)
+    _actualizar(y)
+    return y
+
+
+def _rebalancear(nodo):
+    """Deja `nodo` balanceado; decide el caso por el balance del hijo (sirve tras borrar)"""
+    _actualizar(nodo)
+    balance = obtener_balance(nodo)
+    if balance > 1:
+        if obtener_balance(nodo.izq) < 0:
+            nodo.izq = _rotar_izq(nodo.izq)  # LR
+        return _rotar_der(nodo)
+    if balance < -1:
+        if obtener_balance(nodo.der) > 0:
+            nodo.der = _rotar_der(nodo.der)  # RL
+        return _rotar_izq(nodo)
+    return nodo
+
+
+def construir_balanceado(claves, valores=None):
+    """Árbol perfectamente balanceado desde claves ordenadas y sin repetir, en O(n).
+
+    Cada nodo toma el elemento central de su tramo, así que no hay ni una
+    rotación; devuelve la raíz con alturas y tamaños ya calculados.
+    """
+    def construir(lo, hi):
+        if lo >= hi:
+            return None
+        medio = (lo + hi) // 2
+        nodo = NodoAVL(claves[medio], claves[medio] if valores is None else valores[medio])
+        nodo.izq = construir(lo, medio)
+        nodo.der = construir(medio + 1, hi)
+        _actualizar(nodo)
+        return nodo
+    return construir(0, len(claves))
+
+
+def _unir(izq, medio, der):
+    """Une izq < medio < der bajando por el lado del árbol más alto: O(|alt(izq) - alt(der)|)"""
+    alt_izq, alt_der = obtener_altura(izq), obtener_altura(der)
+    if alt_izq > alt_der + 1:
+        izq.der = _unir(izq.der, medio, der)
+        return _rebalancear(izq)
+    if alt_der > alt_izq + 1:
+        der.izq = _unir(izq, medio, der.izq)
+        return _rebalancear(der)
+    medio.izq, medio.der = izq, der
+    _actualizar(medio)
+    return medio
+
+
+def _extraer_min(nodo):
+    """Devuelve (subárbol sin su mínimo, nodo mínimo)"""
+    if nodo.izq is None:
+        return nodo.der, nodo
+    nodo.izq, minimo = _extraer_min(nodo.izq)
+    return _rebalancear(nodo), minimo
+
+
+def _partir(nodo, clave):
+    """Devuelve (claves < clave, nodo con la clave o None, claves > clave)"""
+    if nodo is None:
+        return None, None, None
+    izq, der = nodo.izq, nodo.der
+    if clave < nodo.clave:
+        menores, hallado, mayores = _partir(izq, clave)
+        return menores, hallado, _unir(mayores, nodo, der)
+    if clave > nodo.clave:
+        menores, hallado, mayores = _partir(der, clave)
+        return _unir(izq, nodo, menores), hallado, mayores
+    return izq, nodo, der
+
+
+class ArbolAVL:
+    """Mapa ordenado sobre NodoAVL, con tamaño de subárbol para rank/select en O(log n).
+
+    Sin valor explícito, el valor guardado es la propia clave; para saber si una
+    clave existe use `clave in arbol`.
+    """
+
+    def __init__(self, claves=()):
+        self.raiz = None
+        for clave in claves:
+            self.insert(clave)
+
+    def __len__(self):
+        return _tamano(self.raiz)
+
+    def __contains__(self, clave):
+        return self._find(clave) is not None
+
+    def __iter__(self):
+        for clave, _ in self.range():
+            yield clave
+
+    @classmethod
+    def from_sorted(cls, claves, valores=None, ordenadas=True):
+        """Construye el árbol en O(n); con ordenadas=False primero ordena y quita repetidos"""
+        if not ordenadas:
+            pares = dict(zip(claves, claves if valores is None else valores))
+            claves = sorted(pares)
+            valores = [pares[c] for c in claves]
+        arbol = cls()
+        arbol.raiz = construir_balanceado(list(claves), None if valores is None else list(valores))
+        return arbol
+
+    def join(self, otro):
+        """Agrega al final las claves de `otro`, todas mayores que las propias, en O(log n).
+
+        `otro` queda vacío: sus nodos pasan a este árbol.
+        """
+        if otro.raiz is None:
+            return self
+        if self.raiz is not None and not self.max() < otro.min():
+            raise ValueError("join requiere que todas las claves de `otro` sean mayores")
+        resto, medio = _extraer_min(otro.raiz)
+        self.raiz = _unir(self.raiz, medio, resto)
+        otro.raiz = None
+        return self
+
+    def split(self, clave):
+        """Parte en (claves < clave, claves >= clave) en O(log n); este árbol queda vacío"""
+        menores, hallado, mayores = _partir(self.raiz, clave)
+        if hallado is not None:
+            mayores = _unir(None, hallado, mayores)
+        self.raiz = None
+        izq, der = ArbolAVL(), ArbolAVL()
+        izq.raiz, der.raiz = menores, mayores
+        return izq, der
+
+    def _find(self, clave):
+        nodo = self.raiz
+        while nodo is not None:
+            if clave < nodo.clave:
+                nodo = nodo.izq
+            elif clave > nodo.clave:
+                nodo = nodo.der
+            else:
+                return nodo
+        return None
+
+    def search(self, clave, default=None):
+        nodo = self._find(clave)
+        return nodo.valor if nodo is not None else default
+
+    def insert(self, clave, valor=None):
+        """Inserta o actualiza; devuelve "agregado" o "actualizado" """
+        self._resultado = "agregado"
+        self.raiz = self._insert(self.raiz, clave, clave if valor is None else valor)
+        return self._resultado
+
+    def _insert(self, nodo, clave, valor):
+        if nodo is None:
+            return NodoAVL(clave, valor)
+        if clave < nodo.clave:
+            nodo.izq = self._insert(nodo.izq, clave, valor)
+        elif clave > nodo.clave:
+            nodo.der = self._insert(nodo.der, clave, valor)
+        else:
+            nodo.valor = valor
+            self._resultado = "actualizado"
+            return nodo
+        return _rebalancear(nodo)
+
+    def delete(self, clave):
+        """Elimina la clave rebalanceando en el camino de vuelta; False si no estaba"""
+        if self._find(clave) is None:
+            return False
+        self.raiz = self._delete(self.raiz, clave)
+        return True
+
+    def _delete(self, nodo, clave):
+        if clave < nodo.clave:
+            nodo.izq = self._delete(nodo.izq, clave)
+        elif clave > nodo.clave:
+            nodo.der = self._delete(nodo.der, clave)
+        else:
+            if nodo.izq is None:
+                return nodo.der
+            if nodo.der is None:
+                return nodo.izq
+            # Dos hijos: el sucesor ocupa su lugar
+            sucesor = nodo.der
+            while sucesor.izq is not None:
+                sucesor = sucesor.izq
+            nodo.clave, nodo.valor = sucesor.clave, sucesor.valor
+            nodo.der = self._delete(nodo.der, sucesor.clave)
+        return _rebalancear(nodo)
+
+    def min(self):
+        nodo = self.raiz
+        if nodo is None:
+            raise ValueError("El árbol está vacío")
+        while nodo.izq is not None:
+            nodo = nodo.izq
+        return nodo.clave
+
+    def max(self):
+        nodo = self.raiz
+        if nodo is None:
+            raise ValueError("El árbol está vacío")
+        while nodo.der is not None:
+            nodo = nodo.der
+        return nodo.clave
+
+    def floor(self, clave):
+        """Mayor clave <= clave, o None"""
+        nodo, mejor = self.raiz, None
+        while nodo is not None:
+            if clave < nodo.clave:
+                nodo = nodo.izq
+            else:
+                mejor = nodo.clave
+                if clave == nodo.clave:
+                    break
+                nodo = nodo.der
+        return mejor
+
+    def ceiling(self, clave):
+        """Menor clave >= clave, o None"""
+        nodo, mejor = self.raiz, None
+        while nodo is not None:
+            if clave > nodo.clave:
+                nodo = nodo.der
+            else:
+                mejor = nodo.clave
+                if clave == nodo.clave:
+                    break
+                nodo = nodo.izq
+        return mejor
+
+    def range(self, desde=None, hasta=None):
+        """Genera (clave, valor) en orden con desde <= clave <= hasta (None = sin límite)"""
+        pila = []
+        nodo = self.raiz
+        while pila or nodo is not None:
+            if nodo is not None:
+                if desde is not None and nodo.clave < desde:
+                    nodo = nodo.der  # Todo el subárbol izquierdo queda fuera
+                else:
+                    pila.append(nodo)
+                    nodo = nodo.izq
+                continue
+            nodo = pila.pop()
+            if hasta is not None and nodo.clave > hasta:
+                return
+            yield nodo.clave, nodo.valor
+            nodo = nodo.der
+
+    def rank(self, clave):
+        """Cantidad de claves menores que `clave`"""
+        nodo, menores = self.raiz, 0
+        while nodo is not None:
+            if clave <= nodo.clave:
+                nodo = nodo.izq
+            else:
+                menores += _tamano(nodo.izq) + 1
+                nodo = nodo.der
+        return menores
+
+    def select(self, k):
+        """k-ésima clave en orden (desde 0)"""
+        if not 0 <= k < len(self):
+            raise IndexError(f"Posición fuera de rango: {k}")
+        nodo = self.raiz
+        while True:
+            izquierda = _tamano(nodo.izq)
+            if k < izquierda:
+                nodo = nodo.izq
+            elif k == izquierda:
+                return nodo.clave
+            else:
+                k -= izquierda + 1
+                nodo = nodo.der
+
+    def verificar(self):
+        """Comprueba orden, alturas, tamaños y balance; lanza AssertionError si algo falla"""
+        def revisar(nodo, desde, hasta):
+            if nodo is None:
+                return 0, 0
+            assert desde is None or nodo.clave > desde, f"Orden roto en {nodo.clave}"
+            assert hasta is None or nodo.clave < hasta, f"Orden roto en {nodo.clave}"
+            alt_izq, tam_izq = revisar(nodo.izq, desde, nodo.clave)
+            alt_der, tam_der = revisar(nodo.der, nodo.clave, hasta)
+            assert abs(alt_izq - alt_der) <= 1, f"Desbalance en {nodo.clave}"
+            assert nodo.altura == 1 + max(alt_izq, alt_der), f"Altura errónea en {nodo.clave}"
+            assert nodo.tamano == 1 + tam_izq + tam_der, f"Tamaño erróneo en {nodo.clave}"
+            return nodo.altura, nodo.tamano
+        revisar(self.raiz, None, None)
+        return True
+
+
+# === ÁRBOL AVL PERSISTENTE (COPIA DE CAMINO) ===
+def _nodo_p(clave, valor, izq, der):
+    nodo = NodoAVL(clave, valor)
+    nodo.izq, nodo.der = izq, der
+    _actualizar(nodo)
+    return nodo
+
+
+def _balancear_p(clave, valor, izq, der):
+    """Como _rebalancear, pero rota creando nodos nuevos en vez de modificar los existentes"""
+    alt_izq, alt_der = obtener_altura(izq), obtener_altura(der)
+    if alt_izq > alt_der + 1:
+        if obtener_altura(izq.izq) >= obtener_altura(izq.der):  # LL
+            return _nodo_p(izq.clave, izq.valor, izq.izq, _nodo_p(clave, valor, izq.der, der))
+        m = izq.der  # LR
+        return _nodo_p(m.clave, m.valor, _nodo_p(izq.clave, izq.valor, izq.izq, m.izq),
+                       _nodo_p(clave, valor, m.der, der))
+    if alt_der > alt_izq + 1:
+        if obtener_altura(der.der) >= obtener_altura(der.izq):  # RR
+            return _nodo_p(der.clave, der.valor, _nodo_p(clave, valor, izq, der.izq), der.der)
+        m = der.izq  # RL
+        return _nodo_p(m.clave, m.valor, _nodo_p(clave, valor, izq, m.izq),
+                       _nodo_p(der.clave, der.valor, m.der, der.der))
+    return _nodo_p(clave, valor, izq, der)
+
+
+def _insertar_p(nodo, clave, valor):
+    if nodo is None:
+        return _nodo_p(clave, valor, None, None)
+    if clave < nodo.clave:
+        return _balancear_p(nodo.clave, nodo.valor, _insertar_p(nodo.izq, clave, valor), nodo.der)
+    if clave > nodo.clave:
+        return _balancear_p(nodo.clave, nodo.valor, nodo.izq, _insertar_p(nodo.der, clave, valor))
+    return _nodo_p(clave, valor, nodo.izq, nodo.der)
+
+
+def _borrar_p(nodo, clave):
+    if clave < nodo.clave:
+        return _balancear_p(nodo.clave, nodo.valor, _borrar_p(nodo.izq, clave), nodo.der)
+    if clave > nodo.clave:
+        return _balancear_p(nodo.clave, nodo.valor, nodo.izq, _borrar_p(nodo.der, clave))
+    if nodo.izq is None:
+        return nodo.der
+    if nodo.der is None:
+        return nodo.izq
+    sucesor = nodo.der
+    while sucesor.izq is not None:
+        sucesor = sucesor.izq
+    return _balancear_p(sucesor.clave, sucesor.valor, nodo.izq, _borrar_p(nodo.der, sucesor.clave))
+
+
+def _unir_p(izq, clave, valor, der):
+    alt_izq, alt_der = obtener_altura(izq), obtener_altura(der)
+    if alt_izq > alt_der + 1:
+        return _balancear_p(izq.clave, izq.valor, izq.izq, _unir_p(izq.der, clave, valor, der))
+    if alt_der > alt_izq + 1:
+        return _balancear_p(der.clave, der.valor, _unir_p(izq, clave, valor, der.izq), der.der)
+    return _nodo_p(clave, valor, izq, der)
+
+
+def _partir_p(nodo, clave):
+    """Devuelve (claves < clave, nodo con la clave o None, claves > clave) sin tocar `nodo`"""
+    if nodo is None:
+        return None, None, None
+    if clave < nodo.clave:
+        menores, hallado, mayores = _partir_p(nodo.izq, clave)
+        return menores, hallado, _unir_p(mayores, nodo.clave, nodo.valor, nodo.der)
+    if clave > nodo.clave:
+        menores, hallado, mayores = _partir_p(nodo.der, clave)
+        return _unir_p(nodo.izq, nodo.clave, nodo.valor, menores), hallado, mayores
+    return nodo.izq, nodo, nodo.der
+
+
+class ArbolAVLPersistente(ArbolAVL):
+    """AVL inmutable: cada cambio devuelve un árbol nuevo y el anterior sigue válido.
+
+    Solo se copian los O(log n) nodos del camino modificado; el resto se
+    comparte entre versiones. Como ningún nodo se modifica después de creado,
+    guardar una versión cuesta O(1) y varios hilos pueden leerla sin locks.
+    Las consultas (search, range, rank, select...) son las de ArbolAVL.
+    """
+
+    def __init__(self, claves=(), raiz=None):
+        self.raiz = raiz
+        for clave in claves:
+            self.raiz = _insertar_p(self.raiz, clave, clave)
+
+    def insert(self, clave, valor=None):
+        valor = clave if valor is None else valor
+        return ArbolAVLPersistente(raiz=_insertar_p(self.raiz, clave, valor))
+
+    def delete(self, clave):
+        if self._find(clave) is None:
+            return self
+        return ArbolAVLPersistente(raiz=_borrar_p(self.raiz, clave))
+
+    def join(self, otro):
+        """Árbol con las claves de ambos (las de `otro` deben ser mayores); ninguno cambia"""
+        if otro.raiz is None:
+            return self
+        if self.raiz is not None and not self.max() < otro.min():
+            raise ValueError("join requiere que todas las claves de `otro` sean mayores")
+        minimo = otro.min()
+        resto = _borrar_p(otro.raiz, minimo)
+        return ArbolAVLPersistente(raiz=_unir_p(self.raiz, minimo, otro.search(minimo), resto))
+
+    def split(self, clave):
+        """(claves < clave, claves >= clave) como árboles nuevos; este no cambia"""
+        menores, hallado, mayores = _partir_p(self.raiz, clave)
+        if hallado is not None:
+            mayores = _unir_p(None, hallado.clave, hallado.valor, mayores)
+        return ArbolAVLPersistente(raiz=menores), ArbolAVLPersistente(raiz=mayores)
+
+
+class HistorialAVL:
+    """Todas las versiones de un árbol persistente, para avanzar y retroceder en el tiempo"""
+
+    def __init__(self, arbol=None):
+        self.versiones = [arbol if arbol is not None else ArbolAVLPersistente()]
+
+    def __len__(self):
+        return len(self.versiones)
+
+    def __getitem__(self, i):
+        return self.versiones[i]
+
+    @property
+    def actual(self):
+        return self.versiones[-1]
+
+    def insert(self, clave, valor=None):
+        self.versiones.append(self.actual.insert(clave, valor))
+        return self.actual
+
+    def delete(self, clave):
+        self.versiones.append(self.actual.delete(clave))
+        return self.actual
+
+    def nodos_compartidos(self, i, j):
+        """Nodos de la versión j que ya estaban en la versión i"""
+        vistos = set()
+        pila = [self.versiones[i].raiz]
+        while pila:
+            nodo = pila.pop()
+            if nodo is not None and id(nodo) not in vistos:
+                vistos.add(id(nodo))
+                pila.extend((nodo.izq, nodo.der))
+        compartidos = 0
+        pila = [self.versiones[j].raiz]
+        while pila:
+            nodo = pila.pop()
+            if nodo is None:
+                continue
+            if id(nodo) in vistos:
+                compartidos += nodo.tamano  # Un subárbol compartido se comparte entero
+            else:
+                pila.extend((nodo.izq, nodo.der))
+        return compartidos
+
+
+# === ÁRBOL AVL COMPACTO EN ARREGLOS (ARENA) ===
+class ArbolAVLArena:
+    """AVL sin objetos por nodo: cada nodo es un índice entero en arreglos paralelos.
+
+    Claves, hijos y alturas viven en `array` planos; el índice 0 es el nodo
+    nulo (altura 0), así que no hace falta preguntar por None. Con
+    typecode=None las claves van en una lista y pueden ser de cualquier tipo.
+    Los índices que libera delete quedan en `libres` y las altas los reutilizan
+    antes de hacer crecer los arreglos.
+    """
+
+    def __init__(self, claves=(), typecode="q"):
+        self.claves = array(typecode, [0]) if typecode else [None]
+        self.izq = array("i", [0])
+        self.der = array("i", [0])
+        self.alturas = array("b", [0])
+        self.valores = [None]
+        self.libres = []
+        self.raiz = 0
+        for clave in claves:
+            self.insert(clave)
+
+    def __len__(self):
+        return len(self.alturas) - 1 - len(self.libres)
+
+    def __contains__(self, clave):
+        return self._find(clave) != 0
+
+    def __iter__(self):
+        pila, n = [], self.raiz
+        while pila or n:
+            if n:
+                pila.append(n)
+                n = self.izq[n]
+            else:
+                n = pila.pop()
+                yield self.claves[n]
+                n = self.der[n]
+
+    def _nuevo(self, clave, valor):
+        if self.libres:
+            n = self.libres.pop()
+            self.claves[n] = clave
+            self.izq[n] = self.der[n] = 0
+            self.alturas[n] = 1
+            self.valores[n] = valor
+            return n
+        self.claves.append(clave)
+        self.izq.append(0)
+        self.der.append(0)
+        self.alturas.append(1)
+        self.valores.append(valor)
+        return len(self.alturas) - 1
+
+    def _actualizar(self, n):
+        ai, ad = self.alturas[self.izq[n]], self.alturas[self.der[n]]
+        self.alturas[n] = 1 + (ai if ai > ad else ad)
+
+    def _rotar_der(self, y):
+        x = self.izq[y]
+        self.izq[y] = self.der[x]
+        self.der[x] = y
+        self._actualizar(y)
+        self._actualizar(x)
+        return x
+
+    def _rotar_izq(self, x):
+        y = self.der[x]
+        self.der[x] = self.izq[y]
+        self.izq[y] = x
+        self._actualizar(x)
+        self._actualizar(y)
+        return y
+
+    def _rebalancear(self, n):
+        """Como _rebalancear de los nodos, pero con índices"""
+        izq, der, alturas = self.izq, self.der, self.alturas
+        self._actualizar(n)
+        balance = alturas[izq[n]] - alturas[der[n]]
+        if balance > 1:
+            if alturas[izq[izq[n]]] < alturas[der[izq[n]]]:
+                izq[n] = self._rotar_izq(izq[n])  # LR
+            return self._rotar_der(n)
+        if balance < -1:
+            if alturas[der[der[n]]] < alturas[izq[der[n]]]:
+                der[n] = self._rotar_der(der[n])  # RL
+            return self._rotar_izq(n)
+        return n
+
+    def _find(self, clave):
+        claves, izq, der = self.claves, self.izq, self.der
+        n = self.raiz
+        while n:
+            c = claves[n]
+            if clave < c:
+                n = izq[n]
+            elif clave > c:
+                n = der[n]
+            else:
+                return n
+        return 0
+
+    def search(self, clave, default=None):
+        n = self._find(clave)
+        if not n:
+            return default
+        valor = self.valores[n]
+        return self.claves[n] if valor is None else valor
+
+    def insert(self, clave, valor=None):
+        """Inserción iterativa con pila de índices, como insertar_avl_iterativo"""
+        if not self.raiz:
+            self.raiz = self._nuevo(clave, valor)
+            return "agregado"
+        claves, izq, der, alturas = self.claves, self.izq, self.der, self.alturas
+        camino = []
+        n = self.raiz
+        while n:
+            camino.append(n)
+            c = claves[n]
+            if clave < c:
+                n = izq[n]
+            elif clave > c:
+                n = der[n]
+            else:
+                self.valores[n] = valor
+                return "actualizado"
+
+        nuevo = self._nuevo(clave, valor)
+        padre = camino[-1]
+        if clave < claves[padre]:
+            izq[padre] = nuevo
+        else:
+            der[padre] = nuevo
+
+        for i in range(len(camino) - 1, -1, -1):
+            n = camino[i]
+            ai, ad = alturas[izq[n]], alturas[der[n]]
+            balance = ai - ad
+            if -1 <= balance <= 1:
+                altura = 1 + (ai if ai > ad else ad)
+                if altura == alturas[n]:
+                    break
+                alturas[n] = altura
+                continue
+            if balance > 1:
+                if clave > claves[izq[n]]:
+                    izq[n] = self._rotar_izq(izq[n])  # LR
+                nueva = self._rotar_der(n)
+            else:
+                if clave < claves[der[n]]:
+                    der[n] = self._rotar_der(der[n])  # RL
+                nueva = self._rotar_izq(n)
+            if i == 0:
+                self.raiz = nueva
+            elif izq[camino[i - 1]] == n:
+                izq[camino[i - 1]] = nueva
+            else:
+                der[camino[i - 1]] = nueva
+            break
+        return "agregado"
+
+    def delete(self, clave):
+        """Elimina la clave y deja su índice en `libres`; False si no estaba"""
+        if not self._find(clave):
+            return False
+        self.raiz = self._delete(self.raiz, clave)
+        return True
+
+    def _delete(self, n, clave):
+        c = self.claves[n]
+        if clave < c:
+            self.izq[n] = self._delete(self.izq[n], clave)
+        elif clave > c:
+            self.der[n] = self._delete(self.der[n], clave)
+        else:
+            if not self.izq[n] or not self.der[n]:
+                hijo = self.izq[n] or self.der[n]
+                self.valores[n] = None  # No retener el valor hasta que se reutilice el índice
+                self.libres.append(n)
+                return hijo
+            # Dos hijos: el sucesor ocupa su lugar
+            sucesor = self.der[n]
+            while self.izq[sucesor]:
+                sucesor = self.izq[sucesor]
+            self.claves[n], self.valores[n] = self.claves[sucesor], self.valores[sucesor]
+            self.der[n] = self._delete(self.der[n], self.claves[sucesor])
+        return self._rebalancear(n)
+
+    def altura(self):
+        return self.alturas[self.raiz]
+
+
+def benchmark_memoria(n=200_000, seed=42):
+    """Bytes por clave de ArbolAVL (nodos con __slots__) frente a ArbolAVLArena"""
+    import tracemalloc  # arrastra re/fnmatch: fuera del import del módulo
+
+    claves = random.Random(seed).sample(range(n * 10), n)
+    resultados = {"claves": n}
+    for nombre, construir in (("nodos", ArbolAVL), ("arena", ArbolAVLArena)):
+        tracemalloc.start()
+        inicio = time.perf_counter()
+        arbol = construir(claves)
+        segundos = time.perf_counter() - inicio
+        memoria, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        resultados[f"{nombre}_bytes_por_clave"] = round(memoria / n, 1)
+        resultados[f"{nombre}_construccion_s"] = round(segundos, 3)
+        del arbol
+    return resultados
+
+
+# === LAYOUT DEL ÁRBOL (SIN GUI) ===
+def calcular_layout(raiz, separacion=1.0):
+    """Posiciones ordenadas (al estilo Reingold–Tilford) de todos los nodos.
+
+    Cada subárbol se coloca por separado y el derecho se acerca al izquierdo
+    hasta que sus contornos quedan a `separacion`; el padre se centra sobre
+    ambos. Devuelve una lista de tuplas (x, profundidad, clave, balance,
+    índice del padre o -1), con el balance ya calculado una sola vez.
+    """
+    if raiz is None:
+        return []
+    desplazamiento = {}  # nodo -> x relativa a su padre
+
+    def colocar(nodo):
+        """Devuelve los contornos (mínimo, máximo) de x por nivel, relativos al nodo"""
+        izq = colocar(nodo.izq) if nodo.izq else None
+        der = colocar(nodo.der) if nodo.der else None
+        if izq and der:
+            d = max(a - b for a, b in zip(izq[1], der[0])) + separacion
+            desplazamiento[nodo.izq], desplazamiento[nodo.der] = -d / 2, d / 2
+            minimos = [m - d / 2 for m in izq[0]] + [m + d / 2 for m in der[0][len(izq[0]):]]
+            maximos = [m + d / 2 for m in der[1]] + [m - d / 2 for m in izq[1][len(der[1]):]]
+            return [0.0] + minimos, [0.0] + maximos
+        if izq or der:
+            hijo, sub = (nodo.izq, izq) if izq else (nodo.der, der)
+            d = -separacion / 2 if izq else separacion / 2
+            desplazamiento[hijo] = d
+            return [0.0] + [m + d for m in sub[0]], [0.0] + [m + d for m in sub[1]]
+        return [0.0], [0.0]
+
+    colocar(raiz)
+    nodos = []
+    pila = [(raiz, 0.0, 0, -1)]
+    while pila:
+        nodo, x_padre, profundidad, padre = pila.pop()
+        x = x_padre + desplazamiento.get(nodo, 0.0)
+        nodos.append((x, profundidad, nodo.clave, obtener_balance(nodo), padre))
+        indice = len(nodos) - 1
+        for hijo in (nodo.der, nodo.izq):
+            if hijo is not None:
+                pila.append((hijo, x, profundidad + 1, indice))
+    return nodos
@@ -0,0 +1,1186 @@
+"""
+NÚCLEO DE LA AGENDA - TABLAS HASH E ÍNDICES SIN DEPENDENCIAS DE GUI
+Curso: Estructuras de Datos y Algoritmos
+
+Funcionalidad:
+- Diccionario con hashing y chaining, y alternativa con direccionamiento abierto
+- Índices por prefijo, tolerante a errores y por teléfono
+- Almacenamiento persistente en disco con mmap y log de operaciones
+- Variante concurrente con un lock por franja de buckets
+- Métricas opcionales y comparativas de rendimiento
+- Se importa sin PyQt5: AgendaContactos.py es la interfaz
+"""
+
+import os
+import csv
+import mmap
+import time
+import struct
+import zlib
+import threading
+import json
+import hashlib
+import random
+import unicodedata
+from array import array
+from bisect import bisect_left, insort
+
+
+# === FUNCIONES HASH ===
+_FNV_OFFSET = 0xCBF29CE484222325
+_FNV_PRIME = 0x100000001B3
+_MASK64 = 0xFFFFFFFFFFFFFFFF
+
+
+def hash_ascii(key):
+    """Suma de valores ASCII (versión original): los anagramas colisionan"""
+    return sum(ord(char) for char in key)
+
+
+def hash_fnv1a(key):
+    """FNV-1a de 64 bits sobre los bytes UTF-8 de la clave"""
+    h = _FNV_OFFSET
+    for byte in key.encode("utf-8"):
+        h = ((h ^ byte) * _FNV_PRIME) & _MASK64
+    return h
+
+
+def crear_funcion_hash(estrategia="fnv1a", seed=None):
+    """Devuelve la función hash pedida; 'python' y 'blake2b' usan una semilla por tabla"""
+    if callable(estrategia):
+        return estrategia
+    if estrategia == "ascii":
+        return hash_ascii
+    if estrategia == "fnv1a":
+        return hash_fnv1a
+    if seed is None:
+        seed = random.getrandbits(64)
+    if estrategia == "python":
+        return lambda key: hash((seed, key))
+    if estrategia == "blake2b":
+        # Hash con clave (al estilo SipHash): resistente a colisiones provocadas
+        clave = seed.to_bytes(16, "little")
+        return lambda key: int.from_bytes(
+            hashlib.blake2b(key.encode("utf-8"), digest_size=8, key=clave).digest(), "little"
+        )
+    raise ValueError(f"Estrategia hash desconocida: {estrategia}")
+
+
+# === ÍNDICES SECUNDARIOS DE NOMBRES ===
+def normalizar_nombre(nombre):
+    """Minúsculas y sin tildes, para que 'perez' encuentre a 'Pérez'"""
+    texto = unicodedata.normalize("NFKD", nombre.casefold())
+    return "".join(c for c in texto if not unicodedata.combining(c)).strip()
+
+
+def distancia_edicion(a, b, maximo=None):
+    """Distancia de Levenshtein; corta en maximo + 1 si ya no puede bajar de ahí"""
+    if len(a) < len(b):
+        a, b = b, a
+    if maximo is not None and len(a) - len(b) > maximo:
+        return maximo + 1
+    anterior = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        actual = [i]
+        for j, cb in enumerate(b, 1):
+            actual.append(min(anterior[j] + 1, actual[j - 1] + 1, anterior[j - 1] + (ca != cb)))
+        if maximo is not None and min(actual) > maximo:
+            return maximo + 1
+        anterior = actual
+    return anterior[-1]
+
+
+class IndicePrefijos:
+    """Arreglo ordenado de (nombre normalizado, nombre); los prefijos se ubican con bisect"""
+
+    def __init__(self):
+        self.entries = []
+        self.cargando = False  # Carga masiva: se agrega al final y se ordena una vez al terminar
+
+    def add(self, nombre):
+        entry = (normalizar_nombre(nombre), nombre)
+        if self.cargando:
+            self.entries.append(entry)
+        else:
+            insort(self.entries, entry)  # O(n) por el corrimiento: bien de a uno, no en lote
+
+    def terminar_carga(self):
+        self.entries.sort()
+        self.cargando = False
+
+    def remove(self, nombre):
+        entry = (normalizar_nombre(nombre), nombre)
+        i = bisect_left(self.entries, entry)
+        if i < len(self.entries) and self.entries[i] == entry:
+            del self.entries[i]
+
+    def search(self, prefijo, limit=None):
+        """O(log n + k): salta al primer candidato y avanza mientras coincida"""
+        prefijo = normalizar_nombre(prefijo)
+        entries = self.entries
+        i = bisect_left(entries, (prefijo,))
+        found = []
+        while i < len(entries) and entries[i][0].startswith(prefijo):
+            if limit is not None and len(found) >= limit:
+                break
+            found.append(entries[i][1])
+            i += 1
+        return found
+
+
+class IndiceDifuso:
+    """Índice de n-gramas: los candidatos comparten n-gramas y se confirman con Levenshtein"""
+
+    def __init__(self, n=3):
+        self.n = n
+        self.grams = {}       # n-grama -> conjunto de nombres
+        self.normalized = {}  # nombre -> forma normalizada
+
+    def _ngrams(self, texto):
+        texto = " " * (self.n - 1) + texto + " "
+        return {texto[i:i + self.n] for i in range(len(texto) - self.n + 1)}
+
+    def add(self, nombre):
+        clave = normalizar_nombre(nombre)
+        self.normalized[nombre] = clave
+        for gram in self._ngrams(clave):
+            self.grams.setdefault(gram, set()).add(nombre)
+
+    def remove(self, nombre):
+        clave = self.normalized.pop(nombre, None)
+        if clave is None:
+            return
+        for gram in self._ngrams(clave):
+            nombres = self.grams.get(gram)
+            if nombres is not None:
+                nombres.discard(nombre)
+                if not nombres:
+                    del self.grams[gram]
+
+    def search(self, consulta, max_dist=2, limit=10):
+        consulta = normalizar_nombre(consulta)
+        grams = self._ngrams(consulta)
+        shared = {}
+        for gram in grams:
+            for nombre in self.grams.get(gram, ()):
+                shared[nombre] = shared.get(nombre, 0) + 1
+        # Cada edición altera a lo sumo n n-gramas: por debajo de esto no hay coincidencia
+        minimo = len(grams) - max_dist * self.n
+        if minimo > 0:
+            candidatos = [nombre for nombre, comunes in shared.items() if comunes >= minimo]
+        else:
+            candidatos = self.normalized  # Consulta corta: puede no compartir ningún n-grama
+        results = []
+        for nombre in candidatos:
+            d = distancia_edicion(consulta, self.normalized[nombre], max_dist)
+            if d <= max_dist:
+                results.append((d, nombre))
+        results.sort()
+        return [nombre for _, nombre in results[:limit]]
+
+
+# === MÉTRICAS DE OPERACIONES ===
+class MetricasHash:
+    """Cuenta operaciones, comparaciones y latencias; guarda eventos de redimensión.
+
+    Las latencias se conservan en un muestreo de reservorio de tamaño fijo, así
+    que la memoria no crece con el número de operaciones.
+    """
+
+    def __init__(self, reservoir=10_000, seed=None):
+        self.reservoir = reservoir
+        self.rng = random.Random(seed)
+        self.ops = {}
+        self.resize_events = []
+        self.started = time.perf_counter()
+        self.lock = threading.Lock()  # Las lecturas sin lock de HashTableConcurrente registran a la vez
+
+    def record(self, op, nanos, comparisons):
+        with self.lock:
+            self._record(op, nanos, comparisons)
+
+    def _record(self, op, nanos, comparisons):
+        stats = self.ops.get(op)
+        if stats is None:
+            stats = self.ops[op] = {"n": 0, "ns_total": 0, "comparaciones": 0,
+                                    "comparaciones_max": 0, "muestras": []}
+        stats["n"] += 1
+        stats["ns_total"] += nanos
+        stats["comparaciones"] += comparisons
+        stats["comparaciones_max"] = max(stats["comparaciones_max"], comparisons)
+        samples = stats["muestras"]
+        if len(samples) < self.reservoir:
+            samples.append(nanos)
+        else:
+            j = self.rng.randrange(stats["n"])
+            if j < self.reservoir:
+                samples[j] = nanos
+
+    def record_resize(self, old_size, new_size, count):
+        self.resize_events.append({
+            "t": round(time.perf_counter() - self.started, 6),
+            "desde": old_size,
+            "hasta": new_size,
+            "contactos": count,
+        })
+
+    @staticmethod
+    def _percentile(ordered, p):
+        return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))]
+
+    def summary(self):
+        report = {}
+        for op, stats in self.ops.items():
+            ordered = sorted(stats["muestras"])
+            report[op] = {
+                "operaciones": stats["n"],
+                "comparaciones_media": round(stats["comparaciones"] / stats["n"], 3),
+                "comparaciones_max": stats["comparaciones_max"],
+                "latencia_media_us": round(stats["ns_total"] / stats["n"] / 1000, 3),
+                **{f"latencia_p{p}_us": round(self._percentile(ordered, p) / 1000, 3)
+                   for p in (50, 90, 99)},
+                "latencia_max_us": round(ordered[-1] / 1000, 3),
+            }
+        return report
+
+
+# === ESTRUCTURA HASH CON CHAINING ===
+class HashTable:
+    def __init__(self, size=10, max_load=0.75, min_load=0.0, rehash_step=4,
+                 hash_func="fnv1a", seed=None, name_index=False, fuzzy_index=False,
+                 bidirectional=False, metrics=False):
+        if min_load and min_load >= max_load / 2:
+            # Crecer deja la carga en max_load / 2 y achicar la duplica: con min_load
+            # desde ahí, la tabla oscilaría entre dos tamaños de una operación a otra
+            raise ValueError("min_load debe ser menor que max_load / 2")
+        self.size = size
+        self.table = [[] for _ in range(size)]  # Chaining con listas
+        self.count = 0
+        self.initial_size = size
+        self.max_load = max_load        # Factor de carga que dispara el crecimiento
+        self.min_load = min_load        # 0 desactiva la reducción
+        self.rehash_step = rehash_step  # Buckets migrados por operación
+        self.resize_count = 0
+        # Rehash incremental: tabla anterior pendiente de migrar
+        self._old_table = None
+        self._old_size = 0
+        self._rehash_pos = 0
+        self.hash_name = hash_func if isinstance(hash_func, str) else hash_func.__name__
+        self._hash_func = crear_funcion_hash(hash_func, seed)
+        # Índices secundarios opcionales, sincronizados en insert/delete
+        self.prefix_index = IndicePrefijos() if name_index else None
+        self.fuzzy_index = IndiceDifuso() if fuzzy_index else None
+        # Modo bidireccional: segunda tabla hash teléfono -> tupla de nombres
+        self.phone_index = (HashTable(size, max_load, min_load, rehash_step, hash_func, seed)
+                            if bidirectional else None)
+        # Métricas opcionales: sin ellas no se mide el tiempo ni se registra nada
+        self.metrics = MetricasHash() if metrics else None
+
+    def _measured(self, op, method, *args):
+        """Ejecuta `method`, que devuelve (resultado, claves comparadas), y lo registra"""
+        if self.metrics is None:
+            return method(*args)[0]
+        start = time.perf_counter_ns()
+        result, comparisons = method(*args)
+        self.metrics.record(op, time.perf_counter_ns() - start, comparisons)
+        return result
+
+    def _hash(self, key, size=None):
+        """Índice del bucket: función hash elegida módulo tamaño"""
+        return self._hash_func(key) % (size or self.size)
+
+    def _bucket(self, key):
+        """Devuelve el bucket donde vive la clave (tabla vieja si aún no migró)"""
+        if self._old_table is not None:
+            old_index = self._hash(key, self._old_size)
+            if old_index >= self._rehash_pos:
+                return self._old_table[old_index]
+        return self.table[self._hash(key)]
+
+    def _start_resize(self, new_size):
+        """Crea la nueva tabla; los buckets se migran poco a poco en cada operación"""
+        if self._old_table is not None:
+            self.complete_rehash()
+        self._old_table = self.table
+        self._old_size = self.size
+        self._rehash_pos = 0
+        self.size = new_size
+        self.table = [[] for _ in range(new_size)]
+        self.resize_count += 1
+        if self.metrics is not None:
+            self.metrics.record_resize(self._old_size, new_size, self.count)
+
+    def _rehash_some(self, steps=None):
+        """Migra hasta `rehash_step` buckets de la tabla vieja a la nueva"""
+        if self._old_table is None:
+            return
+        end = min(self._rehash_pos + (steps or self.rehash_step), self._old_size)
+        for i in range(self._rehash_pos, end):
+            for n, t in self._old_table[i]:
+                self.table[self._hash(n)].append((n, t))
+            self._old_table[i] = None
+        self._rehash_pos = end
+        if end == self._old_size:
+            self._old_table = None
+            self._old_size = 0
+
+    def complete_rehash(self):
+        """Termina de golpe una migración en curso"""
+        if self._old_table is not None:
+            self._rehash_some(self._old_size)
+
+    def reserve(self, n):
+        """Dimensiona la tabla para `n` contactos sin redimensionar durante la carga"""
+        needed = int(n / self.max_load) + 1
+        if needed > self.size:
+            self._start_resize(needed)
+            self.complete_rehash()
+        if self.phone_index is not None:
+            self.phone_index.reserve(n)
+
+    def _link_phone(self, telefono, nombre):
+        nombres = self.phone_index.search(telefono) or ()
+        self.phone_index.insert(telefono, nombres + (nombre,))
+
+    def _unlink_phone(self, telefono, nombre):
+        nombres = tuple(n for n in self.phone_index.search(telefono) or () if n != nombre)
+        if nombres:
+            self.phone_index.insert(telefono, nombres)
+        else:
+            self.phone_index.delete(telefono)
+
+    def insert(self, nombre, telefono):
+        return self._measured("insert", self._insert, nombre, telefono)
+
+    def _insert(self, nombre, telefono):
+        self._rehash_some()
+        bucket = self._bucket(nombre)
+        for i, (n, t) in enumerate(bucket):
+            if n == nombre:
+                bucket[i] = (nombre, telefono)  # Actualizar
+                if self.phone_index is not None and t != telefono:
+                    self._unlink_phone(t, nombre)
+                    self._link_phone(telefono, nombre)
+                return "actualizado", i + 1
+        comparisons = len(bucket)
+        bucket.append((nombre, telefono))
+        self.count += 1
+        if self.phone_index is not None:
+            self._link_phone(telefono, nombre)
+        if self.prefix_index is not None:
+            self.prefix_index.add(nombre)
+        if self.fuzzy_index is not None:
+            self.fuzzy_index.add(nombre)
+        if self.count > self.max_load * self.size:
+            self._start_resize(self.size * 2)
+        return "agregado", comparisons
+
+    def search(self, nombre):
+        return self._measured("search", self._search, nombre)
+
+    def _search(self, nombre):
+        self._rehash_some()
+        return self._find(nombre)
+
+    def peek(self, nombre):
+        """Búsqueda de solo lectura: no avanza el rehash incremental"""
+        return self._find(nombre)[0]
+
+    def _find(self, nombre):
+        """(teléfono o None, claves comparadas hasta encontrarlo o hasta agotar la cadena)"""
+        bucket = self._bucket(nombre)
+        for i, (n, t) in enumerate(bucket):
+            if n == nombre:
+                return t, i + 1
+        return None, len(bucket)
+
+    def delete(self, nombre):
+        return self._measured("delete", self._delete, nombre)
+
+    def _delete(self, nombre):
+        self._rehash_some()
+        bucket = self._bucket(nombre)
+        for i, (n, t) in enumerate(bucket):
+            if n == nombre:
+                del bucket[i]
+                self.count -= 1
+                if self.phone_index is not None:
+                    self._unlink_phone(t, nombre)
+                if self.prefix_index is not None:
+                    self.prefix_index.remove(nombre)
+                if self.fuzzy_index is not None:
+                    self.fuzzy_index.remove(nombre)
+                if (self.min_load and self.size > self.initial_size and self._old_table is None
+                        and self.count < self.min_load * self.size):
+                    self._start_resize(max(self.initial_size, self.size // 2))
+                return True, i + 1
+        return False, len(bucket)
+
+    def bulk_insert(self, rows, expected=None):
+        """Inserta pares (nombre, telefono) sin materializarlos; devuelve cuántos se agregaron.
+
+        La tabla se dimensiona de antemano con `expected` o con len(rows) si existe.
+        """
+        if expected is None and hasattr(rows, "__len__"):
+            expected = len(rows)
+        if expected:
+            self.reserve(self.count + expected)
+        if self.prefix_index is not None:
+            self.prefix_index.cargando = True
+        added = 0
+        try:
+            for nombre, telefono in rows:
+                if self.insert(nombre, telefono) == "agregado":
+                    added += 1
+        finally:
+            if self.prefix_index is not None:
+                self.prefix_index.terminar_carga()
+        return added
+
+    def load_csv(self, path, expected=None):
+        """Carga un CSV nombre,telefono fila a fila"""
+        with open(path, newline="", encoding="utf-8") as f:
+            rows = ((r[0].strip(), r[1].strip()) for r in csv.reader(f) if len(r) >= 2)
+            return self.bulk_insert(rows, expected)
+
+    def iter_contacts(self):
+        """Recorre los contactos bucket a bucket sin construir una lista"""
+        for bucket in self.table:
+            yield from bucket
+        if self._old_table is not None:
+            for bucket in self._old_table:
+                if bucket is not None:
+                    yield from bucket
+
+    def export(self, path):
+        """Escribe los contactos en CSV en streaming; devuelve cuántos se escribieron"""
+        written = 0
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            for row in self.iter_contacts():
+                writer.writerow(row)
+                written += 1
+        return written
+
+    def search_by_phone(self, telefono):
+        """Nombres de los contactos con ese teléfono (O(1) en modo bidireccional)"""
+        if self.phone_index is not None:
+            return list(self.phone_index.search(telefono) or ())
+        return [n for n, t in self.get_all_contacts() if t == telefono]
+
+    def search_prefix(self, prefijo, limit=None):
+        """Contactos cuyo nombre empieza por `prefijo` (sin distinguir tildes ni mayúsculas)"""
+        if self.prefix_index is not None:
+            nombres = self.prefix_index.search(prefijo, limit)
+            return [(n, self.search(n)) for n in nombres]
+        prefijo = normalizar_nombre(prefijo)
+        found = sorted((normalizar_nombre(n), n, t) for n, t in self.get_all_contacts()
+                       if normalizar_nombre(n).startswith(prefijo))
+        return [(n, t) for _, n, t in found[:limit]]
+
+    def search_fuzzy(self, nombre, max_dist=2, limit=10):
+        """Contactos a lo sumo `max_dist` ediciones del nombre, los más cercanos primero"""
+        if self.fuzzy_index is not None:
+            nombres = self.fuzzy_index.search(nombre, max_dist, limit)
+            return [(n, self.search(n)) for n in nombres]
+        consulta = normalizar_nombre(nombre)
+        found = []
+        for n, t in self.get_all_contacts():
+            d = distancia_edicion(consulta, normalizar_nombre(n), max_dist)
+            if d <= max_dist:
+                found.append((d, n, t))
+        found.sort()
+        return [(n, t) for _, n, t in found[:limit]]
+
+    def __len__(self):
+        return self.count
+
+    def load_factor(self):
+        return self.count / self.size
+
+    def max_chain_length(self):
+        buckets = self.table
+        if self._old_table is not None:
+            buckets = buckets + [b for b in self._old_table if b is not None]
+        return max((len(b) for b in buckets), default=0)
+
+    def get_stats(self):
+        """Métricas de carga para verificar que las búsquedas siguen en O(1)"""
+        return {
+            "contactos": self.count,
+            "buckets": self.size,
+            "factor_carga": round(self.load_factor(), 3),
+            "redimensiones": self.resize_count,
+            "cadena_maxima": self.max_chain_length(),
+            "rehash_en_curso": self._old_table is not None,
+        }
+
+    def chain_histogram(self):
+        """Cantidad de buckets por largo de cadena, {largo: buckets}"""
+        histogram = {}
+        for bucket in self.table:
+            histogram[len(bucket)] = histogram.get(len(bucket), 0) + 1
+        if self._old_table is not None:
+            for bucket in self._old_table:
+                if bucket is not None:
+                    histogram[len(bucket)] = histogram.get(len(bucket), 0) + 1
+        return dict(sorted(histogram.items()))
+
+    def metrics_report(self):
+        """Estado de la tabla más las métricas acumuladas, listo para serializar"""
+        report = {
+            "estrategia": self.hash_name,
+            "tabla": self.get_stats(),
+            "histograma_cadenas": self.chain_histogram(),
+        }
+        if self.metrics is not None:
+            report["operaciones"] = self.metrics.summary()
+            report["redimensiones"] = self.metrics.resize_events
+        return report
+
+    def export_metrics(self, path=None):
+        """JSON de metrics_report(); si se da `path` también se escribe en ese archivo"""
+        texto = json.dumps(self.metrics_report(), ensure_ascii=False, indent=2)
+        if path is not None:
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(texto)
+        return texto
+
+    def distribution_report(self):
+        """Cuantifica el reparto de claves: con un hash uniforme varianza ≈ media"""
+        self.complete_rehash()
+        lengths = [len(bucket) for bucket in self.table]
+        mean = self.count / self.size
+        variance = sum((n - mean) ** 2 for n in lengths) / self.size
+        return {
+            "estrategia": self.hash_name,
+            "buckets_usados": sum(1 for n in lengths if n),
+            "media": round(mean, 3),
+            "varianza": round(variance, 3),
+            "desviacion": round(variance ** 0.5, 3),
+            "indice_dispersion": round(variance / mean, 3) if mean else 0.0,
+            "cadena_maxima": max(lengths, default=0),
+        }
+
+    def get_state(self):
+        """Devuelve una representación del estado del hash table"""
+        self.complete_rehash()
+        state = [self.describe_bucket(i) for i in range(self.size)]
+        state.append(self.describe_distribution())
+        return state
+
+    def describe_bucket(self, i):
+        """Línea de texto de un solo bucket (la tabla no debe estar a medio rehash)"""
+        bucket = self.table[i]
+        if bucket:
+            entries = " → ".join(f"{n}({t})" for n, t in bucket)
+            return f"Bucket {i}: [{entries}]"
+        return f"Bucket {i}: [vacío]"
+
+    def describe_distribution(self):
+        report = self.distribution_report()
+        return (
+            f"Distribución ({report['estrategia']}): usados {report['buckets_usados']}/{self.size}, "
+            f"media {report['media']}, varianza {report['varianza']}, "
+            f"índice de dispersión {report['indice_dispersion']}, máx. {report['cadena_maxima']}"
+        )
+
+    def get_all_contacts(self):
+        """Devuelve todos los contactos como lista"""
+        return list(self.iter_contacts())
+
+
+# === ESTRUCTURA HASH CON DIRECCIONAMIENTO ABIERTO ===
+_BORRADO = object()  # Lápida: el slot estuvo ocupado y la búsqueda debe continuar
+
+
+class HashTableAbierta:
+    """Misma API que HashTable, pero con sondeo lineal sobre arreglos paralelos.
+
+    No crea una lista por bucket ni una tupla por contacto: claves, teléfonos y
+    hashes completos viven en tres arreglos planos del tamaño de la tabla.
+    """
+
+    def __init__(self, size=16, max_load=0.7, hash_func="fnv1a", seed=None):
+        capacity = 8
+        while capacity < size:
+            capacity *= 2  # Potencia de dos: el módulo se reduce a una máscara
+        self.count = 0
+        self.tombstones = 0
+        self.max_load = max_load
+        self.resize_count = 0
+        self.hash_name = hash_func if isinstance(hash_func, str) else hash_func.__name__
+        self._hash_func = crear_funcion_hash(hash_func, seed)
+        self._allocate(capacity)
+
+    def _allocate(self, capacity):
+        self.size = capacity
+        self._mask = capacity - 1
+        self.keys = [None] * capacity
+        self.values = [None] * capacity
+        self.hashes = array("Q", bytes(8 * capacity))
+
+    def _full_hash(self, key):
+        return self._hash_func(key) & _MASK64
+
+    def _find(self, nombre, h):
+        """Devuelve (slot de la clave o -1, primer slot reutilizable del recorrido)"""
+        keys, hashes, mask = self.keys, self.hashes, self._mask
+        i = h & mask
+        free = -1
+        while True:
+            k = keys[i]
+            if k is None:
+                return -1, (i if free < 0 else free)
+            if k is _BORRADO:
+                if free < 0:
+                    free = i
+            elif hashes[i] == h and k == nombre:
+                return i, free
+            i = (i + 1) & mask
+
+    def _resize(self, capacity):
+        """Reconstruye la tabla descartando las lápidas"""
+        old = [(k, v, h) for k, v, h in zip(self.keys, self.values, self.hashes)
+               if k is not None and k is not _BORRADO]
+        self._allocate(capacity)
+        self.tombstones = 0
+        self.resize_count += 1
+        keys, values, hashes, mask = self.keys, self.values, self.hashes, self._mask
+        for k, v, h in old:
+            i = h & mask
+            while keys[i] is not None:
+                i = (i + 1) & mask
+            keys[i], values[i], hashes[i] = k, v, h
+
+    def insert(self, nombre, telefono):
+        h = self._full_hash(nombre)
+        i, free = self._find(nombre, h)
+        if i >= 0:
+            self.values[i] = telefono  # Actualizar
+            return "actualizado"
+        if self.keys[free] is _BORRADO:
+            self.tombstones -= 1
+        self.keys[free], self.values[free], self.hashes[free] = nombre, telefono, h
+        self.count += 1
+        if self.count + self.tombstones > self.max_load * self.size:
+            # Si lo que sobra son lápidas basta con limpiar sin crecer
+            grow = self.count > self.max_load * self.size / 2
+            self._resize(self.size * 2 if grow else self.size)
+        return "agregado"
+
+    def search(self, nombre):
+        i, _ = self._find(nombre, self._full_hash(nombre))
+        return self.values[i] if i >= 0 else None
+
+    def delete(self, nombre):
+        i, _ = self._find(nombre, self._full_hash(nombre))
+        if i < 0:
+            return False
+        self.keys[i] = _BORRADO
+        self.values[i] = None
+        self.count -= 1
+        self.tombstones += 1
+        return True
+
+    def load_factor(self):
+        return self.count / self.size
+
+    def max_probe_length(self):
+        """Mayor distancia entre el slot ideal de una clave y donde quedó"""
+        longest = 0
+        for i, k in enumerate(self.keys):
+            if k is not None and k is not _BORRADO:
+                longest = max(longest, (i - self.hashes[i]) & self._mask)
+        return longest + 1 if self.count else 0
+
+    def get_stats(self):
+        return {
+            "contactos": self.count,
+            "slots": self.size,
+            "factor_carga": round(self.load_factor(), 3),
+            "lapidas": self.tombstones,
+            "redimensiones": self.resize_count,
+            "sondeo_maximo": self.max_probe_length(),
+        }
+
+    def get_state(self):
+        """Devuelve una representación del estado de los slots"""
+        state = []
+        for i, k in enumerate(self.keys):
+            if k is None:
+                state.append(f"Slot {i}: [vacío]")
+            elif k is _BORRADO:
+                state.append(f"Slot {i}: [borrado]")
+            else:
+                state.append(f"Slot {i}: [{k}({self.values[i]})]")
+        return state
+
+    def get_all_contacts(self):
+        """Devuelve todos los contactos como lista"""
+        return [(k, v) for k, v in zip(self.keys, self.values)
+                if k is not None and k is not _BORRADO]
+
+
+# === ALMACENAMIENTO PERSISTENTE EN DISCO (MMAP) ===
+_DISK_MAGIC = b"AGND"
+_DISK_VERSION = 1
+_HEADER = struct.Struct("<4sHHQQQQ")  # magia, versión, relleno, slots, contactos, lápidas, fin del heap
+_HEADER_SIZE = 64
+_SLOT = struct.Struct("<QQII8x")      # hash, offset en el heap (0 = vacío), largo nombre, largo teléfono
+_SLOT_BORRADO = 0xFFFFFFFF            # Largo de nombre que marca una lápida
+_LOG_RECORD = struct.Struct("<cIII")  # operación, largo nombre, largo teléfono, crc32
+
+
+class HashTableDisco:
+    """Tabla hash persistente en un solo archivo: cabecera + arreglo de slots + heap de cadenas.
+
+    El archivo se abre con mmap, así que abrirlo no lee nada: cada búsqueda solo
+    carga las páginas que su sondeo toca. Los cambios se anotan primero en
+    `<ruta>.log` y después se escriben en su sitio; si el proceso muere, al
+    reabrir se reproduce el log sobre el archivo.
+    """
+
+    def __init__(self, path, size=1024, max_load=0.7, sync=False, checkpoint_bytes=1 << 20):
+        self.path = path
+        self.log_path = path + ".log"
+        self.max_load = max_load
+        self.sync = sync                          # fsync del log en cada operación
+        self.checkpoint_bytes = checkpoint_bytes  # Tamaño de log que dispara un checkpoint
+        self.resize_count = 0
+        if not os.path.exists(path):
+            capacity = 8
+            while capacity < size:
+                capacity *= 2
+            self._create(path, capacity, 4096)
+        self._open(path)
+        self._log = open(self.log_path, "ab")
+        self._recover()
+
+    # --- Formato del archivo ---
+    @staticmethod
+    def _create(path, capacity, heap_bytes):
+        heap_start = _HEADER_SIZE + capacity * _SLOT.size
+        with open(path, "wb") as f:
+            f.write(_HEADER.pack(_DISK_MAGIC, _DISK_VERSION, 0, capacity, 0, 0, heap_start))
+            f.truncate(heap_start + heap_bytes)
+
+    def _open(self, path):
+        self._file = open(path, "r+b")
+        self._mm = mmap.mmap(self._file.fileno(), 0)
+        magic, version, _, self.size, self.count, self.tombstones, self._heap_end = \
+            _HEADER.unpack_from(self._mm, 0)
+        if magic != _DISK_MAGIC or version != _DISK_VERSION:
+            self.close()
+            raise ValueError(f"{path} no es una agenda en disco válida")
+        self._mask = self.size - 1
+
+    def _write_header(self):
+        _HEADER.pack_into(self._mm, 0, _DISK_MAGIC, _DISK_VERSION, 0,
+                          self.size, self.count, self.tombstones, self._heap_end)
+
+    def _heap_alloc(self, nbytes):
+        """Reserva espacio al final del heap, agrandando el archivo si hace falta"""
+        offset = self._heap_end
+        if offset + nbytes > len(self._mm):
+            new_len = max(len(self._mm) * 2, offset + nbytes)
+            self._mm.close()
+            self._file.truncate(new_len)
+            self._mm = mmap.mmap(self._file.fileno(), 0)
+        self._heap_end = offset + nbytes
+        self._write_header()  # Sin esto, una actualización que se muda deja el fin viejo en disco
+        return offset
+
+    @staticmethod
+    def _iter_raw(mm, capacity):
+        """(hash, nombre, teléfono) en bytes de cada slot vivo"""
+        for i in range(capacity):
+            h, offset, klen, vlen = _SLOT.unpack_from(mm, _HEADER_SIZE + i * _SLOT.size)
+            if offset and klen != _SLOT_BORRADO:
+                yield h, mm[offset:offset + klen], mm[offset + klen:offset + klen + vlen]
+
+    def _find(self, key, h):
+        """Devuelve (slot de la clave o -1, primer slot reutilizable, datos del slot)"""
+        mm, mask = self._mm, self._mask
+        i = h & mask
+        free = -1
+        while True:
+            slot = _SLOT.unpack_from(mm, _HEADER_SIZE + i * _SLOT.size)
+            slot_hash, offset, klen, _ = slot
+            if not offset:
+                return -1, (i if free < 0 else free), slot
+            if klen == _SLOT_BORRADO:
+                if free < 0:
+                    free = i
+            elif slot_hash == h and mm[offset:offset + klen] == key:
+                return i, free, slot
+            i = (i + 1) & mask
+
+    def _write_slot(self, i, h, offset, klen, vlen):
+        _SLOT.pack_into(self._mm, _HEADER_SIZE + i * _SLOT.size, h, offset, klen, vlen)
+
+    # --- Operaciones sin log (también las usa la recuperación) ---
+    def _apply_insert(self, key, value):
+        h = hash_fnv1a(key.decode("utf-8"))
+        i, free, (_, offset, klen, vlen) = self._find(key, h)
+        if i >= 0:
+            if len(value) <= vlen:
+                # El teléfono nuevo cabe en el hueco del anterior: se reescribe en su sitio
+                self._mm[offset + klen:offset + klen + len(value)] = value
+            else:
+                offset = self._heap_alloc(len(key) + len(value))
+                self._mm[offset:offset + len(key) + len(value)] = key + value
+            self._write_slot(i, h, offset, len(key), len(value))
+            return "actualizado"
+        _, free_offset, free_klen, _ = _SLOT.unpack_from(self._mm, _HEADER_SIZE + free * _SLOT.size)
+        if free_offset and free_klen == _SLOT_BORRADO:
+            self.tombstones -= 1
+        offset = self._heap_alloc(len(key) + len(value))
+        self._mm[offset:offset + len(key) + len(value)] = key + value
+        self._write_slot(free, h, offset, len(key), len(value))
+        self.count += 1
+        self._write_header()
+        if self.count + self.tombstones > self.max_load * self.size:
+            grow = self.count > self.max_load * self.size / 2
+            self._rebuild(self.size * 2 if grow else self.size)
+        return "agregado"
+
+    def _apply_delete(self, key):
+        h = hash_fnv1a(key.decode("utf-8"))
+        i, _, (_, offset, _, _) = self._find(key, h)
+        if i < 0:
+            return False
+        self._write_slot(i, h, offset, _SLOT_BORRADO, 0)
+        self.count -= 1
+        self.tombstones += 1
+        self._write_header()
+        return True
+
+    def _rebuild(self, capacity):
+        """Copia los contactos vivos a un archivo nuevo (sin lápidas ni basura en el heap)"""
+        # El log sigue siendo válido: reproducirlo sobre el archivo nuevo da el mismo estado
+        old_mm, old_file, old_size = self._mm, self._file, self.size
+        tmp = self.path + ".tmp"
+        used = self._heap_end - (_HEADER_SIZE + old_size * _SLOT.size)
+        self._create(tmp, capacity, used)
+        self._open(tmp)
+        for h, key, value in self._iter_raw(old_mm, old_size):
+            i = h & self._mask
+            while _SLOT.unpack_from(self._mm, _HEADER_SIZE + i * _SLOT.size)[1]:
+                i = (i + 1) & self._mask
+            offset = self._heap_alloc(len(key) + len(value))
+            self._mm[offset:offset + len(key) + len(value)] = key + value
+            self._write_slot(i, h, offset, len(key), len(value))
+            self.count += 1
+        self._write_header()
+        self._mm.flush()
+        self._mm.close()
+        self._file.close()
+        old_mm.close()
+        old_file.close()
+        os.replace(tmp, self.path)
+        self._open(self.path)
+        self.resize_count += 1
+
+    # --- Log y recuperación ---
+    def _append_log(self, op, key, value=b""):
+        crc = zlib.crc32(op + key + value)
+        self._log.write(_LOG_RECORD.pack(op, len(key), len(value), crc) + key + value)
+        self._log.flush()
+        if self.sync:
+            os.fsync(self._log.fileno())
+
+    def _recover(self):
+        """Reproduce el log pendiente; un registro incompleto al final se descarta"""
+        with open(self.log_path, "rb") as f:
+            data = f.read()
+        if not data:
+            return
+        self._rescan()
+        pos = 0
+        while pos + _LOG_RECORD.size <= len(data):
+            op, klen, vlen, crc = _LOG_RECORD.unpack_from(data, pos)
+            start = pos + _LOG_RECORD.size
+            key, value = data[start:start + klen], data[start + klen:start + klen + vlen]
+            if len(key) + len(value) != klen + vlen or zlib.crc32(op + key + value) != crc:
+                break
+            if op == b"I":
+                self._apply_insert(key, value)
+            else:
+                self._apply_delete(key)
+            pos = start + klen + vlen
+        self.checkpoint()
+
+    def _rescan(self):
+        """Recalcula la cabecera desde los slots, por si no llegó a disco antes de la caída"""
+        self.count = self.tombstones = 0
+        self._heap_end = _HEADER_SIZE + self.size * _SLOT.size
+        for i in range(self.size):
+            _, offset, klen, vlen = _SLOT.unpack_from(self._mm, _HEADER_SIZE + i * _SLOT.size)
+            if not offset:
+                continue
+            if klen == _SLOT_BORRADO:
+                self.tombstones += 1
+            else:
+                self.count += 1
+                self._heap_end = max(self._heap_end, offset + klen + vlen)
+        self._write_header()
+
+    def checkpoint(self):
+        """Lleva el mmap a disco y vacía el log"""
+        self._mm.flush()
+        self._log.truncate(0)
+        self._log.flush()
+        os.fsync(self._log.fileno())
+
+    def close(self):
+        if getattr(self, "_log", None) is not None and not self._log.closed:
+            self.checkpoint()
+            self._log.close()
+        if not self._mm.closed:
+            self._mm.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # --- API de la agenda ---
+    def insert(self, nombre, telefono):
+        key, value = nombre.encode("utf-8"), telefono.encode("utf-8")
+        self._append_log(b"I", key, value)
+        result = self._apply_insert(key, value)
+        if self._log.tell() > self.checkpoint_bytes:
+            self.checkpoint()
+        return result
+
+    def search(self, nombre):
+        key = nombre.encode("utf-8")
+        i, _, (_, offset, klen, vlen) = self._find(key, hash_fnv1a(nombre))
+        if i < 0:
+            return None
+        return self._mm[offset + klen:offset + klen + vlen].decode("utf-8")
+
+    def delete(self, nombre):
+        key = nombre.encode("utf-8")
+        if self.search(nombre) is None:
+            return False
+        self._append_log(b"D", key)
+        return self._apply_delete(key)
+
+    def bulk_insert(self, rows, expected=None):
+        """Inserta pares (nombre, telefono); con `expected` dimensiona el archivo una sola vez"""
+        if expected is None and hasattr(rows, "__len__"):
+            expected = len(rows)
+        needed = int((self.count + (expected or 0)) / self.max_load) + 1
+        if needed > self.size:
+            capacity = self.size
+            while capacity < needed:
+                capacity *= 2
+            self._rebuild(capacity)
+        added = 0
+        for nombre, telefono in rows:
+            if self.insert(nombre, telefono) == "agregado":
+                added += 1
+        return added
+
+    def iter_contacts(self):
+        for _, key, value in self._iter_raw(self._mm, self.size):
+            yield key.decode("utf-8"), value.decode("utf-8")
+
+    def get_all_contacts(self):
+        """Devuelve todos los contactos como lista"""
+        return list(self.iter_contacts())
+
+    def load_factor(self):
+        return self.count / self.size
+
+    def get_stats(self):
+        return {
+            "contactos": self.count,
+            "slots": self.size,
+            "factor_carga": round(self.load_factor(), 3),
+            "lapidas": self.tombstones,
+            "redimensiones": self.resize_count,
+            "bytes_archivo": len(self._mm),
+            "bytes_log": os.fstat(self._log.fileno()).st_size,  # tell() no ve el truncate del checkpoint
+        }
+
+
+# === ESTRUCTURA HASH CONCURRENTE CON LOCKS POR FRANJA ===
+class HashTableConcurrente:
+    """Reparte las claves en franjas; cada franja es un HashTable con su propio lock.
+
+    Operaciones sobre franjas distintas no se esperan entre sí, y una
+    redimensión solo bloquea su franja. Las búsquedas usan primero una lectura
+    sin lock validada con un contador de versión (seqlock); si un escritor la
+    cruzó, se repiten con el lock tomado.
+    """
+
+    def __init__(self, stripes=16, size=64, hash_func="fnv1a", seed=None, **kwargs):
+        self.stripes = stripes
+        self._hash_func = crear_funcion_hash(hash_func, seed)
+        per_stripe = max(1, size // stripes)
+        self.segments = [HashTable(per_stripe, hash_func=self._hash_func, **kwargs)
+                         for _ in range(stripes)]
+        self.locks = [threading.Lock() for _ in range(stripes)]
+        self.versions = [0] * stripes  # Impar mientras un escritor modifica la franja
+
+    def _stripe(self, nombre):
+        # Bits altos mezclados: el índice de bucket dentro de la franja usa los bajos
+        h = self._hash_func(nombre)
+        return ((h >> 32) ^ h) % self.stripes
+
+    def _write(self, nombre, operation, *args):
+        s = self._stripe(nombre)
+        with self.locks[s]:
+            self.versions[s] += 1
+            try:
+                return getattr(self.segments[s], operation)(nombre, *args)
+            finally:
+                self.versions[s] += 1
+
+    def insert(self, nombre, telefono):
+        return self._write(nombre, "insert", telefono)
+
+    def delete(self, nombre):
+        return self._write(nombre, "delete")
+
+    def search(self, nombre):
+        s = self._stripe(nombre)
+        segment = self.segments[s]
+        version = self.versions[s]
+        if not version & 1:
+            start = time.perf_counter_ns()
+            try:
+                telefono, comparisons = segment._find(nombre)
+            except (TypeError, IndexError):
+                pass  # La tabla cambió bajo la lectura
+            else:
+                if self.versions[s] == version:
+                    if segment.metrics is not None:
+                        segment.metrics.record("search", time.perf_counter_ns() - start, comparisons)
+                    return telefono
+        with self.locks[s]:
+            return segment.search(nombre)
+
+    @property
+    def count(self):
+        return sum(segment.count for segment in self.segments)
+
+    def iter_contacts(self):
+        """Recorre franja por franja; cada franja se copia bajo su lock"""
+        for lock, segment in zip(self.locks, self.segments):
+            with lock:
+                contacts = segment.get_all_contacts()
+            yield from contacts
+
+    def get_all_contacts(self):
+        """Devuelve todos los contactos como lista"""
+        return list(self.iter_contacts())
+
+    def load_factor(self):
+        return self.count / sum(segment.size for segment in self.segments)
+
+    def get_stats(self):
+        return {
+            "contactos": self.count,
+            "franjas": self.stripes,
+            "buckets": sum(segment.size for segment in self.segments),
+            "factor_carga": round(self.load_factor(), 3),
+            "redimensiones": sum(segment.resize_count for segment in self.segments),
+            "cadena_maxima": max(segment.max_chain_length() for segment in self.segments),
+        }
+
+
+def benchmark_concurrente(hilos=8, operaciones=20_000, stripes=16, seed=42):
+    """Inserciones, búsquedas y borrados mezclados desde varios hilos.
+
+    Cada hilo escribe solo sus propias claves, así que al final se puede
+    comprobar que no se perdió ninguna actualización.
+    """
+    table = HashTableConcurrente(stripes=stripes)
+    compartidos = [f"Compartido {i}" for i in range(1000)]
+    for nombre in compartidos:
+        table.insert(nombre, "0")
+    errores = []
+    esperados = [{} for _ in range(hilos)]
+
+    def trabajador(h):
+        rng = random.Random(seed + h)
+        propios = esperados[h]
+        for i in range(operaciones):
+            op = rng.random()
+            nombre = f"Hilo {h} contacto {rng.randrange(operaciones // 4)}"
+            if op < 0.4:
+                telefono = str(i)
+                table.insert(nombre, telefono)
+                propios[nombre] = telefono
+            elif op < 0.5:
+                table.delete(nombre)
+                propios.pop(nombre, None)
+            elif op < 0.75:
+                if table.search(nombre) != propios.get(nombre):
+                    errores.append(nombre)
+            else:
+                table.search(rng.choice(compartidos))
+
+    workers = [threading.Thread(target=trabajador, args=(h,)) for h in range(hilos)]
+    inicio = time.perf_counter()
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    elapsed = time.perf_counter() - inicio
+
+    for propios in esperados:
+        for nombre, telefono in propios.items():
+            if table.search(nombre) != telefono:
+                errores.append(nombre)
+    total = len(compartidos) + sum(len(propios) for propios in esperados)
+    return {
+        "hilos": hilos,
+        "operaciones": hilos * operaciones,
+        "ops_por_segundo": round(hilos * operaciones / elapsed),
+        "contactos": table.count,
+        "esperados": total,
+        "actualizaciones_perdidas": len(errores) + abs(table.count - total),
+    }
+
+
+# === COMPARATIVA: ÍNDICES VS RECORRIDO LINEAL ===
+def benchmark_busqueda_nombres(n=100_000, consultas=200, seed=42):
+    """Mide búsquedas por prefijo y difusas con índice y con recorrido de get_all_contacts"""
+    rng = random.Random(seed)
+    nombres = ["Juan", "María", "José", "Ana", "Luis", "Rosa", "Carlos", "Lucía"]
+    apellidos = ["Pérez", "Quispe", "Mamani", "Flores", "Ruiz", "Gálvez", "Condori"]
+    con_indice = HashTable(name_index=True, fuzzy_index=True)
+    sin_indice = HashTable()
+    for i in range(n):
+        nombre = f"{rng.choice(nombres)} {rng.choice(apellidos)} {i}"
+        telefono = str(900000000 + i)
+        con_indice.insert(nombre, telefono)
+        sin_indice.insert(nombre, telefono)
+    contactos = con_indice.get_all_contacts()
+    prefijos = [rng.choice(contactos)[0][:rng.randint(8, 14)] for _ in range(consultas)]
+    typos = []
+    for _ in range(consultas // 10):
+        nombre = rng.choice(contactos)[0]
+        pos = rng.randrange(len(nombre))
+        typos.append(nombre[:pos] + nombre[pos + 1:])
+
+    def medir(fn, entradas):
+        inicio = time.perf_counter()
+        for entrada in entradas:
+            fn(entrada)
+        return (time.perf_counter() - inicio) / len(entradas) * 1000
+
+    return {
+        "contactos": n,
+        "prefijo_indice_ms": medir(lambda p: con_indice.search_prefix(p, 50), prefijos),
+        "prefijo_lineal_ms": medir(lambda p: sin_indice.search_prefix(p, 50), prefijos),
+        "difusa_indice_ms": medir(lambda q: con_indice.search_fuzzy(q, 1), typos),
+        "difusa_lineal_ms": medir(lambda q: sin_indice.search_fuzzy(q, 1), typos),
+    }
@@ -0,0 +1,949 @@
+"""
+NÚCLEO DE PACIENTES - COLA DE TRIAJE, DIARIO E HISTORIAL SIN DEPENDENCIAS DE GUI
+Curso: Estructuras de Datos y Algoritmos
+
+Funcionalidad:
+- Cola de triaje de cinco niveles con envejecimiento, re-triaje y puesto por id
+- Persistencia con diario de eventos y snapshots (ColaPersistente)
+- Historial de atenciones con memoria acotada y segmentos en disco
+- Se importa sin PyQt5: SistemaGestionPacientes.py es la interfaz
+"""
+
+import os
+import time
+import json
+import zlib
+import heapq
+import random
+import struct
+from collections import deque
+from itertools import islice
+
+
+# === NIVELES DE TRIAJE ===
+# Escala de cinco niveles (ESI / Manchester): nombre, minutos de espera antes de
+# subir un nivel por envejecimiento, icono y color para la lista. Solo envejecen
+# los niveles 3-5: nadie llega a reanimación (1) por esperar
+NIVELES_TRIAJE = {
+    1: ("reanimación", 0, "🔴", "#c0392b"),
+    2: ("emergencia", 10, "🟠", "#d35400"),
+    3: ("urgente", 60, "🟡", "#b7950b"),
+    4: ("menos urgente", 120, "🟢", "#27ae60"),
+    5: ("no urgente", 240, "🔵", "#2980b9"),
+}
+ALIAS_PRIORIDAD = {"normal": 4}  # Valor del antiguo esquema urgente/normal
+
+
+def nivel_triaje(prioridad):
+    """Acepta el nivel 1-5, su nombre o los valores antiguos ("urgente"/"normal")"""
+    if isinstance(prioridad, int) and prioridad in NIVELES_TRIAJE:
+        return prioridad
+    for nivel, (nombre, *_) in NIVELES_TRIAJE.items():
+        if prioridad == nombre:
+            return nivel
+    if prioridad in ALIAS_PRIORIDAD:
+        return ALIAS_PRIORIDAD[prioridad]
+    raise ValueError(f"Prioridad desconocida: {prioridad!r}")
+
+
+# === ESTRUCTURA: COLA DE TRIAJE (UNA LISTA ENLAZADA POR NIVEL) ===
+class Paciente:
+    siguiente_id = 1  # Los IDs no se reutilizan dentro del proceso
+
+    def __init__(self, nombre, edad, prioridad, id=None):
+        if id is None:
+            id = Paciente.siguiente_id
+        Paciente.siguiente_id = max(Paciente.siguiente_id, id + 1)
+        self.id = id
+        self.nombre = nombre
+        self.edad = edad
+        self.cambiar_nivel(prioridad)
+
+    def cambiar_nivel(self, prioridad):
+        self.nivel = nivel_triaje(prioridad)
+        self.prioridad = NIVELES_TRIAJE[self.nivel][0]
+
+    def __str__(self):
+        return f"#{self.id} {self.nombre} ({self.edad} años) - {self.prioridad.upper()}"
+
+
+class _Fenwick:
+    """Árbol de Fenwick que crece por el final; cuenta los nodos vivos de un nivel"""
+    __slots__ = ("arbol",)
+
+    def __init__(self, n=0):
+        self.arbol = [0] + [i & -i for i in range(1, n + 1)]  # n posiciones con 1
+
+    def __len__(self):
+        return len(self.arbol) - 1
+
+    def agregar(self):
+        """Añade una posición con 1 al final y devuelve su índice (desde 1)"""
+        i = len(self.arbol)
+        valor, j, limite = 1, i - 1, i - (i & -i)
+        while j > limite:
+            valor += self.arbol[j]
+            j -= j & -j
+        self.arbol.append(valor)
+        return i
+
+    def sumar(self, i, delta):
+        while i < len(self.arbol):
+            self.arbol[i] += delta
+            i += i & -i
+
+    def prefijo(self, i):
+        total = 0
+        while i > 0:
+            total += self.arbol[i]
+            i -= i & -i
+        return total
+
+
+class Nodo:
+    __slots__ = ("paciente", "siguiente", "anterior", "nivel", "llegada", "entrada", "orden")
+
+    def __init__(self, paciente, ahora):
+        self.paciente = paciente
+        self.siguiente = None
+        self.anterior = None
+        self.nivel = paciente.nivel  # Nivel efectivo: puede subir por envejecimiento
+        self.llegada = ahora         # Llegada a la sala
+        self.entrada = ahora         # Llegada al nivel actual
+        self.orden = 0               # Posición en el Fenwick de su nivel
+
+
+class ColaPacientes:
+    """Cola de triaje: FIFO dentro de cada nivel, el nivel 1 se atiende primero.
+
+    Cada nivel es una lista doblemente enlazada, así que agregar y atender son
+    O(1). Con envejecimiento, quien espera más que el máximo de su nivel pasa
+    al final del nivel superior, hasta el 2 como mucho; como cada lista está
+    ordenada por entrada, basta mirar las cabezas.
+
+    Un índice ID -> nodo permite cancelar o re-clasificar sin recorrer, y un
+    Fenwick por nivel da la posición en la fila en O(log n).
+    """
+
+    def __init__(self, envejecimiento=True, esperas=None, reloj=time.monotonic):
+        self.cabezas = dict.fromkeys(NIVELES_TRIAJE)
+        self.colas = dict.fromkeys(NIVELES_TRIAJE)
+        self.total = 0
+        self.conteo = dict.fromkeys(NIVELES_TRIAJE, 0)  # En espera por nivel efectivo
+        self.indice = {}  # id de paciente -> nodo
+        self.fenwick = {nivel: _Fenwick() for nivel in NIVELES_TRIAJE}
+        # Cabezas retiradas que siguen contando 1 en el Fenwick: son siempre las
+        # de menor orden, así que basta restarlas y atender no paga O(log n)
+        self.descontados = dict.fromkeys(NIVELES_TRIAJE, 0)
+        self.agregados = self.atendidos = self.promovidos = self.cancelados = 0
+        self.envejecimiento = envejecimiento
+        # Segundos de espera por nivel antes de subir uno
+        self.esperas = esperas or {n: datos[1] * 60 for n, datos in NIVELES_TRIAJE.items()}
+        self.reloj = reloj
+
+    def _enlazar(self, nodo):
+        nodo.siguiente = None
+        nodo.anterior = self.colas[nodo.nivel]
+        if nodo.anterior is None:
+            self.cabezas[nodo.nivel] = nodo
+        else:
+            nodo.anterior.siguiente = nodo
+        self.colas[nodo.nivel] = nodo
+        self.conteo[nodo.nivel] += 1
+        nodo.orden = self.fenwick[nodo.nivel].agregar()
+
+    def _desenlazar(self, nodo):
+        fenwick = self.fenwick[nodo.nivel]
+        if nodo.anterior is None:
+            self.cabezas[nodo.nivel] = nodo.siguiente
+            self.descontados[nodo.nivel] += 1
+        else:
+            nodo.anterior.siguiente = nodo.siguiente
+            fenwick.sumar(nodo.orden, -1)
+        if nodo.siguiente is None:
+            self.colas[nodo.nivel] = nodo.anterior
+        else:
+            nodo.siguiente.anterior = nodo.anterior
+        nodo.siguiente = nodo.anterior = None
+        self.conteo[nodo.nivel] -= 1
+        if len(fenwick) > 64 and len(fenwick) > 2 * self.conteo[nodo.nivel]:
+            self._compactar(nodo.nivel)
+
+    def _compactar(self, nivel):
+        """Renumera los nodos vivos del nivel: el Fenwick no crece sin límite"""
+        actual, orden = self.cabezas[nivel], 0
+        while actual:
+            orden += 1
+            actual.orden = orden
+            actual = actual.siguiente
+        self.fenwick[nivel] = _Fenwick(orden)
+        self.descontados[nivel] = 0
+
+    def agregar(self, paciente):
+        if paciente.id in self.indice:
+            raise ValueError(f"El paciente #{paciente.id} ya está en espera")
+        nodo = Nodo(paciente, self.reloj())
+        self._enlazar(nodo)
+        self.indice[paciente.id] = nodo
+        self.total += 1
+        self.agregados += 1
+
+    def envejecer(self, ahora=None):
+        """Sube un nivel a quien superó la espera máxima del suyo; devuelve cuántos subieron"""
+        if not self.envejecimiento:
+            return 0
+        ahora = self.reloj() if ahora is None else ahora
+        promovidos = 0
+        for nivel in sorted(NIVELES_TRIAJE)[2:]:  # 3-5: el nivel 1 es solo para reanimación
+            limite = self.esperas[nivel]
+            nodo = self.cabezas[nivel]
+            while nodo is not None and ahora - nodo.entrada >= limite:
+                self._desenlazar(nodo)
+                nodo.nivel = nivel - 1
+                nodo.entrada = ahora
+                self._enlazar(nodo)
+                promovidos += 1
+                nodo = self.cabezas[nivel]
+        self.promovidos += promovidos
+        return promovidos
+
+    def atender(self):
+        if not self.total:
+            return None
+        self.envejecer()
+        for nivel in NIVELES_TRIAJE:
+            nodo = self.cabezas[nivel]
+            if nodo is not None:
+                self._desenlazar(nodo)
+                del self.indice[nodo.paciente.id]
+                self.total -= 1
+                self.atendidos += 1
+                return nodo.paciente
+
+    def cancel(self, id):
+        """Retira de la espera al paciente `id` (se fue, fue derivado...); None si no está"""
+        nodo = self.indice.pop(id, None)
+        if nodo is None:
+            return None
+        self._desenlazar(nodo)
+        self.total -= 1
+        self.cancelados += 1
+        return nodo.paciente
+
+    def change_priority(self, id, nivel):
+        """Re-triaje: el paciente pasa al final de su nuevo nivel. False si no está"""
+        nodo = self.indice.get(id)
+        if nodo is None:
+            return False
+        nodo.paciente.cambiar_nivel(nivel)
+        self._desenlazar(nodo)
+        nodo.nivel = nodo.paciente.nivel
+        nodo.entrada = self.reloj()
+        self._enlazar(nodo)
+        return True
+
+    def position_of(self, id):
+        """Puesto (desde 1) en que será atendido el paciente `id`; None si no está"""
+        nodo = self.indice.get(id)
+        if nodo is None:
+            return None
+        antes = sum(self.conteo[nivel] for nivel in NIVELES_TRIAJE if nivel < nodo.nivel)
+        return antes + self.fenwick[nodo.nivel].prefijo(nodo.orden) - self.descontados[nodo.nivel]
+
+    def en_espera(self):
+        """Recorre (nivel efectivo, paciente) en el orden en que serán atendidos"""
+        for nivel in NIVELES_TRIAJE:
+            actual = self.cabezas[nivel]
+            while actual:
+                yield nivel, actual.paciente
+                actual = actual.siguiente
+
+    def mostrar_lista(self):
+        if not self.total:
+            return ["(No hay pacientes esperando)"]
+        self.envejecer()
+        lista = []
+        for idx, (nivel, paciente) in enumerate(self.en_espera(), 1):
+            subio = f" ⬆️ nivel {nivel}" if nivel != paciente.nivel else ""
+            lista.append(f"{idx}. {paciente}{subio}")
+        return lista
+
+    def esta_vacia(self):
+        return self.total == 0
+
+    def contar_por_prioridad(self):
+        """Pacientes en espera por nivel efectivo, sin recorrer la cola"""
+        return dict(self.conteo)
+
+    def contar_recorriendo(self):
+        """Mismo conteo que contar_por_prioridad, recorriendo todas las listas"""
+        conteo = dict.fromkeys(NIVELES_TRIAJE, 0)
+        for nivel, _ in self.en_espera():
+            conteo[nivel] += 1
+        return conteo
+
+    def estadisticas(self):
+        """Foto barata del estado de la cola para la interfaz o un monitor"""
+        return {
+            "en_espera": self.total,
+            "por_nivel": dict(self.conteo),
+            "criticos": self.conteo[1] + self.conteo[2],
+            "agregados": self.agregados,
+            "atendidos": self.atendidos,
+            "promovidos": self.promovidos,
+            "cancelados": self.cancelados,
+        }
+
+
+def benchmark_triaje(n=50_000, seed=42):
+    """Encola y atiende n pacientes en ColaPacientes y en un heapq equivalente"""
+    rng = random.Random(seed)
+    pacientes = [Paciente(f"P{i}", rng.randrange(100), rng.choice((1, 2, 3, 3, 4, 4, 4, 5, 5)))
+                 for i in range(n)]
+    resultados = {"pacientes": n}
+
+    cola = ColaPacientes()
+    inicio = time.perf_counter()
+    for paciente in pacientes:
+        cola.agregar(paciente)
+    resultados["agregar_us"] = round((time.perf_counter() - inicio) / n * 1e6, 3)
+    inicio = time.perf_counter()
+    orden = [cola.atender() for _ in range(n)]
+    resultados["atender_us"] = round((time.perf_counter() - inicio) / n * 1e6, 3)
+
+    inicio = time.perf_counter()
+    monticulo = []
+    for i, paciente in enumerate(pacientes):
+        heapq.heappush(monticulo, (paciente.nivel, i, paciente))
+    orden_heap = [heapq.heappop(monticulo)[2] for _ in range(n)]
+    resultados["heapq_total_us"] = round((time.perf_counter() - inicio) / n * 1e6, 3)
+    resultados["mismo_orden"] = orden == orden_heap
+    return resultados
+
+
+# === PERSISTENCIA: DIARIO DE EVENTOS Y SNAPSHOTS ===
+_DIARIO_MAGIA = b"COLD"
+_SNAPSHOT_MAGIA = b"COLS"
+_COLA_VERSION = 1
+_DIARIO_CABECERA = struct.Struct("<4sHQ")  # magia, versión, generación
+_EVENTO = struct.Struct("<cdQBHH")         # operación, instante, id, nivel, edad, largo nombre
+_CRC = struct.Struct("<I")
+_SNAPSHOT_CABECERA = struct.Struct("<4sHQQQQQQQQ")  # magia, versión, generación, siguiente id, nodos,
+                                                     # atenciones, agregados, atendidos, promovidos, cancelados
+_SNAPSHOT_NODO = struct.Struct("<QBBddHH")  # id, nivel del paciente, nivel efectivo, llegada, entrada, edad, largo nombre
+_SNAPSHOT_ATENCION = struct.Struct("<QBdHH")  # id, nivel, instante, edad, largo nombre (solo snapshots antiguos)
+POLITICAS_SYNC = ("siempre", "lote", "nunca")
+
+
+class ColaPersistente(ColaPacientes):
+    """ColaPacientes que anota cada cambio en `<ruta>.diario` al confirmarlo.
+
+    Cada evento (agregar, atender, retirar, re-triaje, envejecer) se entrega al
+    sistema operativo en cuanto ocurre, así que una caída del proceso no pierde
+    nada. El fsync depende de `sync`: "siempre" (cada evento), "lote" (cada
+    `lote` eventos o `intervalo` segundos) o "nunca". Cada `compactar_cada`
+    eventos el estado se guarda en `<ruta>.snap` y el diario vuelve a empezar;
+    al abrir se carga el snapshot y se reproduce el diario.
+
+    Durante cada operación el reloj queda fijo en un instante que se anota con
+    el evento: al reproducirlo, el envejecimiento decide exactamente lo mismo.
+
+    Las atenciones se guardan solo en `historial` (un HistorialAtenciones), y
+    siempre después de anotarlas en el diario: si el proceso muere entre una
+    escritura y otra, al reproducir el diario se completa lo que falte.
+    """
+
+    def __init__(self, ruta, sync="lote", lote=64, intervalo=0.05, compactar_cada=10_000,
+                 historial=None, **kwargs):
+        if sync not in POLITICAS_SYNC:
+            raise ValueError(f"sync debe ser uno de {POLITICAS_SYNC}")
+        kwargs.setdefault("reloj", time.time)  # Instantes válidos entre reinicios
+        super().__init__(**kwargs)
+        self._reloj_real = self.reloj
+        self.reloj = self._instante
+        self._ahora = None
+        self.ruta_diario = ruta + ".diario"
+        self.ruta_snapshot = ruta + ".snap"
+        self.sync = sync
+        self.lote = lote
+        self.intervalo = intervalo
+        self.compactar_cada = compactar_cada
+        self.historial = historial
+        self.generacion = 0
+        self.eventos_diario = 0
+        self.fsyncs = 0
+        self._pendientes = 0
+        self._ultimo_sync = time.monotonic()
+        self._diario = None
+        self._recuperar()
+
+    def _instante(self):
+        return self._ahora if self._ahora is not None else self._reloj_real()
+
+    def _fijar_reloj(self):
+        """Fija el reloj para toda la operación; False si ya había una en curso"""
+        if self._ahora is not None:
+            return False
+        self._ahora = self._reloj_real()
+        return True
+
+    # --- Operaciones anotadas ---
+    def agregar(self, paciente):
+        propia = self._fijar_reloj()
+        try:
+            # Se empaqueta antes de tocar la cola: un campo que no cabe en el
+            # registro no puede dejar un alta en memoria que el diario no tiene
+            if propia:
+                registro = self._registro(b"A", paciente.id, paciente.nivel, paciente.edad, paciente.nombre)
+            super().agregar(paciente)
+            if propia:
+                self._escribir(registro)
+                self._compactar_si_toca()
+        finally:
+            if propia:
+                self._ahora = None
+
+    def atender(self):
+        propia = self._fijar_reloj()
+        try:
+            paciente = super().atender()
+            if paciente is not None:
+                if propia:
+                    self._escribir(self._registro(b"T", paciente.id))
+                if self.historial is not None and (propia or self._falta_en_historial(paciente.id)):
+                    self.historial.agregar(paciente, self._ahora)
+                if propia:
+                    self._compactar_si_toca()  # Con la atención ya en el historial
+            return paciente
+        finally:
+            if propia:
+                self._ahora = None
+
+    def cancel(self, id):
+        propia = self._fijar_reloj()
+        try:
+            paciente = super().cancel(id)
+            if propia and paciente is not None:
+                self._anotar(b"C", id)
+            return paciente
+        finally:
+            if propia:
+                self._ahora = None
+
+    def change_priority(self, id, nivel):
+        propia = self._fijar_reloj()
+        try:
+            cambiado = super().change_priority(id, nivel)
+            if propia and cambiado:
+                self._anotar(b"P", id, self.indice[id].nivel)
+            return cambiado
+        finally:
+            if propia:
+                self._ahora = None
+
+    def envejecer(self, ahora=None):
+        propia = self._fijar_reloj()
+        try:
+            if ahora is not None:
+                self._ahora = ahora
+            promovidos = super().envejecer(ahora)
+            if propia and promovidos:
+                self._anotar(b"E")
+            return promovidos
+        finally:
+            if propia:
+                self._ahora = None
+
+    def _falta_en_historial(self, id):
+        """Al reproducir: una caída solo pudo perder las atenciones posteriores a la última guardada.
+
+        Las anteriores están en el historial o la retención ya las borró; en
+        ningún caso se vuelven a agregar.
+        """
+        ultimo = self.historial.ultimo()
+        return ultimo is None or self._ahora > ultimo[0] or \
+            (self._ahora == ultimo[0] and not self.historial.contiene(self._ahora, id))
+
+    # --- Diario ---
+    def _registro(self, op, id=0, nivel=0, edad=0, nombre=""):
+        datos = nombre.encode("utf-8")
+        registro = _EVENTO.pack(op, self._ahora, id, nivel, edad, len(datos)) + datos
+        return registro + _CRC.pack(zlib.crc32(registro))
+
+    def _anotar(self, op, id=0, nivel=0, edad=0, nombre=""):
+        self._escribir(self._registro(op, id, nivel, edad, nombre))
+        self._compactar_si_toca()
+
+    def _escribir(self, registro):
+        self._diario.write(registro)
+        self.eventos_diario += 1
+        self._pendientes += 1
+        if self.sync == "siempre" or (self.sync == "lote" and (
+                self._pendientes >= self.lote or time.monotonic() - self._ultimo_sync >= self.intervalo)):
+            self.sincronizar()
+
+    def _compactar_si_toca(self):
+        if self.eventos_diario >= self.compactar_cada:
+            self.compactar()
+
+    def sincronizar(self):
+        """fsync de los eventos escritos desde el último; la interfaz lo llama también por timer"""
+        if self._pendientes and self.sync != "nunca":
+            os.fsync(self._diario.fileno())
+            self.fsyncs += 1
+        self._pendientes = 0
+        self._ultimo_sync = time.monotonic()
+
+    def _reiniciar_diario(self):
+        """Diario vacío de la generación actual, ya en disco antes de usarse"""
+        if self._diario is not None:
+            self._diario.close()
+        with open(self.ruta_diario, "wb") as f:
+            f.write(_DIARIO_CABECERA.pack(_DIARIO_MAGIA, _COLA_VERSION, self.generacion))
+            f.flush()
+            os.fsync(f.fileno())
+        self._diario = open(self.ruta_diario, "ab", buffering=0)
+        self.eventos_diario = self._pendientes = 0
+
+    # --- Snapshots ---
+    def compactar(self):
+        """Guarda el estado completo y vacía el diario.
+
+        El snapshot lleva la generación siguiente: si el proceso muere antes de
+        vaciar el diario, al abrir se ve que ese diario ya está incluido. El
+        historial llega a disco antes, porque sin diario ya no se puede rehacer.
+        """
+        if self.historial is not None:
+            self.historial.sincronizar()
+        self.generacion += 1
+        temporal = self.ruta_snapshot + ".tmp"
+        with open(temporal, "wb") as f:
+            f.write(self._serializar())
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporal, self.ruta_snapshot)
+        self._reiniciar_diario()
+
+    def _serializar(self):
+        partes = []
+        for nivel in NIVELES_TRIAJE:
+            nodo = self.cabezas[nivel]
+            while nodo:
+                p = nodo.paciente
+                nombre = p.nombre.encode("utf-8")
+                partes.append(_SNAPSHOT_NODO.pack(p.id, p.nivel, nodo.nivel, nodo.llegada,
+                                                  nodo.entrada, p.edad, len(nombre)) + nombre)
+                nodo = nodo.siguiente
+        cuerpo = _SNAPSHOT_CABECERA.pack(
+            _SNAPSHOT_MAGIA, _COLA_VERSION, self.generacion, Paciente.siguiente_id, self.total,
+            0, self.agregados, self.atendidos, self.promovidos, self.cancelados
+        ) + b"".join(partes)
+        return cuerpo + _CRC.pack(zlib.crc32(cuerpo))
+
+    def _cargar_snapshot(self, datos):
+        cuerpo = datos[:-_CRC.size]
+        if len(datos) < _SNAPSHOT_CABECERA.size + _CRC.size or \
+                zlib.crc32(cuerpo) != _CRC.unpack_from(datos, len(cuerpo))[0]:
+            raise ValueError(f"{self.ruta_snapshot} está dañado")
+        (magia, version, self.generacion, siguiente_id, nodos, atenciones, self.agregados,
+         self.atendidos, self.promovidos, self.cancelados) = _SNAPSHOT_CABECERA.unpack_from(datos, 0)
+        if magia != _SNAPSHOT_MAGIA or version != _COLA_VERSION:
+            raise ValueError(f"{self.ruta_snapshot} no es un snapshot de la cola")
+        Paciente.siguiente_id = max(Paciente.siguiente_id, siguiente_id)
+        # Los nodos se guardaron en orden de atención: se encadenan tal cual y al
+        # final cada nivel se numera y arma su Fenwick de una vez, en O(n)
+        pos = _SNAPSHOT_CABECERA.size
+        ultimos = dict.fromkeys(NIVELES_TRIAJE)
+        for _ in range(nodos):
+            id, nivel, efectivo, llegada, entrada, edad, largo = _SNAPSHOT_NODO.unpack_from(datos, pos)
+            pos += _SNAPSHOT_NODO.size
+            nodo = Nodo(Paciente(datos[pos:pos + largo].decode("utf-8"), edad, nivel, id=id), llegada)
+            pos += largo
+            nodo.nivel, nodo.entrada = efectivo, entrada
+            anterior = ultimos[efectivo]
+            if anterior is None:
+                self.cabezas[efectivo] = nodo
+            else:
+                anterior.siguiente, nodo.anterior = nodo, anterior
+            ultimos[efectivo] = nodo
+            self.conteo[efectivo] += 1
+            self.indice[id] = nodo
+        self.colas.update(ultimos)
+        self.total = nodos
+        for nivel in NIVELES_TRIAJE:
+            self._compactar(nivel)
+        # Los snapshots anteriores al historial en disco traían las últimas
+        # atenciones: pasan al historial si todavía está vacío
+        migrar = self.historial is not None and not len(self.historial)
+        for _ in range(atenciones):
+            id, nivel, instante, edad, largo = _SNAPSHOT_ATENCION.unpack_from(datos, pos)
+            pos += _SNAPSHOT_ATENCION.size
+            if migrar:
+                paciente = Paciente(datos[pos:pos + largo].decode("utf-8"), edad, nivel, id=id)
+                self.historial.agregar(paciente, instante)
+            pos += largo
+
+    # --- Recuperación ---
+    def _reproducir(self, datos, pos):
+        """Aplica los eventos válidos del diario; devuelve dónde termina el último"""
+        while pos + _EVENTO.size <= len(datos):
+            op, instante, id, nivel, edad, largo = _EVENTO.unpack_from(datos, pos)
+            fin = pos + _EVENTO.size + largo
+            if fin + _CRC.size > len(datos) or zlib.crc32(datos[pos:fin]) != _CRC.unpack_from(datos, fin)[0]:
+                break  # Registro a medias: la caída ocurrió mientras se escribía
+            self._ahora = instante
+            if op == b"A":
+                self.agregar(Paciente(datos[pos + _EVENTO.size:fin].decode("utf-8"), edad, nivel, id=id))
+            elif op == b"T":
+                paciente = self.atender()
+                if paciente is None or paciente.id != id:
+                    raise ValueError(f"{self.ruta_diario}: la atención de #{id} no coincide con la cola")
+            elif op == b"C":
+                self.cancel(id)
+            elif op == b"P":
+                self.change_priority(id, nivel)
+            else:
+                self.envejecer(instante)
+            self.eventos_diario += 1
+            pos = fin + _CRC.size
+        self._ahora = None
+        return pos
+
+    def _recuperar(self):
+        inicio = time.perf_counter()
+        if os.path.exists(self.ruta_snapshot):
+            with open(self.ruta_snapshot, "rb") as f:
+                self._cargar_snapshot(f.read())
+        datos = b""
+        if os.path.exists(self.ruta_diario):
+            with open(self.ruta_diario, "rb") as f:
+                datos = f.read()
+        if len(datos) >= _DIARIO_CABECERA.size:
+            magia, version, generacion = _DIARIO_CABECERA.unpack_from(datos, 0)
+            if magia != _DIARIO_MAGIA or version != _COLA_VERSION:
+                raise ValueError(f"{self.ruta_diario} no es un diario de la cola")
+        else:
+            generacion = None
+        if generacion == self.generacion:
+            fin = self._reproducir(datos, _DIARIO_CABECERA.size)
+            if fin < len(datos):
+                with open(self.ruta_diario, "r+b") as f:
+                    f.truncate(fin)
+            self._diario = open(self.ruta_diario, "ab", buffering=0)
+        else:
+            self._reiniciar_diario()  # Sin diario, o uno ya incluido en el snapshot
+        self.eventos_recuperados = self.eventos_diario
+        self.tiempo_recuperacion = time.perf_counter() - inicio
+
+    def close(self):
+        if self._diario is not None and not self._diario.closed:
+            self.compactar()  # El próximo arranque solo lee el snapshot
+            self._diario.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def benchmark_diario(eventos=50_000, politicas=POLITICAS_SYNC, seed=42):
+    """Eventos por segundo del diario con cada política de sync y tiempo de recuperación"""
+    import tempfile
+
+    resultados = []
+    for politica in politicas:
+        rng = random.Random(seed)
+        with tempfile.TemporaryDirectory() as carpeta:
+            ruta = os.path.join(carpeta, "cola")
+            cola = ColaPersistente(ruta, sync=politica, compactar_cada=eventos + 1)
+            ids = []
+            inicio = time.perf_counter()
+            for i in range(eventos):
+                r = rng.random()
+                if r < 0.55 or not ids:
+                    paciente = Paciente(f"Paciente {i}", rng.randrange(100), rng.randint(1, 5))
+                    cola.agregar(paciente)
+                    ids.append(paciente.id)
+                elif r < 0.85:
+                    cola.atender()
+                elif r < 0.95:
+                    cola.cancel(rng.choice(ids))
+                else:
+                    cola.change_priority(rng.choice(ids), rng.randint(1, 5))
+            cola.sincronizar()
+            segundos = time.perf_counter() - inicio
+            cola._diario.close()  # Sin compactar, como si el proceso hubiera muerto
+            bytes_diario = os.path.getsize(cola.ruta_diario)
+
+            desde_diario = ColaPersistente(ruta, sync=politica, compactar_cada=eventos + 1)
+            desde_diario.close()  # Compacta: el siguiente arranque solo lee el snapshot
+            desde_snapshot = ColaPersistente(ruta, sync=politica)
+            resultados.append({
+                "sync": politica,
+                "eventos": eventos,
+                "eventos_s": round(eventos / segundos),
+                "fsyncs": cola.fsyncs,
+                "bytes_diario": bytes_diario,
+                "recuperar_diario_ms": round(desde_diario.tiempo_recuperacion * 1000, 1),
+                "recuperar_snapshot_ms": round(desde_snapshot.tiempo_recuperacion * 1000, 1),
+                "en_espera": desde_snapshot.total,
+            })
+            desde_snapshot.close()
+    return resultados
+
+
+# === HISTORIAL DE ATENCIONES: MEMORIA ACOTADA + SEGMENTOS EN DISCO ===
+_ATENCION = struct.Struct("<dQBHH")  # instante, id, nivel, edad, largo nombre
+
+
+class HistorialAtenciones:
+    """Historial de atenciones con memoria constante, guardado en `carpeta`.
+
+    Cada registro es una tupla (instante, id, nombre, edad, nivel). Se escribe
+    al segmento activo (`NNNNNN.seg`) en cuanto llega y los últimos `capacidad`
+    quedan además en un buffer circular en memoria. Al llegar a
+    `por_segmento` registros el segmento se cierra y su resumen (rango de
+    instantes, niveles presentes) pasa a `indice.json`, así que una consulta
+    salta los segmentos que no pueden tener resultados. Los instantes se
+    suponen no decrecientes.
+    """
+
+    def __init__(self, carpeta, capacidad=1000, por_segmento=2000, max_segmentos=None):
+        self.carpeta = carpeta
+        self.capacidad = capacidad
+        self.por_segmento = por_segmento
+        self.max_segmentos = max_segmentos  # Segmentos cerrados a conservar (None = todos)
+        self.reciente = deque(maxlen=capacidad)
+        self.segmentos = []  # Resumen de cada segmento cerrado, del más viejo al más nuevo
+        self.total = 0       # Registros conservados; el primero tiene número de orden `base`
+        self.base = 0
+        self._cache = (None, None)  # Último segmento cerrado leído: (número, registros)
+        os.makedirs(carpeta, exist_ok=True)
+        self._abrir()
+
+    def _ruta(self, numero):
+        return os.path.join(self.carpeta, f"{numero:06d}.seg")
+
+    def _abrir(self):
+        ruta_indice = os.path.join(self.carpeta, "indice.json")
+        if os.path.exists(ruta_indice):
+            with open(ruta_indice, encoding="utf-8") as f:
+                self.segmentos = json.load(f)
+        conocidos = {s["numero"] for s in self.segmentos}
+        numeros = sorted(int(n[:-4]) for n in os.listdir(self.carpeta) if n.endswith(".seg"))
+        # Segmentos cerrados que no llegaron al índice (caída al rotar): se leen una vez
+        for numero in numeros[:-1]:
+            if numero not in conocidos:
+                self.segmentos.append(self._escanear(numero, self._siguiente_orden()))
+        self.segmentos.sort(key=lambda s: s["numero"])
+        if self.segmentos:
+            self.base = self.segmentos[0]["primero"]
+        numero = numeros[-1] if numeros and numeros[-1] not in conocidos else \
+            (self.segmentos[-1]["numero"] + 1 if self.segmentos else 1)
+        self.activo = self._escanear(numero, self._siguiente_orden(), llenar_reciente=True)
+        self.total = self.activo["primero"] + self.activo["registros"] - self.base
+        # Si el segmento activo es nuevo, el buffer se completa con el final de los anteriores
+        for resumen in reversed(self.segmentos):
+            faltan = self.capacidad - len(self.reciente)
+            if faltan <= 0:
+                break
+            self.reciente.extendleft(reversed(self._leer(self._ruta(resumen["numero"]))[0][-faltan:]))
+        if len(self.segmentos) != len(conocidos):
+            self._guardar_indice()
+        self._archivo = open(self._ruta(numero), "ab", buffering=0)
+
+    def _siguiente_orden(self):
+        return self.segmentos[-1]["primero"] + self.segmentos[-1]["registros"] if self.segmentos else 0
+
+    def _escanear(self, numero, primero, llenar_reciente=False):
+        """Resumen de un segmento leyéndolo entero; recorta un registro final a medias"""
+        resumen = {"numero": numero, "primero": primero, "registros": 0,
+                   "desde": None, "hasta": None, "niveles": 0}
+        ruta = self._ruta(numero)
+        if not os.path.exists(ruta):
+            return resumen
+        registros, fin = self._leer(ruta)
+        if fin < os.path.getsize(ruta):
+            with open(ruta, "r+b") as f:
+                f.truncate(fin)
+        for registro in registros:
+            self._anotar_resumen(resumen, registro)
+        if llenar_reciente:
+            self.reciente.extend(registros[-self.capacidad:])
+        return resumen
+
+    @staticmethod
+    def _anotar_resumen(resumen, registro):
+        if resumen["desde"] is None:
+            resumen["desde"] = registro[0]
+        resumen["hasta"] = registro[0]
+        resumen["niveles"] |= 1 << registro[4]
+        resumen["registros"] += 1
+
+    @staticmethod
+    def _leer(ruta):
+        """Registros válidos del segmento y el byte donde termina el último"""
+        with open(ruta, "rb") as f:
+            datos = f.read()
+        registros, pos = [], 0
+        while pos + _ATENCION.size <= len(datos):
+            instante, id, nivel, edad, largo = _ATENCION.unpack_from(datos, pos)
+            fin = pos + _ATENCION.size + largo
+            if fin + _CRC.size > len(datos) or zlib.crc32(datos[pos:fin]) != _CRC.unpack_from(datos, fin)[0]:
+                break
+            registros.append((instante, id, datos[pos + _ATENCION.size:fin].decode("utf-8"), edad, nivel))
+            pos = fin + _CRC.size
+        return registros, pos
+
+    def _guardar_indice(self):
+        ruta = os.path.join(self.carpeta, "indice.json")
+        with open(ruta + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(self.segmentos, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(ruta + ".tmp", ruta)
+
+    def agregar(self, paciente, instante=None):
+        registro = (time.time() if instante is None else instante,
+                    paciente.id, paciente.nombre, paciente.edad, paciente.nivel)
+        nombre = registro[2].encode("utf-8")
+        datos = _ATENCION.pack(registro[0], registro[1], registro[4], registro[3], len(nombre)) + nombre
+        self._archivo.write(datos + _CRC.pack(zlib.crc32(datos)))
+        self._anotar_resumen(self.activo, registro)
+        self.reciente.append(registro)
+        self.total += 1
+        if self.activo["registros"] >= self.por_segmento:
+            self._rotar()
+        return registro
+
+    def _rotar(self):
+        """Cierra el segmento activo, lo pasa al índice y abre uno nuevo"""
+        os.fsync(self._archivo.fileno())
+        self._archivo.close()
+        self.segmentos.append(self.activo)
+        if self.max_segmentos is not None:
+            while len(self.segmentos) > self.max_segmentos:
+                viejo = self.segmentos.pop(0)
+                os.remove(self._ruta(viejo["numero"]))
+                self.total -= viejo["registros"]
+                self.base = self.segmentos[0]["primero"] if self.segmentos else self.activo["primero"]
+            while len(self.reciente) > self.total:  # El buffer no puede mostrar lo ya borrado
+                self.reciente.popleft()
+        self._guardar_indice()
+        numero = self.activo["numero"] + 1
+        self.activo = {"numero": numero, "primero": self._siguiente_orden(), "registros": 0,
+                       "desde": None, "hasta": None, "niveles": 0}
+        self._archivo = open(self._ruta(numero), "ab", buffering=0)
+
+    def __len__(self):
+        return self.total
+
+    def ultimo(self):
+        """El registro más nuevo, o None si el historial está vacío"""
+        return self.reciente[-1] if self.reciente else None
+
+    def contiene(self, instante, id):
+        """True si está guardada la atención de `id` en `instante` (en memoria o en un segmento)"""
+        return any(registro[1] == id for registro in self.recorrer(instante, instante))
+
+    def _registros(self, resumen):
+        if resumen is self.activo:
+            return self._leer(self._ruta(resumen["numero"]))[0]
+        numero, registros = self._cache
+        if numero != resumen["numero"]:
+            registros = self._leer(self._ruta(resumen["numero"]))[0]
+            self._cache = (resumen["numero"], registros)
+        return registros
+
+    def recorrer(self, desde=None, hasta=None, niveles=None):
+        """Registros del filtro, del más nuevo al más viejo; solo lee los segmentos necesarios"""
+        mascara = sum(1 << n for n in niveles) if niveles else None
+
+        def cumple(registro):
+            return (hasta is None or registro[0] <= hasta) and \
+                (mascara is None or (1 << registro[4]) & mascara)
+
+        for registro in reversed(self.reciente):
+            if desde is not None and registro[0] < desde:
+                return
+            if cumple(registro):
+                yield registro
+        en_memoria = self.base + self.total - len(self.reciente)  # Orden del más viejo en memoria
+        for resumen in reversed(self.segmentos + [self.activo]):
+            if resumen["primero"] >= en_memoria or not resumen["registros"]:
+                continue
+            if desde is not None and resumen["hasta"] < desde:
+                return
+            if (hasta is not None and resumen["desde"] > hasta) or \
+                    (mascara is not None and not resumen["niveles"] & mascara):
+                continue
+            registros = self._registros(resumen)[:en_memoria - resumen["primero"]]
+            for registro in reversed(registros):
+                if desde is not None and registro[0] < desde:
+                    return
+                if cumple(registro):
+                    yield registro
+
+    def consultar(self, desde=None, hasta=None, niveles=None, pagina=0, por_pagina=50):
+        """Página `pagina` (0 = la más reciente) de las atenciones que cumplen el filtro"""
+        inicio = pagina * por_pagina
+        return list(islice(self.recorrer(desde, hasta, niveles), inicio, inicio + por_pagina))
+
+    def sincronizar(self):
+        if not self._archivo.closed:
+            os.fsync(self._archivo.fileno())
+
+    def close(self):
+        if not self._archivo.closed:
+            self.sincronizar()
+            self._archivo.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def benchmark_historial(n=200_000, seed=42):
+    """Memoria y tiempos del historial estructurado frente a la lista de textos original"""
+    import tempfile
+    import tracemalloc
+
+    rng = random.Random(seed)
+    pacientes = [Paciente(f"Paciente {i}", rng.randrange(100), rng.randint(1, 5)) for i in range(n)]
+    resultados = {"registros": n}
+
+    tracemalloc.start()
+    lista = [f"✅ {p} - Atendido a las {time.strftime('%H:%M')}" for p in pacientes]
+    resultados["lista_textos_kb"] = round(tracemalloc.get_traced_memory()[0] / 1024)
+    tracemalloc.stop()
+    del lista
+
+    with tempfile.TemporaryDirectory() as carpeta:
+        tracemalloc.start()
+        historial = HistorialAtenciones(carpeta)
+        inicio = time.perf_counter()
+        for i, paciente in enumerate(pacientes):
+            historial.agregar(paciente, 1_700_000_000.0 + i * 30)
+        resultados["agregar_us"] = round((time.perf_counter() - inicio) / n * 1e6, 2)
+        resultados["historial_kb"] = round(tracemalloc.get_traced_memory()[0] / 1024)
+        tracemalloc.stop()
+        historial.close()
+
+        inicio = time.perf_counter()
+        historial = HistorialAtenciones(carpeta)
+        resultados["abrir_ms"] = round((time.perf_counter() - inicio) * 1000, 2)
+        fin = 1_700_000_000.0 + n * 30
+        for nombre, argumentos in (
+            ("primera_pagina_ms", {}),
+            ("ultima_hora_nivel_1_ms", {"desde": fin - 3600, "niveles": {1}}),
+            ("dia_antiguo_ms", {"desde": fin - 20 * 86400, "hasta": fin - 19 * 86400}),
+            ("pagina_100_ms", {"pagina": 100}),
+        ):
+            inicio = time.perf_counter()
+            historial.consultar(**argumentos)
+            resultados[nombre] = round((time.perf_counter() - inicio) * 1000, 2)
+        historial.close()
+    return resultados
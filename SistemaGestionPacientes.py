@@ -1,7 +1,11 @@
 """
 SISTEMA DE GESTIÓN DE PACIENTES 
+
+Interfaz PyQt5 sobre NucleoPacientes.py, que contiene la cola, el diario y el
+historial sin GUI; aquí se reexportan para no romper `from SistemaGestionPacientes import ...`.
 """
 
+import os
 import sys
 import time
 from PyQt5.QtWidgets import (
@@ -12,81 +16,16 @@ from PyQt5.QtWidgets import (
 from PyQt5.QtCore import Qt, QTimer
 from PyQt5.QtGui import QFont, QColor, QPalette, QIcon
 
-
-# === ESTRUCTURA: LISTA ENLAZADA ===
-class Paciente:
-    def __init__(self, nombre, edad, prioridad):
-        self.nombre = nombre
-        self.edad = edad
-        self.prioridad = prioridad  # "urgente" o "normal"
-
-    def __str__(self):
-        return f"{self.nombre} ({self.edad} años) - {self.prioridad.upper()}"
-
-
-class Nodo:
-    def __init__(self, paciente):
-        self.paciente = paciente
-        self.siguiente = None
+from NucleoPacientes import (
+    NIVELES_TRIAJE, ALIAS_PRIORIDAD, nivel_triaje, Paciente, Nodo, ColaPacientes,
+    benchmark_triaje, POLITICAS_SYNC, ColaPersistente, benchmark_diario,
+    HistorialAtenciones, benchmark_historial,
+)
 
 
-class ColaPacientes:
-    def __init__(self):
-        self.cabeza = None
-        self.cola = None
-        self.total = 0
-
-    def agregar(self, paciente):
-        nuevo = Nodo(paciente)
-        if paciente.prioridad == "urgente":
-            if not self.cabeza:
-                self.cabeza = self.cola = nuevo
-            else:
-                nuevo.siguiente = self.cabeza
-                self.cabeza = nuevo
-        else:
-            if not self.cola:
-                self.cabeza = self.cola = nuevo
-            else:
-                self.cola.siguiente = nuevo
-                self.cola = nuevo
-        self.total += 1
-
-    def atender(self):
-        if not self.cabeza:
-            return None
-        paciente = self.cabeza.paciente
-        self.cabeza = self.cabeza.siguiente
-        if not self.cabeza:
-            self.cola = None
-        self.total -= 1
-        return paciente
-
-    def mostrar_lista(self):
-        if not self.cabeza:
-            return ["(No hay pacientes esperando)"]
-        lista = []
-        actual = self.cabeza
-        idx = 1
-        while actual:
-            lista.append(f"{idx}. {actual.paciente}")
-            actual = actual.siguiente
-            idx += 1
-        return lista
-
-    def esta_vacia(self):
-        return self.cabeza is None
-
-    def contar_por_prioridad(self):
-        urgentes = normales = 0
-        actual = self.cabeza
-        while actual:
-            if actual.paciente.prioridad == "urgente":
-                urgentes += 1
-            else:
-                normales += 1
-            actual = actual.siguiente
-        return urgentes, normales
+RUTA_COLA = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cola_pacientes")
+RUTA_HISTORIAL = os.path.join(os.path.dirname(os.path.abspath(__file__)), "historial_pacientes")
+PERIODOS_HISTORIAL = [("Todo", None), ("Última hora", 3600), ("Últimas 24 h", 86400), ("Últimos 7 días", 7 * 86400)]
 
 
 # === VENTANA PRINCIPAL – DISEÑO HOSPITALARIO ===
@@ -190,7 +129,9 @@ class VentanaPacientes(QMainWindow):
 
         form_layout.addWidget(QLabel("Prioridad:"), 2, 0)
         self.combo_prioridad = QComboBox()
-        self.combo_prioridad.addItems(["normal", "urgente"])
+        self.combo_prioridad.addItems(
+            [f"{icono} {nivel} - {nombre}" for nivel, (nombre, _, icono, _) in NIVELES_TRIAJE.items()])
+        self.combo_prioridad.setCurrentIndex(3)
         form_layout.addWidget(self.combo_prioridad, 2, 1)
 
         layout_izq.addLayout(form_layout)
@@ -218,7 +159,7 @@ class VentanaPacientes(QMainWindow):
         layout_izq.addLayout(btn_layout)
 
         # Información
-        self.label_info = QLabel("📊 Pacientes en espera: 0 (Urgentes: 0)")
+        self.label_info = QLabel("📊 Pacientes en espera: 0")
         self.label_info.setStyleSheet("color: #7f8c8d; font-weight: bold; font-size: 12px;")
         layout_izq.addWidget(self.label_info)
 
@@ -244,7 +185,7 @@ class VentanaPacientes(QMainWindow):
         btn_lista.clicked.connect(self.mostrar_lista_actual)
 
         btn_historial = QPushButton("🗂️ Historial")
-        btn_historial.clicked.connect(self.mostrar_historial)
+        btn_historial.clicked.connect(lambda: self.mostrar_historial())
 
         btn_exportar = QPushButton("📥 Exportar Lista")
         btn_exportar.clicked.connect(self.exportar_lista)
@@ -254,6 +195,42 @@ class VentanaPacientes(QMainWindow):
         acciones_layout.addWidget(btn_exportar)
         layout_der.addLayout(acciones_layout)
 
+        # Acciones sobre un paciente en espera (por ID)
+        id_layout = QHBoxLayout()
+        self.input_id = QLineEdit()
+        self.input_id.setPlaceholderText("ID del paciente (#)")
+        btn_posicion = QPushButton("📍 Posición")
+        btn_posicion.clicked.connect(self.consultar_posicion)
+        btn_retriaje = QPushButton("⬆️ Re-triaje")
+        btn_retriaje.setToolTip("Asigna la prioridad elegida en el formulario")
+        btn_retriaje.clicked.connect(self.cambiar_prioridad)
+        btn_cancelar = QPushButton("❌ Retirar")
+        btn_cancelar.clicked.connect(self.cancelar_paciente)
+        id_layout.addWidget(self.input_id)
+        id_layout.addWidget(btn_posicion)
+        id_layout.addWidget(btn_retriaje)
+        id_layout.addWidget(btn_cancelar)
+        layout_der.addLayout(id_layout)
+
+        # Filtros y páginas del historial
+        filtros_layout = QHBoxLayout()
+        self.combo_filtro_nivel = QComboBox()
+        self.combo_filtro_nivel.addItems(["Todos los niveles"] + [
+            f"{icono} {nivel} - {nombre}" for nivel, (nombre, _, icono, _) in NIVELES_TRIAJE.items()])
+        self.combo_filtro_nivel.currentIndexChanged.connect(lambda _: self.mostrar_historial())
+        self.combo_periodo = QComboBox()
+        self.combo_periodo.addItems([nombre for nombre, _ in PERIODOS_HISTORIAL])
+        self.combo_periodo.currentIndexChanged.connect(lambda _: self.mostrar_historial())
+        btn_recientes = QPushButton("◀ Más recientes")
+        btn_recientes.clicked.connect(lambda: self.mostrar_historial(self.pagina_historial - 1))
+        btn_anteriores = QPushButton("Anteriores ▶")
+        btn_anteriores.clicked.connect(lambda: self.mostrar_historial(self.pagina_historial + 1))
+        filtros_layout.addWidget(self.combo_filtro_nivel)
+        filtros_layout.addWidget(self.combo_periodo)
+        filtros_layout.addWidget(btn_recientes)
+        filtros_layout.addWidget(btn_anteriores)
+        layout_der.addLayout(filtros_layout)
+
         # Añadir paneles
         splitter_panel.addWidget(panel_izq)
         splitter_panel.addWidget(panel_der)
@@ -261,8 +238,13 @@ class VentanaPacientes(QMainWindow):
         splitter_panel.setStyleSheet("QSplitter::handle { background: #dfe4ea; }")
 
         # Variables
-        self.cola = ColaPacientes()
-        self.historial = []
+        self.historial = HistorialAtenciones(RUTA_HISTORIAL)
+        self.cola = ColaPersistente(RUTA_COLA, historial=self.historial)  # La cola anota cada atención
+        self.pagina_historial = 0
+        # Con sync="lote", el último lote llega a disco aunque no haya más eventos
+        self.timer_sync = QTimer(self)
+        self.timer_sync.timeout.connect(self.cola.sincronizar)
+        self.timer_sync.start(1000)
         self.mostrar_lista_actual()
 
     def validar_datos(self):
@@ -277,8 +259,7 @@ class VentanaPacientes(QMainWindow):
         except:
             QMessageBox.warning(self, "Edad inválida", "La edad debe ser un número entre 0 y 120.")
             return None
-        prioridad = self.combo_prioridad.currentText()
-        return Paciente(nombre, edad, prioridad)
+        return Paciente(nombre, edad, self.combo_prioridad.currentIndex() + 1)
 
     def agregar_paciente(self):
         paciente = self.validar_datos()
@@ -289,7 +270,8 @@ class VentanaPacientes(QMainWindow):
             self.input_edad.clear()
             QMessageBox.information(
                 self, "Registrado",
-                f"Paciente '{paciente.nombre}' registrado con prioridad '{paciente.prioridad}'."
+                f"Paciente '{paciente.nombre}' registrado con ID #{paciente.id} "
+                f"y prioridad '{paciente.prioridad}'."
             )
             self.mostrar_lista_actual()
 
@@ -298,7 +280,6 @@ class VentanaPacientes(QMainWindow):
             QMessageBox.information(self, "Sin pacientes", "No hay pacientes para atender.")
             return
         paciente = self.cola.atender()
-        self.historial.append(f"✅ {paciente} - Atendido a las {time.strftime('%H:%M')}")
         self.actualizar_info()
         # Animación suave
         self.area_texto.setStyleSheet("background-color: #fdedec; color: #c0392b;")
@@ -306,6 +287,43 @@ class VentanaPacientes(QMainWindow):
         QTimer.singleShot(1500, self.restaurar_estilo)
         QTimer.singleShot(1800, self.mostrar_lista_actual)
 
+    def leer_id(self):
+        try:
+            return int(self.input_id.text().strip().lstrip("#"))
+        except ValueError:
+            QMessageBox.warning(self, "ID inválido", "Ingrese el número de ID del paciente.")
+            return None
+
+    def consultar_posicion(self):
+        id = self.leer_id()
+        if id is None:
+            return
+        puesto = self.cola.position_of(id)
+        if puesto is None:
+            QMessageBox.information(self, "No encontrado", f"El paciente #{id} no está en espera.")
+        else:
+            QMessageBox.information(self, "Posición", f"El paciente #{id} es el número {puesto} de {self.cola.total}.")
+
+    def cambiar_prioridad(self):
+        id = self.leer_id()
+        if id is None:
+            return
+        if self.cola.change_priority(id, self.combo_prioridad.currentIndex() + 1):
+            self.mostrar_lista_actual()
+        else:
+            QMessageBox.information(self, "No encontrado", f"El paciente #{id} no está en espera.")
+
+    def cancelar_paciente(self):
+        id = self.leer_id()
+        if id is None:
+            return
+        paciente = self.cola.cancel(id)
+        if paciente is None:
+            QMessageBox.information(self, "No encontrado", f"El paciente #{id} no está en espera.")
+            return
+        self.input_id.clear()
+        self.mostrar_lista_actual()
+
     def restaurar_estilo(self):
         self.area_texto.setStyleSheet("""
             background-color: white;
@@ -316,9 +334,9 @@ class VentanaPacientes(QMainWindow):
         """)
 
     def actualizar_info(self):
-        urgentes, normales = self.cola.contar_por_prioridad()
-        total = self.cola.total
-        self.label_info.setText(f"📊 Pacientes en espera: {total} (🔴 Urgentes: {urgentes})")
+        stats = self.cola.estadisticas()  # O(1): la cola mantiene los contadores
+        niveles = "  ".join(f"{NIVELES_TRIAJE[n][2]} {c}" for n, c in stats["por_nivel"].items())
+        self.label_info.setText(f"📊 Pacientes en espera: {stats['en_espera']} ({niveles})")
 
     def mostrar_lista_actual(self):
         self.area_texto.clear()
@@ -326,21 +344,35 @@ class VentanaPacientes(QMainWindow):
         self.area_texto.append(f"<b>Fecha:</b> {time.strftime('%d/%m/%Y')} | <b>Hora:</b> {time.strftime('%H:%M:%S')}")
         self.area_texto.append("<hr>")
         lista = self.cola.mostrar_lista()
-        for item in lista:
-            if "URGENTE" in item:
-                self.area_texto.append(f'<font color="#c0392b"><b>🚨 {item}</b></font>')
-            else:
-                self.area_texto.append(f'🔵 {item}')
+        if self.cola.esta_vacia():
+            self.area_texto.append(lista[0])
+        for item, (nivel, _) in zip(lista, self.cola.en_espera()):
+            _, _, icono, color = NIVELES_TRIAJE[nivel]
+            texto = f"<b>{item}</b>" if nivel <= 2 else item
+            self.area_texto.append(f'<font color="{color}">{icono} {texto}</font>')
         self.actualizar_info()
 
-    def mostrar_historial(self):
+    def mostrar_historial(self, pagina=0):
+        """Una página del historial con los filtros elegidos; solo lee lo que muestra"""
+        indice_nivel = self.combo_filtro_nivel.currentIndex()
+        niveles = {indice_nivel} if indice_nivel > 0 else None
+        periodo = PERIODOS_HISTORIAL[self.combo_periodo.currentIndex()][1]
+        desde = time.time() - periodo if periodo else None
+        pagina = max(pagina, 0)
+        registros = self.historial.consultar(desde=desde, niveles=niveles, pagina=pagina)
+        if not registros and pagina > 0:
+            return  # No hay páginas más antiguas: se queda en la actual
+        self.pagina_historial = pagina
         self.area_texto.clear()
-        self.area_texto.append("<h3>🗂️ HISTORIAL DE ATENCIONES</h3><hr>")
-        if not self.historial:
-            self.area_texto.append("<i>Ningún paciente ha sido atendido aún.</i>")
-        else:
-            for registro in self.historial:
-                self.area_texto.append(registro)
+        self.area_texto.append("<h3>🗂️ HISTORIAL DE ATENCIONES</h3>")
+        self.area_texto.append(f"<b>Página:</b> {pagina + 1} | <b>Total registrado:</b> {len(self.historial)}<hr>")
+        if not registros:
+            self.area_texto.append("<i>Ninguna atención coincide con el filtro.</i>")
+        for instante, id, nombre, edad, nivel in registros:
+            nombre_nivel, _, icono, color = NIVELES_TRIAJE[nivel]
+            hora = time.strftime("%d/%m %H:%M", time.localtime(instante))
+            self.area_texto.append(
+                f'<font color="{color}">✅ {hora} {icono} #{id} {nombre} ({edad} años) - {nombre_nivel.upper()}</font>')
 
     def exportar_lista(self):
         nombre_archivo, _ = QFileDialog.getSaveFileName(
@@ -354,16 +386,19 @@ class VentanaPacientes(QMainWindow):
                 f.write("========================================\n")
                 f.write(f"Fecha: {time.strftime('%d/%m/%Y %H:%M:%S')}\n")
                 f.write(f"Pacientes en espera: {self.cola.total}\n")
-                f.write("Prioridades: Urgentes (🔴), Normales (🔵)\n")
+                f.write("Prioridades: " + ", ".join(
+                    f"{n} {nombre} ({icono})" for n, (nombre, _, icono, _) in NIVELES_TRIAJE.items()) + "\n")
                 f.write("Lista:\n")
-                actual = self.cola.cabeza
-                idx = 1
-                while actual:
-                    f.write(f"{idx}. {actual.paciente}\n")
-                    actual = actual.siguiente
-                    idx += 1
+                for item in self.cola.mostrar_lista():
+                    f.write(f"{item}\n")
             QMessageBox.information(self, "Exportado", f"Lista guardada en:\n{nombre_archivo}")
 
+    def closeEvent(self, event):
+        self.timer_sync.stop()
+        self.cola.close()
+        self.historial.close()
+        super().closeEvent(event)
+
 
 # === EJECUCIÓN ===
 if __name__ == "__main__":
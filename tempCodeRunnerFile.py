@@ -22,86 +22,7 @@ from PyQt5.QtGui import (
     QFont, QColor, QPalette, QPainter, QBrush, QLinearGradient, QIcon
 )
 
-
-# === ESTRUCTURA AVL ===
-class NodoAVL:
-    def __init__(self, clave):
-        self.clave = clave
-        self.izq = None
-        self.der = None
-        self.altura = 1
-
-
-def obtener_altura(nodo):
-    return nodo.altura if nodo else 0
-
-
-def actualizar_altura(nodo):
-    if nodo:
-        nodo.altura = 1 + max(obtener_altura(nodo.izq), obtener_altura(nodo.der))
-
-
-def obtener_balance(nodo):
-    return obtener_altura(nodo.izq) - obtener_altura(nodo.der) if nodo else 0
-
-
-def rotar_derecha(y):
-    x = y.izq
-    T2 = x.der
-    x.der = y
-    y.izq = T2
-    actualizar_altura(y)
-    actualizar_altura(x)
-    return x
-
-
-def rotar_izquierda(x):
-    y = x.der
-    T2 = y.izq
-    y.izq = x
-    x.der = T2
-    actualizar_altura(x)
-    actualizar_altura(y)
-    return y
-
-
-def insertar_avl(raiz, clave, historial):
-    if not raiz:
-        historial.append(f"🟢 Insertando nodo <b>{clave}</b> como raíz.")
-        return NodoAVL(clave)
-
-    if clave < raiz.clave:
-        historial.append(f"➡️  {clave} < {raiz.clave}: bajando a la izquierda...")
-        raiz.izq = insertar_avl(raiz.izq, clave, historial)
-    elif clave > raiz.clave:
-        historial.append(f"➡️  {clave} > {raiz.clave}: bajando a la derecha...")
-        raiz.der = insertar_avl(raiz.der, clave, historial)
-    else:
-        historial.append(f"🟨 Duplicado: <b>{clave}</b> ya existe.")
-        return raiz
-
-    actualizar_altura(raiz)
-    balance = obtener_balance(raiz)
-
-    # Rotaciones
-    if balance > 1:
-        if clave < raiz.izq.clave:
-            historial.append(f"⚖️  <b>Rotación Derecha (LL)</b> en {raiz.clave}")
-            return rotar_derecha(raiz)
-        else:
-            historial.append(f"⚖️  <b>Rotación LR</b> en {raiz.clave}")
-            raiz.izq = rotar_izquierda(raiz.izq)
-            return rotar_derecha(raiz)
-    if balance < -1:
-        if clave > raiz.der.clave:
-            historial.append(f"⚖️  <b>Rotación Izquierda (RR)</b> en {raiz.clave}")
-            return rotar_izquierda(raiz)
-        else:
-            historial.append(f"⚖️  <b>Rotación RL</b> en {raiz.clave}")
-            raiz.der = rotar_derecha(raiz.der)
-            return rotar_izquierda(raiz)
-
-    return raiz
+from NucleoAVL import insertar_avl
 
 
 # === WIDGET DE FONDO MATRIX ===
@@ -237,7 +158,7 @@ class VentanaAVL(QMainWindow):
         try:
             clave = int(self.input_clave.text())
             historial_local = []
-            self.raiz = insertar_avl(self.raiz, clave, historial_local)
+            self.raiz = insertar_avl(self.raiz, clave, historial_local, estilo="visual")
             for linea in historial_local:
                 self.historial.append(linea)
             self.actualizar_vista_arbol()
@@ -250,7 +171,7 @@ class VentanaAVL(QMainWindow):
         for clave in secuencia:
             time.sleep(0.8)
             historial_local = []
-            self.raiz = insertar_avl(self.raiz, clave, historial_local)
+            self.raiz = insertar_avl(self.raiz, clave, historial_local, estilo="visual")
             for linea in historial_local:
                 self.historial.append(linea)
             self.actualizar_vista_arbol()
@@ -0,0 +1,216 @@
+"""Pruebas de las tablas hash e índices de NucleoAgenda.py"""
+
+import os
+import random
+import sys
+import threading
+
+import pytest
+
+from NucleoAgenda import _BORRADO, HashTable, HashTableAbierta, HashTableConcurrente, HashTableDisco
+
+
+# === REDIMENSIÓN ===
+def test_min_load_incompatible_con_max_load():
+    with pytest.raises(ValueError):
+        HashTable(max_load=0.75, min_load=0.4)
+    HashTable(max_load=0.75, min_load=0.2)
+
+
+def test_sin_achicar_durante_una_migracion():
+    tabla = HashTable(size=8, max_load=0.75, min_load=0.3, rehash_step=1)
+    for i in range(7):
+        tabla.insert(f"C{i}", "900000000")  # La séptima dispara el crecimiento a 16
+    assert tabla._old_table is not None
+    for i in range(3):
+        tabla.delete(f"C{i}")  # Por debajo de min_load, pero la migración sigue su ritmo
+    assert tabla.size == 16 and tabla._old_table is not None
+    for i in range(20):
+        tabla.search("nadie")
+    tabla.delete("C3")  # Migración terminada: ahora sí se achica
+    assert tabla.size == 8 and tabla.resize_count == 2
+    assert sorted(tabla.get_all_contacts()) == [(f"C{i}", "900000000") for i in range(4, 7)]
+
+# === BÚSQUEDA TOLERANTE A ERRORES ===
+@pytest.mark.parametrize("consulta", ["xy", "Bo", "a", "ana", "Pérz", "Gonzales", "zz"])
+def test_indice_difuso_igual_a_recorrido(consulta):
+    rng = random.Random(0)
+    nombres = ["Bo", "Al", "Ana", "Pérez", "González", "Zoe", "Ximena"]
+    nombres += [f"Contacto {rng.randrange(10**6)}" for _ in range(300)]
+    con_indice = HashTable(fuzzy_index=True)
+    sin_indice = HashTable()
+    for i, nombre in enumerate(nombres):
+        con_indice.insert(nombre, f"9{i:08d}")
+        sin_indice.insert(nombre, f"9{i:08d}")
+    assert con_indice.search_fuzzy(consulta, limit=50) == sin_indice.search_fuzzy(consulta, limit=50)
+
+
+def test_nombre_corto_sin_ngramas_en_comun():
+    tabla = HashTable(fuzzy_index=True)
+    tabla.insert("Bo", "912345678")
+    assert tabla.search_fuzzy("xy") == [("Bo", "912345678")]
+
+
+
+def test_carga_masiva_ordena_el_indice_de_prefijos_una_vez():
+    rng = random.Random(0)
+    filas = [(f"{rng.choice(['Ana', 'Ángel', 'Bo', 'beto'])} {rng.randrange(10**4)}", "900000000")
+             for _ in range(2000)]
+    en_lote = HashTable(name_index=True)
+    en_lote.bulk_insert(filas)
+    de_a_uno = HashTable(name_index=True)
+    for nombre, telefono in filas:
+        de_a_uno.insert(nombre, telefono)
+    assert not en_lote.prefix_index.cargando
+    assert en_lote.prefix_index.entries == de_a_uno.prefix_index.entries
+    assert en_lote.search_prefix("an", limit=20) == de_a_uno.search_prefix("an", limit=20)
+
+# === MÉTRICAS ===
+def test_comparaciones_contadas_al_operar():
+    tabla = HashTable(size=1, max_load=100, metrics=True)  # Una sola cadena: el orden es conocido
+    for nombre in ("Ana", "Bo", "Ceci"):
+        tabla.insert(nombre, "912345678")
+    tabla.search("Ceci")
+    tabla.search("Nadie")
+    tabla.delete("Ana")
+    ops = tabla.metrics.ops
+    assert ops["insert"]["comparaciones"] == 0 + 1 + 2
+    assert ops["search"]["comparaciones"] == 3 + 3
+    assert ops["delete"]["comparaciones"] == 1
+
+
+def test_comparaciones_durante_rehash_incremental():
+    tabla = HashTable(size=4, rehash_step=1, metrics=True)
+    nombres = [f"Contacto {i}" for i in range(50)]
+    for nombre in nombres:
+        tabla.insert(nombre, "900000000")
+    assert tabla._old_table is not None  # Las búsquedas cruzan una migración a medias
+    total = 0
+    for nombre in nombres:
+        tabla.search(nombre)  # Migra antes de buscar, nunca después
+        total += [n for n, _ in tabla._bucket(nombre)].index(nombre) + 1
+    assert tabla.metrics.ops["search"]["comparaciones"] == total
+
+
+def test_lecturas_sin_lock_se_registran():
+    tabla = HashTableConcurrente(stripes=4, metrics=True)
+    for i in range(200):
+        tabla.insert(f"Contacto {i}", "900000000")
+    for i in range(300):
+        tabla.search(f"Contacto {i}")
+    busquedas = sum(s.metrics.ops["search"]["n"] for s in tabla.segments if "search" in s.metrics.ops)
+    assert busquedas == 300
+
+
+
+# === DIRECCIONAMIENTO ABIERTO ===
+@pytest.mark.parametrize("seed", range(3))
+def test_abierta_igual_a_dict_con_lapidas_y_redimensiones(seed, operaciones=6000):
+    rng = random.Random(seed)
+    tabla, referencia = HashTableAbierta(size=8), {}
+    nombres = [f"Contacto {i}" for i in range(1000)]
+    reusos = limpiezas = 0
+    for paso in range(operaciones):
+        # Unos 60 vivos sobre muchos nombres distintos: las lápidas se acumulan hasta forzar limpiezas
+        if rng.random() < (0.7 if len(referencia) < 60 else 0.3):
+            nombre = rng.choice(nombres)
+            lapidas, size, redimensiones = tabla.tombstones, tabla.size, tabla.resize_count
+            resultado = tabla.insert(nombre, str(paso))
+            assert resultado == ("actualizado" if nombre in referencia else "agregado")
+            if resultado == "agregado" and tabla.resize_count == redimensiones:
+                reusos += tabla.tombstones < lapidas  # Ocupó una lápida del recorrido
+            if tabla.resize_count > redimensiones and tabla.size == size:
+                limpiezas += 1  # Reconstruida sin crecer solo para tirar lápidas
+                assert tabla.tombstones == 0
+            referencia[nombre] = str(paso)
+        else:
+            nombre = rng.choice(list(referencia)) if referencia and rng.random() < 0.8 else rng.choice(nombres)
+            assert tabla.delete(nombre) == (referencia.pop(nombre, None) is not None)
+        assert tabla.count == len(referencia)
+        assert tabla.search(nombre) == referencia.get(nombre)
+        assert tabla.count + tabla.tombstones <= tabla.max_load * tabla.size
+    assert tabla.tombstones == sum(k is _BORRADO for k in tabla.keys)
+    assert sorted(tabla.get_all_contacts()) == sorted(referencia.items())
+    assert all(tabla.search(n) == referencia.get(n) for n in nombres)
+    assert reusos > 0 and limpiezas > 0
+
+
+# === TABLA CONCURRENTE ===
+def test_escritores_y_lectores_sin_lock_durante_redimensiones():
+    tabla = HashTableConcurrente(stripes=4, size=4)  # Franjas diminutas: redimensionan sin parar
+    escritores, rondas, claves = 4, 3000, 300
+    esperados = [{} for _ in range(escritores)]
+    rotas, fallos = [], []
+
+    def escritor(h):
+        rng = random.Random(h)
+        propios = esperados[h]
+        for version in range(rondas):
+            nombre = f"E{h} {rng.randrange(claves)}"
+            if rng.random() < 0.8:
+                tabla.insert(nombre, f"{nombre}|{version}")
+                propios[nombre] = f"{nombre}|{version}"
+            else:
+                tabla.delete(nombre)
+                propios.pop(nombre, None)
+
+    def lector(h):
+        rng = random.Random(100 + h)
+        vistas = {}
+        for _ in range(rondas * 2):
+            nombre = f"E{rng.randrange(escritores)} {rng.randrange(claves)}"
+            try:
+                telefono = tabla.search(nombre)
+            except Exception as e:  # Una lectura sin lock no debe fallar nunca
+                fallos.append(e)
+                continue
+            if telefono is None:
+                continue
+            dueño, _, version = telefono.rpartition("|")
+            if dueño != nombre or int(version) < vistas.get(nombre, -1):
+                rotas.append((nombre, telefono))  # Valor ajeno o más viejo que uno ya visto
+            vistas[nombre] = int(version)
+
+    hilos = [threading.Thread(target=escritor, args=(h,)) for h in range(escritores)]
+    hilos += [threading.Thread(target=lector, args=(h,)) for h in range(4)]
+    intervalo = sys.getswitchinterval()
+    sys.setswitchinterval(1e-5)  # Cambios de hilo frecuentes: lecturas cruzadas con escrituras
+    try:
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+    finally:
+        sys.setswitchinterval(intervalo)
+
+    assert not fallos and not rotas
+    final = {}
+    for propios in esperados:
+        final.update(propios)
+    assert dict(tabla.get_all_contacts()) == final
+    assert tabla.count == len(final)
+    assert sum(segmento.resize_count for segmento in tabla.segments) > 4 * 3
+
+
+# === TABLA EN DISCO ===
+def test_bytes_log_tras_checkpoint(tmp_path):
+    with HashTableDisco(os.path.join(tmp_path, "agenda.db")) as agenda:
+        agenda.insert("Ana", "987654321")
+        assert agenda.get_stats()["bytes_log"] > 0
+        agenda.checkpoint()
+        assert agenda.get_stats()["bytes_log"] == 0
+        agenda.insert("Bo", "912345678")
+        assert agenda.get_stats()["bytes_log"] == os.path.getsize(agenda.log_path)
+
+
+def test_actualizacion_mas_larga_sobrevive_al_reabrir(tmp_path):
+    ruta = os.path.join(tmp_path, "agenda.db")
+    with HashTableDisco(ruta) as agenda:
+        agenda.insert("Ana", "123456")
+        agenda.insert("Ana", "123456789012")  # No cabe en su hueco: se muda al final del heap
+    with HashTableDisco(ruta) as agenda:
+        agenda.insert("Bo", "999999")
+        assert agenda.search("Ana") == "123456789012"
+        assert sorted(agenda.get_all_contacts()) == [("Ana", "123456789012"), ("Bo", "999999")]
+    with HashTableDisco(ruta) as agenda:
+        assert sorted(agenda.get_all_contacts()) == [("Ana", "123456789012"), ("Bo", "999999")]
@@ -0,0 +1,66 @@
+"""Pruebas de ArbolBMas.py: operaciones en memoria y archivo de páginas"""
+
+import os
+import random
+
+import pytest
+
+from ArbolBMas import ArbolBMas, ArbolBMasEnDisco
+
+
+# === OPERACIONES EN MEMORIA ===
+@pytest.mark.parametrize("fanout", [4, 5, 8])
+def test_inserciones_y_borrados_contra_dict(fanout, operaciones=4000):
+    rng = random.Random(fanout)
+    arbol, referencia = ArbolBMas(fanout=fanout), {}
+    reparaciones = []
+    reparar = arbol._reparar
+    arbol._reparar = lambda padre, i: (reparaciones.append(len(padre.hijos)), reparar(padre, i))
+    for paso in range(operaciones):
+        # Primero crece y luego se vacía casi entero para forzar préstamos y fusiones
+        clave = rng.randrange(300)
+        if rng.random() < (0.7 if paso < operaciones // 2 else 0.25):
+            resultado = arbol.insert(clave, paso)
+            assert resultado == ("actualizado" if clave in referencia else "agregado")
+            referencia[clave] = paso
+        else:
+            assert arbol.delete(clave) == (referencia.pop(clave, None) is not None)
+        arbol.verificar()
+        assert len(arbol) == len(referencia)
+        assert arbol.search(clave) == referencia.get(clave)
+    assert list(arbol.range()) == sorted(referencia.items())
+    desde, hasta = 50, 120
+    assert list(arbol.range(desde, hasta)) == sorted((c, v) for c, v in referencia.items() if desde <= c <= hasta)
+    assert len(reparaciones) > 100
+    for clave in list(referencia):
+        assert arbol.delete(clave)
+        arbol.verificar()
+    assert len(arbol) == 0 and list(arbol) == [] and not arbol.delete(0)
+
+
+# === ARCHIVO DE PÁGINAS ===
+
+def test_guardar_claves_de_texto_con_valores_por_defecto(tmp_path):
+    rng = random.Random(0)
+    contactos = {f"nombre.apellido{rng.randrange(10**6):06d}.{i}@correo-ejemplo.com":
+                 f"Nombre {i} Apellido Segundo" for i in range(5000)}
+    arbol = ArbolBMas()
+    for correo, nombre in contactos.items():
+        arbol.insert(correo, nombre)
+    ruta = os.path.join(tmp_path, "contactos.bmas")
+    arbol.guardar(ruta)  # fanout 64 con textos: no cabe en 4 KiB
+    with ArbolBMasEnDisco(ruta) as disco:
+        assert disco.tam_pagina % 4096 == 0
+        assert len(disco) == len(contactos)
+        assert list(disco.range()) == sorted(contactos.items())
+        for clave in rng.sample(sorted(contactos), 200):
+            assert disco.search(clave) == contactos[clave]
+        assert disco.search("nadie@ejemplo.com") is None
+
+
+def test_tam_pagina_explicito_demasiado_chico(tmp_path):
+    arbol = ArbolBMas()
+    for i in range(1000):
+        arbol.insert(f"clave larga {i}", "x" * 40)
+    with pytest.raises(ValueError):
+        arbol.guardar(os.path.join(tmp_path, "chico.bmas"), tam_pagina=512)
@@ -0,0 +1,214 @@
+"""Pruebas del núcleo AVL (NucleoAVL.py): se ejecutan con pytest, sin PyQt5"""
+
+import random
+import hashlib
+from bisect import bisect_left, bisect_right, insort
+
+import pytest
+
+from NucleoAVL import (
+    ArbolAVL, ArbolAVLArena, ArbolAVLPersistente, HistorialAVL, insertar_avl, insertar_avl_iterativo, insertar_avl_recursivo,
+)
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_operaciones_aleatorias_contra_lista_ordenada(seed, rondas=50, operaciones=300):
+    """Secuencias aleatorias de altas y bajas contrastadas con una lista ordenada"""
+    rng = random.Random(seed)
+    for _ in range(rondas):
+        arbol, referencia = ArbolAVL(), []
+        universo = rng.randrange(10, 500)
+        for _ in range(operaciones):
+            clave = rng.randrange(universo)
+            if rng.random() < 0.6:
+                if arbol.insert(clave) == "agregado":
+                    insort(referencia, clave)
+            elif arbol.delete(clave):
+                referencia.remove(clave)
+            arbol.verificar()
+        assert list(arbol) == referencia
+        for _ in range(20):
+            a, b = sorted(rng.randrange(universo) for _ in range(2))
+            esperado = referencia[bisect_left(referencia, a):bisect_right(referencia, b)]
+            assert [c for c, _ in arbol.range(a, b)] == esperado
+            assert arbol.rank(a) == bisect_left(referencia, a)
+            i = bisect_right(referencia, a)
+            assert arbol.floor(a) == (referencia[i - 1] if i else None)
+            j = bisect_left(referencia, a)
+            assert arbol.ceiling(a) == (referencia[j] if j < len(referencia) else None)
+        if referencia:
+            k = rng.randrange(len(referencia))
+            assert arbol.select(k) == referencia[k]
+            assert arbol.min() == referencia[0] and arbol.max() == referencia[-1]
+        corte = rng.randrange(universo)
+        izq, der = arbol.split(corte)
+        izq.verificar()
+        der.verificar()
+        assert list(izq) + list(der) == referencia and all(c < corte for c in izq)
+        izq.join(der)
+        izq.verificar()
+        assert list(izq) == referencia
+
+
+def test_construccion_desde_ordenados():
+    construido = ArbolAVL.from_sorted(range(1000))
+    construido.verificar()
+    assert list(construido) == list(range(1000))
+
+
+# === VARIANTES HISTÓRICAS DE insertar_avl ===
+# Última línea que producían los insertar_avl originales de ArbolesAVL.py
+# ("clasico") y tempCodeRunnerFile.py ("visual") en cada secuencia de demostración
+SECUENCIAS_DEMO = [
+    ([30, 20, 10], "⚖️  <b>Rotación Derecha (LL)</b> en 30", "⚖️  <b>Rotación Derecha (LL)</b> en 30"),
+    ([10, 20, 30], "⚖️  <b>Rotación Izquierda (RR)</b> en 10", "⚖️  <b>Rotación Izquierda (RR)</b> en 10"),
+    ([30, 10, 20], "⚖️  <b>Rotación Doble: LR</b> en 30", "⚖️  <b>Rotación LR</b> en 30"),
+    ([10, 30, 20], "⚖️  <b>Rotación Doble: RL</b> en 10", "⚖️  <b>Rotación RL</b> en 10"),
+]
+
+# (líneas, sha256 abreviado) del historial completo que generaban las versiones
+# originales para 400 claves de random.Random(2024).randrange(500)
+HUELLAS_HISTORICAS = {
+    "clasico": (3116, "8a50c66167914542"),
+    "visual": (3116, "0133a684fe1d0708"),
+}
+
+
+def _forma(nodo):
+    if nodo is None:
+        return None
+    return (nodo.clave, nodo.altura, _forma(nodo.izq), _forma(nodo.der))
+
+
+@pytest.mark.parametrize("secuencia, clasico, visual", SECUENCIAS_DEMO)
+def test_rotaciones_de_demostracion(secuencia, clasico, visual):
+    for estilo, esperado in (("clasico", clasico), ("visual", visual)):
+        raiz, historial = None, []
+        for clave in secuencia:
+            raiz = insertar_avl(raiz, clave, historial, estilo)
+        assert historial[-1] == esperado
+        assert raiz.clave == sorted(secuencia)[1] and raiz.altura == 2
+
+
+@pytest.mark.parametrize("estilo", sorted(HUELLAS_HISTORICAS))
+def test_historial_identico_a_la_version_original(estilo):
+    rng = random.Random(2024)
+    raiz, historial = None, []
+    for _ in range(400):
+        raiz = insertar_avl(raiz, rng.randrange(500), historial, estilo)
+    digest = hashlib.sha256("\n".join(historial).encode()).hexdigest()[:16]
+    assert (len(historial), digest) == HUELLAS_HISTORICAS[estilo]
+
+
+def test_iterativo_igual_a_referencia_recursiva(rondas=200):
+    rng = random.Random(0)
+    for _ in range(rondas):
+        universo = rng.randrange(5, 400)
+        claves = [rng.randrange(universo) for _ in range(rng.randrange(1, 300))]
+        eventos_rec, eventos_it = [], []
+        raiz_rec = raiz_it = None
+        for clave in claves:
+            raiz_rec = insertar_avl_recursivo(raiz_rec, clave, lambda *e: eventos_rec.append(e))
+            raiz_it = insertar_avl_iterativo(raiz_it, clave, lambda *e: eventos_it.append(e))
+        assert eventos_rec == eventos_it
+        assert _forma(raiz_rec) == _forma(raiz_it)
+
+
+# === ÁRBOL PERSISTENTE ===
+def _nodos(arbol):
+    pila, vistos = [arbol.raiz], {}
+    while pila:
+        nodo = pila.pop()
+        if nodo is not None:
+            vistos[id(nodo)] = (nodo, nodo.clave, nodo.valor, nodo.altura, nodo.izq, nodo.der)
+            pila.extend((nodo.izq, nodo.der))
+    return vistos
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_versiones_anteriores_no_cambian(seed, operaciones=400):
+    rng = random.Random(seed)
+    historial = HistorialAVL()
+    referencias, fotos = [[]], [_nodos(historial.actual)]
+    for _ in range(operaciones):
+        clave = rng.randrange(200)
+        referencia = list(referencias[-1])
+        if rng.random() < 0.65:
+            historial.insert(clave, f"v{clave}")
+            if clave not in referencia:
+                insort(referencia, clave)
+        else:
+            historial.delete(clave)
+            if clave in referencia:
+                referencia.remove(clave)
+        referencias.append(referencia)
+        fotos.append(_nodos(historial.actual))
+        historial.actual.verificar()
+    for i, (version, referencia) in enumerate(zip(historial.versiones, referencias)):
+        assert list(version) == referencia, i
+        assert _nodos(version) == fotos[i], i  # Ni un nodo de la versión se tocó después
+
+
+def test_cada_cambio_copia_solo_el_camino():
+    arbol = ArbolAVLPersistente(range(1023))
+    nuevo = arbol.insert(2000)
+    borrado = nuevo.delete(500)
+    assert 2000 not in arbol and 500 in nuevo and 500 not in borrado
+    for antes, despues in ((arbol, nuevo), (nuevo, borrado)):
+        viejos = _nodos(antes)
+        nuevos = [k for k in _nodos(despues) if k not in viejos]
+        assert len(nuevos) <= 2 * despues.raiz.altura  # Camino copiado más las rotaciones
+    historial = HistorialAVL(arbol)
+    historial.insert(2000)
+    assert historial.nodos_compartidos(0, 1) >= len(arbol) - 2 * arbol.raiz.altura
+    assert arbol.delete(5000) is arbol  # Sin cambios no hay versión nueva
+
+
+def test_join_y_split_persistentes():
+    arbol = ArbolAVLPersistente(range(100))
+    izq, der = arbol.split(40)
+    assert list(izq) == list(range(40)) and list(der) == list(range(40, 100))
+    unido = izq.join(der)
+    unido.verificar()
+    assert list(unido) == list(range(100))
+    assert list(arbol) == list(range(100)) and list(izq) == list(range(40))
+
+
+# === ARENA ===
+def _forma_arena(arena, n):
+    if not n:
+        return None
+    return (arena.claves[n], arena.alturas[n], _forma_arena(arena, arena.izq[n]), _forma_arena(arena, arena.der[n]))
+
+
+@pytest.mark.parametrize("typecode", ["q", None])
+def test_arena_igual_al_arbol_de_nodos(typecode, operaciones=3000):
+    rng = random.Random(7)
+    arena, arbol = ArbolAVLArena(typecode=typecode), ArbolAVL()
+    for paso in range(operaciones):
+        clave = rng.randrange(400)
+        if rng.random() < 0.6:
+            assert arena.insert(clave, paso) == arbol.insert(clave, paso)
+        else:
+            assert arena.delete(clave) == arbol.delete(clave)
+        assert arena.search(clave) == arbol.search(clave)
+        assert len(arena) == len(arbol)
+    assert list(arena) == list(arbol)
+    assert _forma_arena(arena, arena.raiz) == _forma(arbol.raiz)  # Mismas rotaciones y mismo sucesor
+
+
+def test_arena_reutiliza_los_indices_libres():
+    arena = ArbolAVLArena(range(100))
+    slots = len(arena.alturas)
+    for clave in range(0, 100, 2):
+        assert arena.delete(clave)
+    assert len(arena) == 50 and len(arena.libres) == 50
+    assert not arena.delete(0) and len(arena.libres) == 50
+    for clave in range(1000, 1050):
+        arena.insert(clave, f"v{clave}")
+    assert len(arena.alturas) == slots and not arena.libres  # Los arreglos no crecieron
+    assert list(arena) == list(range(1, 100, 2)) + list(range(1000, 1050))
+    assert arena.search(1020) == "v1020" and arena.search(4) is None
+    arena.insert(2000)
+    assert len(arena.alturas) == slots + 1 and len(arena) == 101
+
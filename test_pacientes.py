@@ -0,0 +1,373 @@
+"""Pruebas de la cola de triaje, el diario y el historial de NucleoPacientes.py"""
+
+import heapq
+import os
+import random
+import struct
+
+import pytest
+
+from NucleoPacientes import (
+    _ATENCION, _EVENTO, NIVELES_TRIAJE, ColaPacientes, ColaPersistente, HistorialAtenciones, Paciente,
+    nivel_triaje,
+)
+
+
+def reloj_simulado(inicio=0.0):
+    """Reloj que solo avanza cuando la prueba lo indica: reloj.ahora[0] += segundos"""
+    ahora = [inicio]
+
+    def reloj():
+        return ahora[0]
+    reloj.ahora = ahora
+    return reloj
+
+
+# === COLA DE TRIAJE ===
+@pytest.mark.parametrize("seed", range(3))
+def test_orden_igual_a_heapq_por_nivel_y_llegada(seed, rondas=30, operaciones=500):
+    rng = random.Random(seed)
+    for _ in range(rondas):
+        cola, referencia, secuencia = ColaPacientes(envejecimiento=False), [], 0
+        for _ in range(operaciones):
+            if rng.random() < 0.6:
+                paciente = Paciente(f"P{secuencia}", rng.randrange(100), rng.randint(1, 5))
+                cola.agregar(paciente)
+                heapq.heappush(referencia, (paciente.nivel, secuencia, paciente))
+                secuencia += 1
+            else:
+                esperado = heapq.heappop(referencia)[2] if referencia else None
+                assert cola.atender() is esperado
+            assert cola.total == len(referencia)
+
+
+def test_envejecimiento_sube_al_final_del_nivel_superior():
+    # El nivel 5 que espera 240 min sube al 4 detrás de quien ya estaba allí, y
+    # ese otro sube al 3 al cumplir 120 min en el nivel 4
+    reloj = reloj_simulado()
+    cola = ColaPacientes(reloj=reloj)
+    viejo = Paciente("viejo", 80, 5)
+    cola.agregar(viejo)
+    reloj.ahora[0] = 200 * 60
+    cuarto = Paciente("cuarto", 30, 4)
+    cola.agregar(cuarto)
+    reloj.ahora[0] = 240 * 60
+    assert cola.envejecer() == 1 and list(cola.en_espera()) == [(4, cuarto), (4, viejo)]
+    reloj.ahora[0] = 320 * 60
+    assert cola.envejecer() == 1  # "cuarto" cumple 120 min en el nivel 4; "viejo", 80
+    assert list(cola.en_espera()) == [(3, cuarto), (4, viejo)]
+    reloj.ahora[0] = 360 * 60
+    assert cola.atender() is cuarto and cola.atender() is viejo and cola.atender() is None
+
+
+def test_prioridades_antiguas():
+    assert nivel_triaje("urgente") == 3 and nivel_triaje("normal") == 4
+    with pytest.raises(ValueError):
+        nivel_triaje("leve")
+
+
+def test_envejecimiento_nunca_llega_a_reanimacion():
+    reloj = reloj_simulado()
+    cola = ColaPacientes(reloj=reloj)
+    rng = random.Random(1)
+    for i in range(3000):
+        reloj.ahora[0] += rng.expovariate(1 / 30)
+        if rng.random() < 0.55:
+            cola.agregar(Paciente(f"P{i}", rng.randrange(100), rng.randint(1, 5)))
+        else:
+            cola.atender()
+        if i % 50 == 0:
+            cola.envejecer()
+    for _ in range(4):  # Cada pasada sube un nivel; 5 h superan cualquier máximo
+        reloj.ahora[0] += 5 * 3600
+        cola.envejecer()
+    assert cola.promovidos > 0
+    assert all(paciente.nivel == 1 for nivel, paciente in cola.en_espera() if nivel == 1)
+    assert {nivel for nivel, _ in cola.en_espera()} <= {1, 2}
+
+    # Un caso de reanimación que llega después se atiende antes que todos los envejecidos
+    reanimacion = Paciente("reanimación", 40, 1)
+    cola.agregar(reanimacion)
+    originales_nivel_1 = cola.conteo[1] - 1
+    for _ in range(originales_nivel_1):
+        assert cola.atender().nivel == 1
+    assert cola.atender() is reanimacion
+
+
+# === CONTADORES POR NIVEL ===
+def test_contadores_iguales_al_recorrido_completo(operaciones=20_000):
+    rng = random.Random(0)
+    reloj = reloj_simulado()
+    cola = ColaPacientes(reloj=reloj)
+    for i in range(operaciones):
+        reloj.ahora[0] += rng.expovariate(1 / 30)  # ~30 s entre eventos: hay envejecimiento
+        if rng.random() < 0.55:
+            cola.agregar(Paciente(f"P{i}", rng.randrange(100), rng.randint(1, 5)))
+        else:
+            cola.atender()
+        if i % 50 == 0:
+            cola.envejecer()
+        conteo = cola.contar_por_prioridad()
+        assert conteo == cola.contar_recorriendo(), i
+        assert sum(conteo.values()) == cola.total
+    stats = cola.estadisticas()
+    assert stats["agregados"] - stats["atendidos"] == stats["en_espera"]
+    assert stats["promovidos"] > 0
+
+
+# === ÍNDICE POR ID ===
+def test_cancel_change_priority_position_of(operaciones=20_000):
+    rng = random.Random(0)
+    reloj = reloj_simulado()
+    cola = ColaPacientes(reloj=reloj)
+    ids = []
+    for i in range(operaciones):
+        reloj.ahora[0] += rng.expovariate(1 / 30)
+        r = rng.random()
+        if r < 0.45 or not ids:
+            paciente = Paciente(f"P{i}", rng.randrange(100), rng.randint(1, 5))
+            cola.agregar(paciente)
+            ids.append(paciente.id)
+        elif r < 0.65:
+            cola.atender()
+        elif r < 0.8:
+            id = rng.choice(ids)
+            paciente = cola.cancel(id)
+            assert paciente is None or paciente.id == id
+            assert cola.cancel(id) is None and cola.position_of(id) is None
+        else:
+            cola.change_priority(rng.choice(ids), rng.randint(1, 5))
+        if i % 100 == 0:
+            orden = [p.id for _, p in cola.en_espera()]
+            for puesto, id in enumerate(orden, 1):
+                assert cola.position_of(id) == puesto, (i, id)
+            assert len(cola.indice) == cola.total == len(orden)
+            assert cola.contar_por_prioridad() == cola.contar_recorriendo()
+            assert all(len(f) <= 64 + 2 * cola.conteo[n] for n, f in cola.fenwick.items())
+
+
+def test_id_repetido_se_rechaza():
+    cola = ColaPacientes()
+    paciente = Paciente("único", 30, 3)
+    cola.agregar(paciente)
+    with pytest.raises(ValueError):
+        cola.agregar(paciente)
+    assert cola.total == 1
+
+
+# === DIARIO ===
+def estado_cola(cola):
+    """Todo lo observable de una cola, para comparar una recuperada con la original"""
+    nodos = []
+    for nivel in NIVELES_TRIAJE:
+        nodo = cola.cabezas[nivel]
+        while nodo:
+            p = nodo.paciente
+            nodos.append((nodo.nivel, p.id, p.nivel, p.nombre, p.edad, nodo.llegada, nodo.entrada))
+            nodo = nodo.siguiente
+    posiciones = [cola.position_of(id) for _, id, *_ in nodos]
+    return nodos, posiciones, cola.estadisticas()
+
+
+def simular_caida(cola):
+    """Cierra el archivo sin compactar, como si el proceso hubiera muerto"""
+    cola._diario.close()
+
+
+@pytest.mark.parametrize("seed", range(2))
+def test_caidas_simuladas_recuperan_el_estado(tmp_path, seed, operaciones=5000):
+    rng = random.Random(seed)
+    reloj = reloj_simulado(1_700_000_000.0)
+    ruta = os.path.join(tmp_path, "cola")
+    abrir = lambda: ColaPersistente(ruta, sync="nunca", compactar_cada=700, reloj=reloj)
+    cola, ids, caidas = abrir(), [], 0
+    for i in range(operaciones):
+        reloj.ahora[0] += rng.expovariate(1 / 30)
+        r = rng.random()
+        if r < 0.45 or not ids:
+            paciente = Paciente(f"Paciente {i} ñ", rng.randrange(100), rng.randint(1, 5))
+            cola.agregar(paciente)
+            ids.append(paciente.id)
+        elif r < 0.7:
+            cola.atender()
+        elif r < 0.8:
+            cola.cancel(rng.choice(ids))
+        elif r < 0.9:
+            cola.change_priority(rng.choice(ids), rng.randint(1, 5))
+        else:
+            cola.envejecer()
+        if rng.random() < 0.005:
+            esperado = estado_cola(cola)
+            simular_caida(cola)
+            cola = abrir()
+            assert estado_cola(cola) == esperado, i
+            caidas += 1
+    cola.close()
+    assert caidas > 0
+
+
+def test_registro_a_medias_se_descarta(tmp_path):
+    reloj = reloj_simulado(1_700_000_000.0)
+    ruta = os.path.join(tmp_path, "cola")
+    abrir = lambda: ColaPersistente(ruta, sync="nunca", reloj=reloj)
+    cola = abrir()
+    for i in range(20):
+        reloj.ahora[0] += 30
+        cola.agregar(Paciente(f"P{i}", 30 + i, i % 5 + 1))
+    cola.atender()
+    esperado = estado_cola(cola)
+    cola._diario.write(_EVENTO.pack(b"A", reloj.ahora[0], 10**9, 1, 30, 20) + b"incomplet")
+    simular_caida(cola)
+    cola = abrir()
+    assert estado_cola(cola) == esperado and 10**9 not in cola.indice
+
+    # El diario quedó recortado: lo que se anota después se recupera
+    cola.agregar(Paciente("después", 40, 2))
+    esperado = estado_cola(cola)
+    simular_caida(cola)
+    cola = abrir()
+    assert estado_cola(cola) == esperado
+    cola.close()
+
+
+def test_caida_entre_snapshot_y_vaciado_del_diario(tmp_path):
+    reloj = reloj_simulado(1_700_000_000.0)
+    ruta = os.path.join(tmp_path, "cola")
+    abrir = lambda: ColaPersistente(ruta, sync="nunca", reloj=reloj)
+    cola = abrir()
+    for i in range(20):
+        reloj.ahora[0] += 30
+        cola.agregar(Paciente(f"P{i}", 30 + i, i % 5 + 1))
+    cola.atender()
+    cola.change_priority(next(cola.en_espera())[1].id, 5)
+    esperado = estado_cola(cola)
+    with open(cola.ruta_diario, "rb") as f:
+        diario_viejo = f.read()
+    cola.compactar()
+    simular_caida(cola)
+    with open(cola.ruta_diario, "wb") as f:
+        f.write(diario_viejo)  # El snapshot nuevo ya lo incluye: debe ignorarse
+    cola = abrir()
+    assert estado_cola(cola) == esperado
+    cola.close()
+
+
+def test_alta_que_no_cabe_en_el_diario_no_toca_la_cola(tmp_path):
+    ruta = os.path.join(tmp_path, "cola")
+    cola = ColaPersistente(ruta, sync="nunca")
+    cola.agregar(Paciente("válido", 30, 3))
+    esperado = estado_cola(cola)
+    with pytest.raises(struct.error):
+        cola.agregar(Paciente("edad imposible", 70_000, 3))  # No cabe en el campo de 16 bits
+    assert estado_cola(cola) == esperado
+    simular_caida(cola)
+    cola = ColaPersistente(ruta, sync="nunca")
+    assert estado_cola(cola) == esperado
+    cola.close()
+
+
+def test_caidas_no_pierden_ni_repiten_atenciones(tmp_path, operaciones=3000):
+    rng = random.Random(0)
+    reloj = reloj_simulado(1_700_000_000.0)
+    ruta, carpeta = os.path.join(tmp_path, "cola"), os.path.join(tmp_path, "historial")
+
+    def abrir():
+        historial = HistorialAtenciones(carpeta, capacidad=50, por_segmento=200)
+        return ColaPersistente(ruta, sync="nunca", compactar_cada=300, historial=historial, reloj=reloj)
+
+    def caer_y_reabrir(cola):
+        simular_caida(cola)
+        cola.historial._archivo.close()
+        cola = abrir()
+        assert [r[:2] for r in reversed(list(cola.historial.recorrer()))] == atendidos
+        return cola
+
+    cola, atendidos = abrir(), []
+    for i in range(operaciones):
+        reloj.ahora[0] += rng.expovariate(1 / 30)
+        if rng.random() < 0.55:
+            cola.agregar(Paciente(f"P{i}", rng.randrange(100), rng.randint(1, 5)))
+            continue
+        perder = rng.random() < 0.03
+        if perder:  # La caída llega después de anotar la atención en el diario, antes del historial
+            historial, cola.historial = cola.historial, None
+        paciente = cola.atender()
+        if paciente is not None:
+            atendidos.append((reloj.ahora[0], paciente.id))
+        if perder:
+            cola.historial = historial
+            cola = caer_y_reabrir(cola)
+        elif rng.random() < 0.02:
+            cola = caer_y_reabrir(cola)
+    cola = caer_y_reabrir(cola)
+    cola.close()
+    cola.historial.close()
+
+
+# === HISTORIAL DE ATENCIONES ===
+def test_consultas_paginadas_iguales_a_la_lista_completa(tmp_path, registros=10_000, consultas=200):
+    rng = random.Random(0)
+    carpeta = str(tmp_path)
+    abrir = lambda: HistorialAtenciones(carpeta, capacidad=500, por_segmento=3000)
+    historial, todos, instante = abrir(), [], 1_700_000_000.0
+    for i in range(registros):
+        instante += rng.expovariate(1 / 60)
+        todos.append(historial.agregar(Paciente(f"Atendido {i} ñ", rng.randrange(100),
+                                                rng.choice((1, 2, 3, 3, 4, 4, 5))), instante))
+
+    def revisar(historial):
+        assert len(historial) == len(todos) and len(historial.reciente) <= 500
+        for _ in range(consultas):
+            a, b = sorted(rng.uniform(todos[0][0] - 100, instante + 100) for _ in range(2))
+            desde, hasta = rng.choice(((None, None), (a, None), (None, b), (a, b)))
+            niveles = rng.choice((None, {1}, {2, 5}, {3, 4}))
+            esperado = [r for r in reversed(todos) if (desde is None or r[0] >= desde) and
+                        (hasta is None or r[0] <= hasta) and (niveles is None or r[4] in niveles)]
+            pagina = rng.randrange(len(esperado) // 50 + 2)
+            obtenido = historial.consultar(desde, hasta, niveles, pagina, 50)
+            assert obtenido == esperado[pagina * 50:pagina * 50 + 50], (desde, hasta, niveles, pagina)
+
+    revisar(historial)
+    historial._archivo.close()  # Caída sin close(): el índice y los segmentos bastan
+    historial = abrir()
+    revisar(historial)
+
+    # Registro a medias al final del segmento activo
+    historial._archivo.write(_ATENCION.pack(instante, 1, 1, 1, 30) + b"corto")
+    historial._archivo.close()
+    historial = abrir()
+    revisar(historial)
+    historial.close()
+
+
+def test_retencion_conserva_los_segmentos_mas_nuevos(tmp_path):
+    with HistorialAtenciones(str(tmp_path), capacidad=100, por_segmento=1000, max_segmentos=3) as acotado:
+        agregados = [acotado.agregar(Paciente(f"R{i}", 50, i % 5 + 1), 1_700_000_000.0 + i)
+                     for i in range(5500)]
+        assert len(acotado) == 3500 and len(acotado.segmentos) == 3
+        assert list(acotado.recorrer()) == list(reversed(agregados[2000:]))
+
+
+def test_retencion_recorta_el_buffer_en_memoria(tmp_path):
+    abrir = lambda: HistorialAtenciones(str(tmp_path), capacidad=1000, por_segmento=100, max_segmentos=2)
+    with abrir() as historial:
+        agregados = [historial.agregar(Paciente(f"R{i}", 50, i % 5 + 1), 1_700_000_000.0 + i)
+                     for i in range(1050)]
+        conservados = list(reversed(agregados[800:]))
+        assert len(historial) == 250
+        assert list(historial.recorrer()) == conservados
+        assert historial.consultar(pagina=5) == []
+    with abrir() as historial:
+        assert list(historial.recorrer()) == conservados
+
+
+def test_contiene_mira_los_segmentos_y_no_lo_borrado(tmp_path):
+    with HistorialAtenciones(str(tmp_path), capacidad=10, por_segmento=100, max_segmentos=2) as historial:
+        registros = [historial.agregar(Paciente(f"R{i}", 50, 3), 1_700_000_000.0 + i) for i in range(350)]
+        instante, id = registros[260][:2]  # Fuera del buffer, en un segmento conservado
+        assert historial.contiene(instante, id)
+        assert not historial.contiene(instante, id + 10**6)
+        instante, id = registros[50][:2]  # La retención ya borró su segmento
+        assert not historial.contiene(instante, id)
+        instante, id = registros[-1][:2]
+        assert historial.contiene(instante, id) and not historial.contiene(instante + 1, id)